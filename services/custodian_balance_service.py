@@ -0,0 +1,281 @@
+"""Consulta concorrente de posições consolidadas nos custodiantes (XP / BTG).
+
+Busca a posição de cada conta uma única vez (thread pool com concorrência
+limitada, rate limit por provedor e retry com backoff) e devolve um snapshot
+independente de fundo. Os saldos de um CNPJ específico são derivados desse
+snapshot sem novas chamadas aos web services.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, TypedDict
+
+import pandas as pd
+
+from persevera_tools.data.providers.ws_btg import BTGWSProvider
+from persevera_tools.data.providers.ws_xp import XPWSProvider
+
+CUSTODIAN_XP = 'XPCV'
+CUSTODIAN_BTG = 'BTG CTVM'
+
+# Concorrência, intervalo mínimo entre chamadas (s) e retries por provedor.
+_PROVIDER_SETTINGS: dict[str, dict] = {
+    CUSTODIAN_XP: {'max_workers': 6, 'min_interval': 0.2, 'retries': 3, 'backoff': 1.0},
+    CUSTODIAN_BTG: {'max_workers': 4, 'min_interval': 0.3, 'retries': 3, 'backoff': 1.0},
+}
+
+
+class FundHolding(TypedDict):
+    saldo: float
+    codigo_cge: str
+
+
+class AccountPosition(TypedDict):
+    conta: str
+    saldo_disponivel: float
+    fundos: dict[str, FundHolding]
+
+
+class PositionSnapshot(TypedDict):
+    custodiante: str
+    posicoes: dict[str, AccountPosition]
+    falhas: dict[str, str]
+    fetched_at: datetime
+
+
+def adjust_cnpj(cnpj: str) -> str:
+    return str(cnpj).replace('.', '').replace('/', '').replace('-', '').strip()
+
+
+def format_btg_account(nr_conta: str) -> str:
+    return str(nr_conta).strip().zfill(9)
+
+
+# ==============================================================================
+# RATE LIMIT / RETRY
+# ==============================================================================
+
+class _RateLimiter:
+    """Garante um intervalo mínimo entre chamadas ao mesmo provedor (thread-safe)."""
+
+    def __init__(self, min_interval: float):
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_RATE_LIMITERS = {
+    custodian: _RateLimiter(settings['min_interval'])
+    for custodian, settings in _PROVIDER_SETTINGS.items()
+}
+
+
+def _call_with_retry(custodian: str, fn: Callable, *args):
+    """Chama ``fn`` respeitando o rate limit do provedor, com retry e backoff exponencial."""
+    settings = _PROVIDER_SETTINGS[custodian]
+    limiter = _RATE_LIMITERS[custodian]
+    attempts = settings['retries'] + 1
+    for attempt in range(attempts):
+        limiter.wait()
+        try:
+            return fn(*args)
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(settings['backoff'] * (2 ** attempt))
+
+
+# ==============================================================================
+# PARSE DE POSIÇÕES POR PROVEDOR
+# ==============================================================================
+
+_thread_providers = threading.local()
+
+
+def _provider(custodian: str):
+    """Instância do provedor por thread (os clientes WS não são compartilhados entre threads)."""
+    providers = getattr(_thread_providers, 'providers', None)
+    if providers is None:
+        providers = _thread_providers.providers = {}
+    if custodian not in providers:
+        providers[custodian] = XPWSProvider() if custodian == CUSTODIAN_XP else BTGWSProvider()
+    return providers[custodian]
+
+
+def _fetch_xp_position(account: str) -> AccountPosition:
+    provider = _provider(CUSTODIAN_XP)
+    df = _call_with_retry(
+        CUSTODIAN_XP, lambda: provider.get_data('consolidated_position_d0', customer_code=account)
+    )
+
+    fundos: dict[str, FundHolding] = {}
+    for item in df['posicaoDetalhada.fundos.itens'][0] or []:
+        cnpj = adjust_cnpj(item['cnpj'])
+        # Mantém o primeiro item por CNPJ (mesma regra da busca linear anterior)
+        fundos.setdefault(cnpj, {'saldo': float(item['valorAtual']), 'codigo_cge': ''})
+
+    return {
+        'conta': account,
+        'saldo_disponivel': float(df['posicaoDetalhada.financeiro.valorDisponivel'].values[0]),
+        'fundos': fundos,
+    }
+
+
+def _fetch_btg_position(account: str) -> AccountPosition:
+    provider = _provider(CUSTODIAN_BTG)
+    account_number = format_btg_account(account)
+
+    summary_df = _call_with_retry(
+        CUSTODIAN_BTG, provider.get_position_by_asset_class, account_number, 'SummaryAccounts'
+    )
+    cash_balance = 0.0
+    if not summary_df.empty and 'MarketAbbreviation' in summary_df.columns:
+        cc_rows = summary_df[summary_df['MarketAbbreviation'] == 'CC']
+        if not cc_rows.empty:
+            cash_balance = float(cc_rows['EndPositionValue'].astype(float).sum())
+
+    funds_df = _call_with_retry(
+        CUSTODIAN_BTG, provider.get_position_by_asset_class, account_number, 'InvestmentFund'
+    )
+    fundos: dict[str, FundHolding] = {}
+    if not funds_df.empty and 'FundCNPJCode' in funds_df.columns:
+        funds_df = funds_df.assign(_cnpj=funds_df['FundCNPJCode'].astype(str))
+        if 'Acquisition_GrossAssetValue' in funds_df.columns:
+            saldo = funds_df['Acquisition_GrossAssetValue'].astype(float).groupby(funds_df['_cnpj']).sum()
+        else:
+            saldo = pd.Series(0.0, index=funds_df['_cnpj'].unique())
+        if 'FundCGECode' in funds_df.columns:
+            cge = funds_df.groupby('_cnpj')['FundCGECode'].first().astype(str).str.strip()
+        else:
+            cge = pd.Series('', index=saldo.index)
+        fundos = {
+            cnpj: {'saldo': float(saldo.get(cnpj, 0.0)), 'codigo_cge': cge.get(cnpj, '')}
+            for cnpj in saldo.index
+        }
+
+    return {
+        'conta': account_number,
+        'saldo_disponivel': cash_balance,
+        'fundos': fundos,
+    }
+
+
+_FETCHERS: dict[str, Callable[[str], AccountPosition]] = {
+    CUSTODIAN_XP: _fetch_xp_position,
+    CUSTODIAN_BTG: _fetch_btg_position,
+}
+
+
+# ==============================================================================
+# API PÚBLICA
+# ==============================================================================
+
+def fetch_account_positions(
+    custodian: str,
+    accounts: list[str],
+    on_progress: Callable[[int, int], None] | None = None,
+) -> PositionSnapshot:
+    """
+    Busca em paralelo a posição consolidada de cada conta de um custodiante.
+
+    Falhas são isoladas por conta: a conta que esgotar os retries entra em
+    ``falhas`` (conta → mensagem de erro) e as demais seguem normalmente.
+
+    Args:
+        custodian: 'XPCV' ou 'BTG CTVM'.
+        accounts: Números de conta (Nr Conta) a consultar.
+        on_progress: Callback opcional (concluídas, total), chamado na thread principal.
+
+    Returns:
+        PositionSnapshot com posições por conta, falhas e horário da consulta.
+    """
+    if custodian not in _FETCHERS:
+        raise ValueError(f"Custodiante sem consulta de posição: {custodian}")
+
+    fetcher = _FETCHERS[custodian]
+    unique_accounts = list(dict.fromkeys(str(a) for a in accounts))
+    posicoes: dict[str, AccountPosition] = {}
+    falhas: dict[str, str] = {}
+
+    if unique_accounts:
+        max_workers = min(_PROVIDER_SETTINGS[custodian]['max_workers'], len(unique_accounts))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetcher, account): account for account in unique_accounts}
+            for done, future in enumerate(as_completed(futures), start=1):
+                account = futures[future]
+                try:
+                    posicoes[account] = future.result()
+                except Exception as e:
+                    falhas[account] = str(e) or type(e).__name__
+                if on_progress is not None:
+                    on_progress(done, len(unique_accounts))
+
+    return {
+        'custodiante': custodian,
+        'posicoes': posicoes,
+        'falhas': falhas,
+        'fetched_at': datetime.now(),
+    }
+
+
+def balances_for_fund(
+    accounts: pd.DataFrame,
+    snapshot: PositionSnapshot,
+    cnpj: str,
+    balance_col: str,
+) -> pd.DataFrame:
+    """
+    Monta a tabela de saldos (caixa e posição no fundo) a partir de um snapshot.
+
+    Não faz chamadas externas: trocar de CNPJ reaproveita o mesmo snapshot.
+    Contas que falharam na consulta ficam de fora (ver ``snapshot['falhas']``).
+
+    Args:
+        accounts: Contas (colunas Portfolio, Custodiante, Nr Conta).
+        snapshot: Resultado de ``fetch_account_positions``.
+        cnpj: CNPJ do fundo (com ou sem máscara).
+        balance_col: Nome da coluna de saldo no fundo.
+
+    Returns:
+        DataFrame com Portfolio, Custodiante, Conta, Saldo Disponível e balance_col
+        (mais 'Código Fundo (CGE)' para BTG).
+    """
+    cnpj_digits = adjust_cnpj(cnpj)
+    is_btg = snapshot['custodiante'] == CUSTODIAN_BTG
+    posicoes = snapshot['posicoes']
+    rows = []
+
+    for portfolio, custodiante, nr_conta in accounts[['Portfolio', 'Custodiante', 'Nr Conta']].itertuples(index=False):
+        position = posicoes.get(str(nr_conta))
+        if position is None:
+            continue
+        holding = position['fundos'].get(cnpj_digits, {'saldo': 0.0, 'codigo_cge': ''})
+        row = {
+            'Portfolio': portfolio,
+            'Custodiante': custodiante,
+            'Conta': position['conta'],
+        }
+        if is_btg:
+            row['Código Fundo (CGE)'] = holding['codigo_cge']
+        row['Saldo Disponível'] = position['saldo_disponivel']
+        row[balance_col] = holding['saldo']
+        rows.append(row)
+
+    columns = ['Portfolio', 'Custodiante', 'Conta']
+    if is_btg:
+        columns.append('Código Fundo (CGE)')
+    columns.extend(['Saldo Disponível', balance_col])
+    return pd.DataFrame(rows, columns=columns)
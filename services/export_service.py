@@ -0,0 +1,260 @@
+"""Exportação em blocos de datas para arquivo temporário (CSV ou Parquet).
+
+As páginas de extração montavam o período inteiro num único DataFrame (e
+mantinham esse DataFrame no ``st.cache_data`` e na tabela renderizada) antes de
+gerar o arquivo. Aqui o período é dividido em blocos de datas: cada bloco é
+buscado, gravado num arquivo temporário e descartado, de modo que a memória
+fica limitada a um bloco por vez. O arquivo final (um ``SpooledTemporaryFile``,
+que passa para o disco acima de ``SPOOL_MAX_MEMORY``) é servido no download e
+a página mostra apenas as primeiras e últimas linhas.
+
+Como blocos diferentes podem trazer colunas diferentes (uma série sem dados num
+ano, por exemplo), a exportação é feita em duas passagens: a primeira busca os
+blocos e acumula a união das colunas e os tipos; a segunda grava o arquivo
+final com todos os blocos no mesmo layout.
+"""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Formato → (MIME, extensão)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+# Tamanho padrão (meses) de cada bloco de datas.
+CHUNK_MONTHS = 12
+# Linhas do início e do fim exibidas na prévia.
+PREVIEW_ROWS = 50
+# Acima deste tamanho (bytes) os arquivos temporários vão para o disco.
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+
+# ==============================================================================
+# BLOCOS DE DATAS
+# ==============================================================================
+
+def date_chunks(start_date: str, end_date: str, months: int = CHUNK_MONTHS) -> list[tuple[str, str]]:
+    """
+    Divide ``[start_date, end_date]`` em janelas consecutivas, sem sobreposição.
+
+    Args:
+        start_date: Data inicial (``YYYY-MM-DD``).
+        end_date: Data final, inclusiva.
+        months: Tamanho de cada janela em meses.
+
+    Returns:
+        Lista de ``(início, fim)`` em ``YYYY-MM-DD``, ambos inclusivos.
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    chunks = []
+    while start <= end:
+        next_start = start + pd.DateOffset(months=months)
+        chunk_end = min(next_start - pd.Timedelta(days=1), end)
+        chunks.append((start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+        start = next_start
+    return chunks
+
+
+# ==============================================================================
+# RESULTADO
+# ==============================================================================
+
+@dataclass
+class ChunkedExport:
+    """Arquivo exportado e a prévia (primeiras / últimas linhas)."""
+
+    file: tempfile.SpooledTemporaryFile
+    fmt: str
+    rows: int
+    columns: int
+    head: pd.DataFrame
+    tail: pd.DataFrame
+    chunk_errors: dict = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        return self.rows == 0
+
+    @property
+    def mime(self) -> str:
+        return EXPORT_FORMATS[self.fmt][0]
+
+    @property
+    def size_bytes(self) -> int:
+        self.file.seek(0, 2)
+        return self.file.tell()
+
+    def file_name(self, prefix: str) -> str:
+        return f"{prefix}{EXPORT_FORMATS[self.fmt][1]}"
+
+    def read(self) -> bytes:
+        """Conteúdo do arquivo (lido só quando o download é pedido)."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def preview(self) -> pd.DataFrame:
+        """Primeiras e últimas linhas, sem repetir linhas quando o total é pequeno."""
+        missing = self.rows - len(self.head)
+        if missing <= 0:
+            return self.head
+        return pd.concat([self.head, self.tail.iloc[-min(missing, len(self.tail)):]])
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# ==============================================================================
+# EXPORTAÇÃO
+# ==============================================================================
+
+def _merge_dtype(current, new):
+    # Colunas ausentes em algum bloco voltam como NaN: inteiros viram float e
+    # booleanos viram object para que todos os blocos caibam no mesmo tipo.
+    if pd.api.types.is_bool_dtype(new):
+        new = "object"
+    elif pd.api.types.is_integer_dtype(new):
+        new = "float64"
+    if current is None or current == new:
+        return new
+    if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new):
+        return "float64"
+    return "object"
+
+
+def _write_csv(frames, output) -> None:
+    for i, frame in enumerate(frames):
+        frame.to_csv(output, header=i == 0, mode="wb", encoding="utf-8")
+
+
+def _write_parquet(frames, output) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+            if writer is None:
+                # Colunas só com nulos no primeiro bloco não têm tipo; assume texto
+                schema = pa.schema(
+                    [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema],
+                    metadata=table.schema.metadata,
+                )
+                writer = pq.ParquetWriter(output, schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_in_chunks(
+    fetch_chunk: Callable[[str, str], Optional[pd.DataFrame]],
+    start_date: str,
+    end_date: str,
+    fmt: str = "csv",
+    chunk_months: int = CHUNK_MONTHS,
+    preview_rows: int = PREVIEW_ROWS,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ChunkedExport:
+    """
+    Busca o período em blocos de datas e grava o resultado num arquivo temporário.
+
+    Args:
+        fetch_chunk: Função ``(início, fim) -> DataFrame`` que busca um bloco
+            (datas inclusivas). Blocos vazios ou ``None`` são ignorados.
+        start_date: Data inicial (``YYYY-MM-DD``).
+        end_date: Data final (``YYYY-MM-DD``).
+        fmt: ``'csv'`` ou ``'parquet'``.
+        chunk_months: Tamanho de cada bloco em meses.
+        preview_rows: Linhas do início e do fim guardadas para a prévia.
+        on_progress: Chamada com ``(blocos concluídos, total)`` após cada bloco.
+
+    Returns:
+        :class:`ChunkedExport` com o arquivo posicionado no início. Blocos que
+        falharam ficam em ``chunk_errors`` (bloco → mensagem); se todos
+        falharem, a exceção do último é levantada.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido: {fmt!r}")
+
+    chunks = date_chunks(start_date, end_date, chunk_months)
+    spooled = []
+    columns: Optional[pd.Index] = None
+    dtypes: dict = {}
+    chunk_errors: dict = {}
+    last_error: Optional[Exception] = None
+
+    try:
+        # 1ª passagem: busca e guarda cada bloco, acumulando colunas e tipos
+        for done, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+            try:
+                df = fetch_chunk(chunk_start, chunk_end)
+            except Exception as e:
+                logger.warning("Falha ao buscar bloco %s a %s: %s", chunk_start, chunk_end, e)
+                chunk_errors[f"{chunk_start} a {chunk_end}"] = str(e)
+                last_error = e
+                df = None
+            if df is not None and not df.empty:
+                columns = df.columns if columns is None else columns.append(df.columns.difference(columns, sort=False))
+                for column, dtype in df.dtypes.items():
+                    if not df[column].isna().all():
+                        dtypes[column] = _merge_dtype(dtypes.get(column), dtype)
+                chunk_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+                df.to_pickle(chunk_file)
+                spooled.append(chunk_file)
+                del df
+            if on_progress is not None:
+                on_progress(done, len(chunks))
+
+        if not spooled and last_error is not None and len(chunk_errors) == len(chunks):
+            raise last_error
+
+        # 2ª passagem: grava todos os blocos com o mesmo layout de colunas
+        rows = 0
+        head: list = []
+        head_rows = 0
+        tail = pd.DataFrame()
+
+        def _aligned_frames():
+            nonlocal rows, head_rows, tail
+            for chunk_file in spooled:
+                chunk_file.seek(0)
+                frame = pd.read_pickle(chunk_file).reindex(columns=columns)
+                frame = frame.astype({c: t for c, t in dtypes.items() if frame[c].dtype != t})
+                chunk_file.close()
+                rows += len(frame)
+                if head_rows < preview_rows:
+                    head.append(frame.iloc[:preview_rows - head_rows])
+                    head_rows += len(head[-1])
+                tail = pd.concat([tail, frame.iloc[-preview_rows:]]).iloc[-preview_rows:]
+                yield frame
+
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        if spooled:
+            writer = _write_csv if fmt == "csv" else _write_parquet
+            writer(_aligned_frames(), output)
+        output.seek(0)
+    finally:
+        for chunk_file in spooled:
+            chunk_file.close()
+
+    return ChunkedExport(
+        file=output,
+        fmt=fmt,
+        rows=rows,
+        columns=0 if columns is None else len(columns),
+        head=pd.concat(head) if head else pd.DataFrame(),
+        tail=tail,
+        chunk_errors=chunk_errors,
+    )
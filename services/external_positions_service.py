@@ -10,6 +10,7 @@ from datetime import datetime
 from io import BytesIO
 from typing import BinaryIO
 
+import numpy as np
 import pandas as pd
 
 REQUIRED_UPLOAD_COLUMNS = ("Ativo", "Saldo")
@@ -60,6 +61,10 @@ MATCH_MATCHED = "matched"
 MATCH_AMBIGUOUS = "ambiguous"
 MATCH_UNMATCHED = "unmatched"
 
+# Índices chave → ativo por fingerprint da taxonomia (ver build_asset_key_index).
+_ASSET_KEY_INDEX_CACHE: dict[int, pd.DataFrame] = {}
+_ASSET_KEY_INDEX_CACHE_SIZE = 4
+
 _TEMPLATE_COLUMNS = list(REQUIRED_UPLOAD_COLUMNS) + list(OPTIONAL_UPLOAD_COLUMNS)
 _RVQM_TEMPLATE_COLUMNS = ("Ativo", "Quantidade", "Saldo")
 
@@ -268,27 +273,148 @@ def _pick_asset_column(df_assets: pd.DataFrame, canonical: str) -> str | None:
     return None
 
 
-def _build_asset_key_index(df_assets: pd.DataFrame) -> dict[str, list[int]]:
-    """Mapa chave normalizada → lista de índices em df_assets (Name e Alias)."""
-    index: dict[str, list[int]] = {}
-    name_col = "Name" if "Name" in df_assets.columns else None
-    alias_col = "Alias" if "Alias" in df_assets.columns else None
-
-    for i, row in df_assets.iterrows():
-        keys: set[str] = set()
-        if name_col:
-            keys.add(normalize_asset_key(row.get(name_col)))
-        if alias_col:
-            keys.add(normalize_asset_key(row.get(alias_col)))
-        for key in keys:
-            if not key:
-                continue
-            index.setdefault(key, [])
-            if i not in index[key]:
-                index[key].append(i)
+def _normalize_asset_key_series(values: pd.Series) -> pd.Series:
+    """Versão vetorizada de ``normalize_asset_key`` (nulos viram ``""``)."""
+    keys = values.astype(str).str.strip().str.casefold()
+    return keys.where(values.notna(), "")
+
+
+def _asset_key_fingerprint(df_assets: pd.DataFrame) -> int:
+    """Fingerprint de Name/Alias (e da ordem das linhas) da taxonomia."""
+    cols = [c for c in ("Name", "Alias") if c in df_assets.columns]
+    if not cols:
+        return hash((len(df_assets), tuple(df_assets.columns)))
+    hashed = pd.util.hash_pandas_object(df_assets[cols], index=False).to_numpy()
+    weights = np.arange(1, len(hashed) + 1, dtype=np.uint64)
+    return hash((len(df_assets), tuple(cols), int((hashed * weights).sum())))
+
+
+def build_asset_key_index(df_assets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Índice chave normalizada → posição da linha em ``df_assets`` (Name e Alias).
+
+    Fica em cache por processo, pelo fingerprint de Name/Alias: é construído
+    uma vez a cada refresh de ``load_assets`` e reaproveitado entre uploads e
+    sessões.
+
+    Returns:
+        DataFrame com ``_key`` e ``_asset_pos``, ordenado por chave e, dentro
+        da chave, pela ordem das linhas na taxonomia.
+    """
+    fingerprint = _asset_key_fingerprint(df_assets)
+    cached = _ASSET_KEY_INDEX_CACHE.get(fingerprint)
+    if cached is not None:
+        return cached
+
+    positions = np.arange(len(df_assets))
+    parts = [
+        pd.DataFrame({
+            "_key": _normalize_asset_key_series(df_assets[col]).to_numpy(),
+            "_asset_pos": positions,
+        })
+        for col in ("Name", "Alias")
+        if col in df_assets.columns
+    ]
+    if parts:
+        index = pd.concat(parts, ignore_index=True)
+        index = (
+            index[index["_key"].ne("")]
+            .drop_duplicates()
+            .sort_values(["_key", "_asset_pos"])
+            .reset_index(drop=True)
+        )
+    else:
+        index = pd.DataFrame({"_key": pd.Series(dtype=str), "_asset_pos": pd.Series(dtype=int)})
+
+    if len(_ASSET_KEY_INDEX_CACHE) >= _ASSET_KEY_INDEX_CACHE_SIZE:
+        _ASSET_KEY_INDEX_CACHE.pop(next(iter(_ASSET_KEY_INDEX_CACHE)))
+    _ASSET_KEY_INDEX_CACHE[fingerprint] = index
     return index
 
 
+def _asset_column_values(
+    df_assets: pd.DataFrame,
+    col: str | None,
+    positions: np.ndarray,
+) -> np.ndarray:
+    """Valores de ``col`` nas posições informadas (``pd.NA`` se a coluna não existe)."""
+    if col is None:
+        return np.full(len(positions), pd.NA, dtype=object)
+    return df_assets[col].to_numpy(dtype=object)[positions]
+
+
+def _match_asset_positions(
+    df_upload: pd.DataFrame,
+    df_assets: pd.DataFrame,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Relatório de match + posição do ativo em ``df_assets`` (-1 se não matched)."""
+    key_index = build_asset_key_index(df_assets)
+    n_rows = len(df_upload)
+
+    upload_keys = pd.DataFrame({
+        "_row": np.arange(n_rows),
+        "_key": _normalize_asset_key_series(df_upload["Ativo"]).to_numpy(),
+    })
+    hits = upload_keys.merge(key_index, on="_key", how="inner")
+    n_hits = np.bincount(hits["_row"].to_numpy(), minlength=n_rows)
+
+    matched = n_hits == 1
+    asset_pos = np.full(n_rows, -1)
+    single = hits[matched[hits["_row"].to_numpy()]]
+    asset_pos[single["_row"].to_numpy()] = single["_asset_pos"].to_numpy()
+
+    name_col = _pick_asset_column(df_assets, "Nome Ativo")
+    alias_col = _pick_asset_column(df_assets, "Alias")
+    conjunto_col = _pick_asset_column(df_assets, "Classificação do Conjunto")
+    instrumento_col = _pick_asset_column(df_assets, "Classificação Instrumento")
+
+    def _matched_values(col: str | None) -> np.ndarray:
+        out = np.full(n_rows, pd.NA, dtype=object)
+        if col is not None:
+            out[matched] = _asset_column_values(df_assets, col, asset_pos[matched])
+        return out
+
+    candidatos = np.full(n_rows, "", dtype=object)
+    ambiguous_hits = hits[(n_hits > 1)[hits["_row"].to_numpy()]]
+    if not ambiguous_hits.empty:
+        pos = ambiguous_hits["_asset_pos"].to_numpy()
+        names = (
+            _asset_column_values(df_assets, name_col, pos)
+            if name_col
+            else df_assets.index.to_numpy(dtype=object)[pos]
+        )
+        aliases = _asset_column_values(df_assets, alias_col, pos) if alias_col else [""] * len(pos)
+        labels = pd.Series(
+            [
+                f"{name}" + (f" ({alias})" if pd.notna(alias) and alias else "")
+                for name, alias in zip(names, aliases)
+            ],
+            index=ambiguous_hits["_row"].to_numpy(),
+        )
+        joined = labels.groupby(level=0, sort=False).agg("; ".join)
+        candidatos[joined.index.to_numpy()] = joined.to_numpy()
+
+    asset_idx = np.full(n_rows, pd.NA, dtype=object)
+    asset_idx[matched] = df_assets.index.to_numpy(dtype=object)[asset_pos[matched]]
+
+    report = pd.DataFrame({
+        "Ativo": df_upload["Ativo"].to_numpy(),
+        "Saldo": df_upload["Saldo"].to_numpy() if "Saldo" in df_upload.columns else pd.NA,
+        "Status Match": np.select(
+            [matched, n_hits > 1],
+            [MATCH_MATCHED, MATCH_AMBIGUOUS],
+            default=MATCH_UNMATCHED,
+        ),
+        "Nome Ativo": _matched_values(name_col),
+        "Alias": _matched_values(alias_col),
+        "Classificação do Conjunto": _matched_values(conjunto_col),
+        "Classificação Instrumento": _matched_values(instrumento_col),
+        "Candidatos": candidatos,
+        "_asset_idx": asset_idx,
+    })
+    return report, asset_pos
+
+
 def match_external_positions(
     df_upload: pd.DataFrame,
     df_assets: pd.DataFrame,
@@ -296,57 +422,14 @@ def match_external_positions(
     """
     Cruza Ativo do arquivo com Name/Alias da taxonomia.
 
+    O match é um merge contra ``build_asset_key_index`` (em cache por versão
+    da taxonomia), sem laço por linha.
+
     Returns:
         DataFrame de relatório com Status Match e campos do ativo quando matched.
     """
-    key_index = _build_asset_key_index(df_assets)
-    rows = []
-
-    name_col = _pick_asset_column(df_assets, "Nome Ativo")
-    alias_col = _pick_asset_column(df_assets, "Alias")
-    conjunto_col = _pick_asset_column(df_assets, "Classificação do Conjunto")
-    instrumento_col = _pick_asset_column(df_assets, "Classificação Instrumento")
-
-    for _, up in df_upload.iterrows():
-        key = normalize_asset_key(up["Ativo"])
-        hits = key_index.get(key, [])
-        base = {
-            "Ativo": up["Ativo"],
-            "Saldo": up["Saldo"] if "Saldo" in up.index else pd.NA,
-            "Status Match": MATCH_UNMATCHED,
-            "Nome Ativo": pd.NA,
-            "Alias": pd.NA,
-            "Classificação do Conjunto": pd.NA,
-            "Classificação Instrumento": pd.NA,
-            "Candidatos": "",
-            "_asset_idx": pd.NA,
-        }
-
-        if len(hits) == 1:
-            asset = df_assets.loc[hits[0]]
-            base["Status Match"] = MATCH_MATCHED
-            base["_asset_idx"] = hits[0]
-            if name_col:
-                base["Nome Ativo"] = asset.get(name_col)
-            if alias_col:
-                base["Alias"] = asset.get(alias_col)
-            if conjunto_col:
-                base["Classificação do Conjunto"] = asset.get(conjunto_col)
-            if instrumento_col:
-                base["Classificação Instrumento"] = asset.get(instrumento_col)
-        elif len(hits) > 1:
-            base["Status Match"] = MATCH_AMBIGUOUS
-            labels = []
-            for idx in hits:
-                asset = df_assets.loc[idx]
-                name = asset.get(name_col) if name_col else idx
-                alias = asset.get(alias_col) if alias_col else ""
-                labels.append(f"{name}" + (f" ({alias})" if pd.notna(alias) and alias else ""))
-            base["Candidatos"] = "; ".join(labels)
-
-        rows.append(base)
-
-    return pd.DataFrame(rows)
+    report, _ = _match_asset_positions(df_upload, df_assets)
+    return report
 
 
 def match_summary(df_match: pd.DataFrame) -> dict[str, int]:
@@ -381,100 +464,77 @@ def enrich_external_positions(
     Raises:
         ValueError: se allow_partial=False e houver ambiguous/unmatched.
     """
-    df_match = match_external_positions(df_upload, df_assets)
+    df_match, asset_pos = _match_asset_positions(df_upload, df_assets)
     summary = match_summary(df_match)
     if not allow_partial and (summary[MATCH_AMBIGUOUS] or summary[MATCH_UNMATCHED]):
         raise ValueError(
             "Há ativos sem match único. Corrija o arquivo ou cadastre os ativos no Fibery."
         )
 
-    matched_mask = df_match["Status Match"].eq(MATCH_MATCHED)
+    matched_mask = df_match["Status Match"].eq(MATCH_MATCHED).to_numpy()
     if not matched_mask.any():
         raise ValueError("Nenhum ativo foi encontrado na taxonomia do Fibery.")
 
     default_date = position_date or datetime.now()
-    field_cols = {
-        canonical: _pick_asset_column(df_assets, canonical)
-        for canonical in _ASSET_FIELD_CANDIDATES
-    }
-
-    canonical_rows = []
-    upload_matched = df_upload.loc[matched_mask.to_numpy()].reset_index(drop=True)
-    match_matched = df_match.loc[matched_mask].reset_index(drop=True)
-
-    for i, up in upload_matched.iterrows():
-        asset_idx = match_matched.loc[i, "_asset_idx"]
-        asset = df_assets.loc[asset_idx]
-
-        def _asset_val(canonical: str):
-            col = field_cols[canonical]
-            if col is None:
-                return pd.NA
-            return asset.get(col)
-
-        if "Saldo" in up.index and pd.notna(up.get("Saldo")):
-            saldo = float(up["Saldo"])
-        else:
-            saldo = pd.NA
-        quantidade = up["Quantidade"] if "Quantidade" in up.index and pd.notna(up.get("Quantidade")) else pd.NA
-        if "Valor Unitário" in up.index and pd.notna(up.get("Valor Unitário")):
-            valor_unitario = up["Valor Unitário"]
-        elif (
-            pd.notna(saldo)
-            and pd.notna(quantidade)
-            and quantidade
-        ):
-            valor_unitario = float(saldo) / float(quantidade)
-        else:
-            valor_unitario = pd.NA
-
-        if "Data Posição" in up.index and pd.notna(up.get("Data Posição")):
-            data_pos = pd.Timestamp(up["Data Posição"])
-        else:
-            data_pos = pd.Timestamp(default_date)
-
-        if "Custodiante" in up.index and pd.notna(up.get("Custodiante")) and str(up.get("Custodiante")).strip():
-            custodiante = str(up["Custodiante"]).strip()
-        else:
-            custodiante = "N/D"
-
-        if "Portfolio" in up.index and pd.notna(up.get("Portfolio")) and str(up.get("Portfolio")).strip():
-            portfolio = str(up["Portfolio"]).strip()
-        else:
-            portfolio = portfolio_label
-
-        conjunto = _asset_val("Classificação do Conjunto")
-        subconjunto = _asset_val("Classificação do Sub-Conjunto")
-        if pd.isna(subconjunto) or not str(subconjunto).strip():
-            subconjunto = "Sem Classificação"
-
-        nome_ativo = _asset_val("Nome Ativo")
-        alias = _asset_val("Alias")
-        if pd.isna(alias) or not str(alias).strip():
-            alias = nome_ativo
-
-        canonical_rows.append(
-            {
-                "Data Posição": data_pos,
-                "Portfolio": portfolio,
-                "Custodiante Acronimo": custodiante,
-                "Nome Ativo": nome_ativo,
-                "Nome Ativo Completo": _asset_val("Nome Ativo Completo"),
-                "Alias": alias,
-                "Classificação do Conjunto": conjunto,
-                "Classificação do Sub-Conjunto": subconjunto,
-                "Classificação Instrumento": _asset_val("Classificação Instrumento"),
-                "Nome Emissor": _asset_val("Nome Emissor"),
-                "Nome Devedor": _asset_val("Nome Devedor"),
-                "Quantidade": quantidade if pd.notna(quantidade) else pd.NA,
-                "Valor Unitário": valor_unitario,
-                "Saldo": saldo,
-                "Indexador": _asset_val("Indexador"),
-                "Data Vencimento": _asset_val("Data Vencimento"),
-            }
-        )
+    upload = df_upload.loc[matched_mask].reset_index(drop=True)
+    matched_pos = asset_pos[matched_mask]
+    n_rows = len(upload)
+
+    def _asset_val(canonical: str) -> pd.Series:
+        col = _pick_asset_column(df_assets, canonical)
+        return pd.Series(_asset_column_values(df_assets, col, matched_pos), dtype=object)
+
+    def _upload_col(name: str) -> pd.Series:
+        if name in upload.columns:
+            return upload[name]
+        return pd.Series(pd.NA, index=upload.index, dtype=object)
+
+    def _upload_text(name: str, default: str) -> pd.Series:
+        text = _upload_col(name).astype(str).str.strip()
+        valid = _upload_col(name).notna() & text.ne("")
+        return text.where(valid, default)
+
+    saldo = pd.to_numeric(_upload_col("Saldo"), errors="coerce").astype(float)
+    quantidade = _upload_col("Quantidade")
+    quantidade_num = pd.to_numeric(quantidade, errors="coerce")
+    valor_unitario = _upload_col("Valor Unitário")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied_vu = saldo / quantidade_num
+    derive_vu = valor_unitario.isna() & saldo.notna() & quantidade_num.notna() & quantidade_num.ne(0)
+    valor_unitario = valor_unitario.astype(object).where(~derive_vu, implied_vu)
+
+    data_pos = pd.to_datetime(_upload_col("Data Posição")).fillna(pd.Timestamp(default_date))
+
+    nome_ativo = _asset_val("Nome Ativo")
+    alias = _asset_val("Alias")
+    alias = alias.where(alias.notna() & alias.astype(str).str.strip().ne(""), nome_ativo)
+    subconjunto = _asset_val("Classificação do Sub-Conjunto")
+    subconjunto = subconjunto.where(
+        subconjunto.notna() & subconjunto.astype(str).str.strip().ne(""),
+        "Sem Classificação",
+    )
 
-    df_positions = pd.DataFrame(canonical_rows)
+    df_positions = pd.DataFrame(
+        {
+            "Data Posição": data_pos,
+            "Portfolio": _upload_text("Portfolio", portfolio_label),
+            "Custodiante Acronimo": _upload_text("Custodiante", "N/D"),
+            "Nome Ativo": nome_ativo,
+            "Nome Ativo Completo": _asset_val("Nome Ativo Completo"),
+            "Alias": alias,
+            "Classificação do Conjunto": _asset_val("Classificação do Conjunto"),
+            "Classificação do Sub-Conjunto": subconjunto,
+            "Classificação Instrumento": _asset_val("Classificação Instrumento"),
+            "Nome Emissor": _asset_val("Nome Emissor"),
+            "Nome Devedor": _asset_val("Nome Devedor"),
+            "Quantidade": quantidade,
+            "Valor Unitário": valor_unitario,
+            "Saldo": saldo,
+            "Indexador": _asset_val("Indexador"),
+            "Data Vencimento": _asset_val("Data Vencimento"),
+        },
+        index=pd.RangeIndex(n_rows),
+    )
     df_positions["Data Posição"] = pd.to_datetime(df_positions["Data Posição"])
     df_positions["Data Vencimento"] = pd.to_datetime(
         df_positions["Data Vencimento"], errors="coerce"
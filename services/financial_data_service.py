@@ -5,17 +5,24 @@ todos os providers de forma ansiosa no construtor. Se algum deles falhar (por
 exemplo, a BCB Expectativas indisponível), a inicialização inteira do serviço
 levanta exceção e a página fica inacessível.
 
-Esta camada substitui o ``__init__`` por uma versão resiliente, que tenta cada
-provider isoladamente, registra os erros em ``provider_errors`` e expõe um
-mapeamento ``SOURCE_TO_PROVIDER`` (idêntico ao usado em ``get_data``) para que
-a UI saiba qual atributo de provider cada fonte (``source``) consome — útil
-para desabilitar botões quando o provider correspondente está fora do ar.
+Esta camada substitui o ``__init__`` por uma versão resiliente e preguiçosa:
+cada provider só é instanciado no primeiro acesso ao atributo correspondente
+(``fds.sgs``, ``fds.fred``...), isoladamente, e falhas ficam registradas em
+``provider_errors``. :meth:`SafeFinancialDataService.probe_providers` verifica
+vários providers em paralelo com tempo limite, para a UI desabilitar botões
+sem esperar pelos mais lentos, e :func:`get_financial_data_service` devolve
+uma instância única por processo (por ``start_date``). O mapeamento
+``SOURCE_TO_PROVIDER`` (idêntico ao usado em ``get_data``) diz qual atributo
+de provider cada fonte (``source``) consome.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Callable, Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional
 
 from persevera_tools.data import FinancialDataService
 from persevera_tools.data.providers.anbima import AnbimaProvider
@@ -78,12 +85,48 @@ SOURCE_TO_PROVIDER: Dict[str, str] = {
 }
 
 
+# Tempo máximo (s) que a verificação de disponibilidade espera pelos providers.
+PROBE_TIMEOUT = 3.0
+# Instâncias mantidas por processo (uma por ``start_date``).
+_MAX_SERVICES = 4
+
+_PROVIDER_FACTORIES: Dict[str, Callable[["SafeFinancialDataService"], object]] = {
+    'bloomberg': lambda svc: BloombergProvider(
+        start_date=svc.start_date,
+        tickers_mapping=svc._bloomberg_tickers_mapping,
+        fields_mapping=svc._bloomberg_fields_mapping,
+    ),
+    'sgs': lambda svc: SGSProvider(start_date=svc.start_date),
+    'fred': lambda svc: FredProvider(start_date=svc.start_date),
+    'sidra': lambda svc: SidraProvider(start_date=svc.start_date),
+    'anbima': lambda svc: AnbimaProvider(start_date=svc.start_date),
+    'anbima_feed': lambda svc: AnbimaFeedProvider(start_date=svc.start_date),
+    'anbima_fundos': lambda svc: AnbimaFundosProvider(start_date=svc.start_date),
+    'cvm': lambda svc: CVMProvider(start_date=svc.start_date),
+    'bcb_focus': lambda svc: BcbFocusProvider(start_date=svc.start_date),
+    'simplify': lambda svc: SimplifyProvider(start_date=svc.start_date),
+    'invesco': lambda svc: InvescoProvider(start_date=svc.start_date),
+    'kraneshares': lambda svc: KraneSharesProvider(start_date=svc.start_date),
+    'investing_com': lambda svc: InvestingComProvider(),
+    'debentures_com': lambda svc: DebenturesComProvider(),
+    'mdic': lambda svc: MDICProvider(),
+    'b3': lambda svc: B3Provider(),
+    'mais_retorno': lambda svc: MaisRetornoProvider(),
+    'investfy': lambda svc: InvestfyProvider(),
+}
+
+# Pool compartilhado para instanciar providers (acesso preguiçoso e verificações).
+_PROVIDER_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="provider-init")
+
+
 class SafeFinancialDataService(FinancialDataService):
     """Variante de :class:`FinancialDataService` resiliente a providers offline.
 
-    Cada provider é instanciado dentro de seu próprio ``try/except``. Os que
-    falham têm o atributo correspondente definido como ``None`` e a mensagem
-    de erro é registrada em :attr:`provider_errors`.
+    Nenhum provider é criado no construtor. O primeiro acesso a um atributo de
+    provider o instancia dentro de seu próprio ``try/except`` (uma única vez,
+    mesmo com acessos concorrentes). Quando a criação falha, o acesso devolve
+    ``None``, a mensagem de erro é registrada em :attr:`provider_errors` e o
+    próximo acesso (ou verificação) tenta criar o provider de novo.
     """
 
     def __init__(
@@ -96,43 +139,82 @@ class SafeFinancialDataService(FinancialDataService):
         self.start_date = start_date
         self.logger = logging.getLogger(self.__class__.__name__)
         self.provider_errors: Dict[str, str] = {}
+        self._bloomberg_tickers_mapping = bloomberg_tickers_mapping
+        self._bloomberg_fields_mapping = bloomberg_fields_mapping
+        self._provider_futures: Dict[str, Future] = {}
+        self._provider_lock = threading.Lock()
+        # Protege provider_errors e os atributos de provider: builds terminam em
+        # threads do pool enquanto as páginas leem o registro.
+        self._errors_lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        # Só chamado quando o atributo ainda não existe: providers não criados.
+        if name.startswith('_') or name not in _PROVIDER_FACTORIES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return self._provider_future(name).result()
+
+    def _provider_future(self, provider_attr: str) -> Future:
+        with self._provider_lock:
+            future = self._provider_futures.get(provider_attr)
+            # Falhas não ficam memorizadas: um build que falhou é refeito no próximo acesso
+            if future is None or (future.done() and future.result() is None):
+                future = _PROVIDER_EXECUTOR.submit(self._build_provider, provider_attr)
+                self._provider_futures[provider_attr] = future
+            return future
+
+    def _build_provider(self, provider_attr: str) -> Optional[object]:
+        try:
+            provider = _PROVIDER_FACTORIES[provider_attr](self)
+        except Exception as exc:
+            self.logger.warning("Falha ao inicializar provider '%s': %s", provider_attr, exc)
+            with self._errors_lock:
+                self.provider_errors[provider_attr] = str(exc)
+            return None
+        with self._errors_lock:
+            self.provider_errors.pop(provider_attr, None)
+            # Acessos seguintes encontram o atributo direto, sem passar por __getattr__.
+            self.__dict__[provider_attr] = provider
+        return provider
 
-        provider_factories: Dict[str, Callable[[], object]] = {
-            'bloomberg': lambda: BloombergProvider(
-                start_date=start_date,
-                tickers_mapping=bloomberg_tickers_mapping,
-                fields_mapping=bloomberg_fields_mapping,
-            ),
-            'sgs': lambda: SGSProvider(start_date=start_date),
-            'fred': lambda: FredProvider(start_date=start_date),
-            'sidra': lambda: SidraProvider(start_date=start_date),
-            'anbima': lambda: AnbimaProvider(start_date=start_date),
-            'anbima_feed': lambda: AnbimaFeedProvider(start_date=start_date),
-            'anbima_fundos': lambda: AnbimaFundosProvider(start_date=start_date),
-            'cvm': lambda: CVMProvider(start_date=start_date),
-            'bcb_focus': lambda: BcbFocusProvider(start_date=start_date),
-            'simplify': lambda: SimplifyProvider(start_date=start_date),
-            'invesco': lambda: InvescoProvider(start_date=start_date),
-            'kraneshares': lambda: KraneSharesProvider(start_date=start_date),
-            'investing_com': lambda: InvestingComProvider(),
-            'debentures_com': lambda: DebenturesComProvider(),
-            'mdic': lambda: MDICProvider(),
-            'b3': lambda: B3Provider(),
-            'mais_retorno': lambda: MaisRetornoProvider(),
-            'investfy': lambda: InvestfyProvider(),
-        }
-
-        for attr, factory in provider_factories.items():
-            try:
-                setattr(self, attr, factory())
-            except Exception as exc:
-                setattr(self, attr, None)
-                self.provider_errors[attr] = str(exc)
-                self.logger.warning("Falha ao inicializar provider '%s': %s", attr, exc)
+    def probe_providers(
+        self,
+        provider_attrs: Optional[Iterable[str]] = None,
+        timeout: float = PROBE_TIMEOUT,
+    ) -> Dict[str, str]:
+        """
+        Instancia providers em paralelo, esperando no máximo ``timeout`` segundos.
+
+        Providers que não respondem a tempo ficam em :attr:`provider_errors`
+        como indisponíveis; a instanciação continua em segundo plano e o
+        registro é atualizado quando terminar. Providers que falharam antes
+        são instanciados de novo.
+
+        Args:
+            provider_attrs: Providers a verificar (todos, se omitido).
+            timeout: Espera máxima total, em segundos.
+
+        Returns:
+            Cópia de :attr:`provider_errors` após a verificação (o registro
+            continua mudando enquanto builds atrasados terminam).
+        """
+        attrs = list(provider_attrs) if provider_attrs is not None else list(_PROVIDER_FACTORIES)
+        futures = {attr: self._provider_future(attr) for attr in attrs if attr in _PROVIDER_FACTORIES}
+        wait(futures.values(), timeout=timeout)
+        with self._errors_lock:
+            for attr, future in futures.items():
+                # Rechecado sob o lock: o build pode ter terminado depois do wait
+                if not future.done() and attr not in self.__dict__:
+                    self.provider_errors.setdefault(
+                        attr, f"Sem resposta em {timeout:.0f}s (verificação em andamento)."
+                    )
+            return dict(self.provider_errors)
 
     def is_provider_available(self, provider_attr: str) -> bool:
-        """Indica se o provider foi instanciado com sucesso."""
-        return getattr(self, provider_attr, None) is not None
+        """Indica se o provider está disponível (sem instanciá-lo se ainda não foi verificado)."""
+        with self._errors_lock:
+            if provider_attr in self.__dict__:
+                return self.__dict__[provider_attr] is not None
+            return provider_attr not in self.provider_errors
 
     def is_source_available(self, source: str) -> bool:
         """Indica se o ``source`` está disponível (provider correspondente OK)."""
@@ -143,7 +225,8 @@ class SafeFinancialDataService(FinancialDataService):
 
     def get_provider_error(self, provider_attr: str) -> Optional[str]:
         """Retorna a mensagem de erro do provider, se houver."""
-        return self.provider_errors.get(provider_attr)
+        with self._errors_lock:
+            return self.provider_errors.get(provider_attr)
 
     def get_source_error(self, source: str) -> Optional[str]:
         """Retorna a mensagem de erro do provider que sustenta o ``source``."""
@@ -151,3 +234,20 @@ class SafeFinancialDataService(FinancialDataService):
         if provider_attr is None:
             return None
         return self.get_provider_error(provider_attr)
+
+
+_SERVICES: "OrderedDict[str, SafeFinancialDataService]" = OrderedDict()
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_financial_data_service(start_date: str = '1980-01-01') -> SafeFinancialDataService:
+    """Instância única por processo para ``start_date`` (providers criados sob demanda)."""
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(start_date)
+        if service is None:
+            service = SafeFinancialDataService(start_date=start_date)
+            _SERVICES[start_date] = service
+        _SERVICES.move_to_end(start_date)
+        while len(_SERVICES) > _MAX_SERVICES:
+            _SERVICES.popitem(last=False)
+        return service
@@ -0,0 +1,330 @@
+"""Poller único dos dados de mercado do BLP Relay (Google Sheets).
+
+O Rebalanceador baixava e parseava a planilha inteira sempre que a entrada de
+60 s do ``st.cache_data`` expirava: cada sessão aberta disputava o refresh e
+uma planilha lenta travava a página. Aqui uma thread em segundo plano por
+processo busca a planilha no intervalo configurado, converte os números de
+forma vetorizada e publica um :class:`MarketDataSnapshot` imutável com número
+de versão. As páginas só leem o último snapshot, sem bloquear (exceto na
+primeira carga do processo, quando ainda não há nada publicado).
+
+A origem é plugável: ``PERSEVERA_MARKET_DATA_FILE`` aponta para um CSV local
+(testes / desenvolvimento) no lugar da planilha.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional, Protocol
+
+import numpy as np
+import pandas as pd
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SHEET_ID = "1aF-HUyj4GNwKCgS263e2IBzT1_fU_nztUirRAKKlsWo"
+GOOGLE_SHEET_GID = "0"
+GOOGLE_SHEET_CSV_URL = (
+    f"https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/export"
+    f"?format=csv&gid={GOOGLE_SHEET_GID}"
+)
+
+MARKET_DATA_COLUMNS = [
+    "RT_PX_CHG_PCT_1D",
+    "LAST_PRICE",
+    "YEST_LAST_TRADE",
+    "EQY_TURNOVER_REALTIME",
+    "30_DAY_AVG_TURNOVER_AT_TIME_RT",
+    "VOLUME",
+    "BID",
+    "ASK",
+    "EXCH_TODAY_ALT_SETT_IN_PRICE_RT",
+]
+
+# Intervalo (s) entre buscas da planilha.
+POLL_INTERVAL = 60
+# Timeout (s) do download da planilha.
+FETCH_TIMEOUT = 20
+# Sem leituras por este tempo (s), o poller para de buscar até a próxima leitura.
+IDLE_TIMEOUT = 15 * 60
+
+
+# ==============================================================================
+# PARSING
+# ==============================================================================
+
+def normalize_asset_code(value: object) -> str:
+    if pd.isna(value):
+        return ""
+    text = str(value).strip().upper()
+    if text.startswith("BR_"):
+        text = text[3:]
+    return text.replace(".SA", "").split()[0]
+
+
+def parse_google_numbers(values: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna exportada do Google Sheets para float.
+
+    Aceita formato brasileiro (``1.234,56``), separador de milhar com ponto
+    (``1.234`` / ``1.234.567``), ``%`` e espaços não separáveis. Células já
+    numéricas são mantidas; texto inválido vira NaN.
+
+    Args:
+        values: Coluna do CSV.
+
+    Returns:
+        Série float com o mesmo índice.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype(float)
+
+    text = (
+        values.str.strip()
+        .str.replace("\xa0", "", regex=False)
+        .str.replace("%", "", regex=False)
+    )
+    has_comma = text.str.contains(",", regex=False, na=False)
+    # Comprimento do trecho após o último ponto (o texto todo se não houver ponto).
+    tail_length = text.str.len() - text.str.rfind(".") - 1
+    many_dots = text.str.count(r"\.").gt(1) | tail_length.eq(3)
+    thousands_dot = ~has_comma & many_dots.fillna(False).astype(bool)
+
+    text = text.mask(has_comma, text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    text = text.mask(thousands_dot, text.str.replace(".", "", regex=False))
+    parsed = pd.to_numeric(text.replace("", np.nan), errors="coerce").astype(float)
+
+    # Células não textuais (números soltos numa coluna object) não passam pelo .str
+    non_text = text.isna() & values.notna()
+    if non_text.any():
+        parsed[non_text] = pd.to_numeric(values[non_text], errors="coerce").astype(float)
+    return parsed
+
+
+def parse_market_data_csv(text: str, columns: list = MARKET_DATA_COLUMNS) -> pd.DataFrame:
+    """
+    Parseia o CSV do BLP Relay.
+
+    Args:
+        text: Conteúdo do CSV (coluna ``index`` com o ticker Bloomberg).
+        columns: Colunas numéricas a converter.
+
+    Returns:
+        DataFrame com ``ticker_bloomberg``, ``code_key`` e as colunas numéricas em float.
+    """
+    df = pd.read_csv(io.StringIO(text))
+    df.columns = [str(column).strip() for column in df.columns]
+    df = df.dropna(axis=1, how="all").dropna(axis=0, how="all")
+
+    if "index" not in df.columns:
+        raise ValueError("Coluna 'index' não encontrada na planilha do Google Sheets.")
+
+    df = df.rename(columns={"index": "ticker_bloomberg"})
+    df["ticker_bloomberg"] = df["ticker_bloomberg"].astype(str).str.strip()
+    df = df[df["ticker_bloomberg"].ne("")].copy()
+    df["code_key"] = df["ticker_bloomberg"].map(normalize_asset_code)
+
+    for column in columns:
+        if column in df.columns:
+            df[column] = parse_google_numbers(df[column])
+
+    return df
+
+
+# ==============================================================================
+# ORIGENS
+# ==============================================================================
+
+class MarketDataSource(Protocol):
+    description: str
+
+    def fetch(self) -> str:
+        """Retorna o CSV bruto."""
+        ...
+
+
+class GoogleSheetSource:
+    """Export CSV de uma aba do Google Sheets."""
+
+    def __init__(self, url: str = GOOGLE_SHEET_CSV_URL, timeout: float = FETCH_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.description = "Google Sheets"
+
+    def fetch(self) -> str:
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+
+class LocalFileSource:
+    """CSV local no mesmo formato do export da planilha."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.description = f"arquivo {os.path.basename(path)}"
+
+    def fetch(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+
+# ==============================================================================
+# SNAPSHOT / POLLER
+# ==============================================================================
+
+@dataclass(frozen=True)
+class MarketDataSnapshot:
+    """Versão publicada dos dados de mercado. Não deve ser alterada por quem lê."""
+
+    data: pd.DataFrame
+    version: int
+    fetched_at: datetime
+    source: str
+    last_error: Optional[str] = None
+    last_error_at: Optional[datetime] = None
+
+    def frame(self) -> pd.DataFrame:
+        """Cópia rasa dos dados, segura para atribuir colunas na página."""
+        return self.data.copy(deep=False)
+
+    def age_seconds(self) -> float:
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+
+class MarketDataPoller:
+    """Busca a origem em segundo plano e publica snapshots versionados."""
+
+    def __init__(
+        self,
+        source: MarketDataSource,
+        interval: float = POLL_INTERVAL,
+        idle_timeout: float = IDLE_TIMEOUT,
+        columns: list = MARKET_DATA_COLUMNS,
+    ):
+        self.source = source
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.columns = columns
+        self._snapshot: Optional[MarketDataSnapshot] = None
+        self._first_error: Optional[str] = None
+        self._published = threading.Condition()
+        self._wake = threading.Event()
+        self._last_read = time.monotonic()
+        self._idle = False
+        # _last_read e _idle mudam juntos: sem isso uma leitura entre a checagem
+        # de ociosidade e o _idle = True não acordaria a thread.
+        self._idle_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="market-data-poller", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._poll_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            # Ninguém lendo: dorme até a próxima leitura em vez de buscar a cada intervalo
+            while True:
+                with self._idle_lock:
+                    if time.monotonic() - self._last_read <= self.idle_timeout:
+                        self._idle = False
+                        break
+                    self._idle = True
+                self._wake.wait()
+                self._wake.clear()
+
+    def _poll_once(self) -> None:
+        try:
+            data = parse_market_data_csv(self.source.fetch(), self.columns)
+        except Exception as e:
+            logger.warning("Falha ao atualizar dados de mercado (%s): %s", self.source.description, e)
+            with self._published:
+                if self._snapshot is None:
+                    self._first_error = str(e)
+                else:
+                    self._snapshot = replace(self._snapshot, last_error=str(e), last_error_at=datetime.now())
+                self._published.notify_all()
+            return
+
+        with self._published:
+            version = self._snapshot.version + 1 if self._snapshot is not None else 1
+            self._snapshot = MarketDataSnapshot(
+                data=data,
+                version=version,
+                fetched_at=datetime.now(),
+                source=self.source.description,
+            )
+            self._first_error = None
+            self._published.notify_all()
+
+    def latest(self, wait: float = 0) -> Optional[MarketDataSnapshot]:
+        """
+        Último snapshot publicado.
+
+        Args:
+            wait: Segundos a esperar pela primeira carga quando ainda não há
+                snapshot. Com snapshot publicado, retorna na hora.
+
+        Returns:
+            O snapshot, ou None se nada foi publicado dentro da espera.
+
+        Raises:
+            RuntimeError: Se ainda não há snapshot e a primeira busca falhou.
+        """
+        self._touch()
+        with self._published:
+            if self._snapshot is None and self._first_error is None and wait > 0:
+                self._published.wait_for(
+                    lambda: self._snapshot is not None or self._first_error is not None, timeout=wait
+                )
+            if self._snapshot is None and self._first_error is not None:
+                raise RuntimeError(self._first_error)
+            return self._snapshot
+
+    def refresh(self, wait: float = FETCH_TIMEOUT) -> Optional[MarketDataSnapshot]:
+        """Antecipa a próxima busca e espera (até ``wait`` s) pelo resultado dela."""
+        self._touch()
+        with self._published:
+            before = self._snapshot
+            self._wake.set()
+            self._published.wait_for(
+                lambda: self._snapshot is not before or self._first_error is not None, timeout=wait
+            )
+            return self._snapshot
+
+    def _touch(self) -> None:
+        self.start()
+        with self._idle_lock:
+            self._last_read = time.monotonic()
+            if self._idle:
+                self._wake.set()
+
+
+_POLLER: Optional[MarketDataPoller] = None
+_POLLER_LOCK = threading.Lock()
+
+
+def get_market_data_poller() -> MarketDataPoller:
+    """Poller único por processo (CSV local se ``PERSEVERA_MARKET_DATA_FILE`` estiver definido)."""
+    global _POLLER
+    with _POLLER_LOCK:
+        if _POLLER is None:
+            local_file = os.environ.get("PERSEVERA_MARKET_DATA_FILE")
+            source = LocalFileSource(local_file) if local_file else GoogleSheetSource()
+            _POLLER = MarketDataPoller(source)
+        _POLLER.start()
+        return _POLLER
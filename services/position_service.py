@@ -1,12 +1,18 @@
+import os
+import tempfile
+import time
+
 import pandas as pd
 import numpy as np
 import streamlit as st
+import threading
 from datetime import datetime, timedelta
 from collections.abc import Iterable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
 from utils.ui import track_data_load
+from utils.versioned import frame_fingerprint
 
 from persevera_tools.data.providers import ComdinheiroProvider
 from persevera_tools.db.fibery import read_fibery
@@ -19,6 +25,7 @@ from persevera_tools.fixed_income import calculate_duration
 # =============================================================================
 
 _CACHE_TTL = 10800  # 3 horas
+_POSITIONS_DELTA_TTL = 300  # 5 minutos — refresh incremental das posições
 
 FILTER_OUT_CARTEIRA_STATES = ["Standby", "Encerrada", "Abandonada"]
 
@@ -124,6 +131,19 @@ _POSITIONS_DEDUP_SUBSET = [
     'Data Posição', 'Portfolio', 'Nome Ativo', 'Custodiante Acronimo', 'Saldo',
 ]
 
+# Estado do refresh incremental por loader (frame normalizado + high-water
+# mark de creation-date). Compartilhado entre sessões do mesmo processo.
+_POSITIONS_DELTA_STATE: dict[tuple, dict] = {}
+_POSITIONS_DELTA_LOCK = threading.Lock()
+_POSITIONS_DELTA_KEY_LOCKS: dict[tuple, threading.Lock] = {}
+
+# Histórico ComDinheiro por carteira: frame bruto + intervalos de datas já
+# cobertos. Compartilhado entre sessões; pedidos contidos são só fatiados e
+# só os buracos de datas são buscados.
+_COMDINHEIRO_HISTORY_STATE: dict[str, dict] = {}
+_COMDINHEIRO_HISTORY_LOCK = threading.Lock()
+_COMDINHEIRO_HISTORY_PORTFOLIO_LOCKS: dict[str, threading.Lock] = {}
+
 # Allowlists de `read_fibery(fields=...)`. Cada lista é a união das colunas
 # usadas pelos consumidores do loader (views + funções internas).
 _ASSETS_FIELDS = [
@@ -249,6 +269,50 @@ def get_latest_date_data(
     return df.loc[mask]
 
 
+def latest_position_dates(
+    df: pd.DataFrame,
+    date_col: str = 'Data Posição',
+    group_col: str = 'Portfolio',
+) -> pd.Series:
+    """
+    Índice ``group_col`` → data (dia) da posição mais recente.
+
+    Args:
+        df: Posições no schema canônico (colunas, não MultiIndex).
+        date_col: Coluna de data.
+        group_col: Coluna de agrupamento.
+
+    Returns:
+        Series indexada por ``group_col`` com a data mais recente (normalizada).
+    """
+    if df.empty:
+        return pd.Series(dtype='datetime64[ns]', name=date_col)
+    dates = pd.to_datetime(df[date_col]).dt.normalize()
+    return dates.groupby(df[group_col]).max()
+
+
+def slice_latest_positions(
+    df: pd.DataFrame,
+    latest_dates: pd.Series | None = None,
+    date_col: str = 'Data Posição',
+    group_col: str = 'Portfolio',
+) -> pd.DataFrame:
+    """
+    Linhas de cada grupo na sua data mais recente (um único recorte por máscara).
+
+    Equivale a agrupar por dia e aplicar ``get_latest_date_data(...,
+    group_level=group_col)``, mas sem o ``groupby.transform`` a cada chamada
+    quando ``latest_dates`` já vem materializado do loader.
+    """
+    if df.empty:
+        return df
+    if latest_dates is None:
+        latest_dates = latest_position_dates(df, date_col, group_col)
+    dates = pd.to_datetime(df[date_col]).dt.normalize().to_numpy()
+    mask = dates == df[group_col].map(latest_dates).to_numpy(dtype='datetime64[ns]')
+    return df.loc[mask]
+
+
 def _taxonomy_frame_for_positions(df_assets: pd.DataFrame) -> pd.DataFrame:
     """Seleciona e renomeia colunas de Ativos para o schema canônico de posições."""
     if "Name" not in df_assets.columns:
@@ -378,9 +442,8 @@ def load_portfolio_from_comdinheiro(portfolios: tuple, date_report: str) -> pd.D
     return df
 
 
-@st.cache_data(ttl=_CACHE_TTL)
-def _load_historical_positions_one(portfolio: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """Busca posições históricas de uma única carteira (unidade de cache)."""
+def _fetch_historical_positions_one(portfolio: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Busca posições históricas de uma única carteira no ComDinheiro."""
     provider = ComdinheiroProvider()
     return provider.get_data(
         category='comdinheiro',
@@ -391,12 +454,145 @@ def _load_historical_positions_one(portfolio: str, start_date: str, end_date: st
     )
 
 
+def _merge_date_intervals(intervals: list[tuple[pd.Timestamp, pd.Timestamp]]) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Une intervalos fechados de datas que se sobrepõem ou são adjacentes (D e D+1)."""
+    merged: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + pd.Timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_date_intervals(
+    covered: list[tuple[pd.Timestamp, pd.Timestamp]],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Buracos de [start, end] não cobertos pelos intervalos (já unidos) em ``covered``."""
+    gaps: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+    cursor = start
+    for cov_start, cov_end in covered:
+        if cov_end < cursor:
+            continue
+        if cov_start > end:
+            break
+        if cov_start > cursor:
+            gaps.append((cursor, cov_start - pd.Timedelta(days=1)))
+        cursor = max(cursor, cov_end + pd.Timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _comdinheiro_history_expired(entry: dict) -> bool:
+    return (datetime.now() - entry['fetched_at']).total_seconds() > _CACHE_TTL
+
+
+def _comdinheiro_history_entry(portfolio: str) -> Optional[dict]:
+    """Estado vigente da carteira (descarta o que passou do TTL)."""
+    with _COMDINHEIRO_HISTORY_LOCK:
+        entry = _COMDINHEIRO_HISTORY_STATE.get(portfolio)
+        if entry is not None and _comdinheiro_history_expired(entry):
+            _COMDINHEIRO_HISTORY_STATE.pop(portfolio, None)
+            entry = None
+        return entry
+
+
+def _store_comdinheiro_history_entry(portfolio: str, entry: dict) -> None:
+    """Grava o estado da carteira e descarta as carteiras expiradas (que não seriam mais consultadas)."""
+    with _COMDINHEIRO_HISTORY_LOCK:
+        _COMDINHEIRO_HISTORY_STATE[portfolio] = entry
+        for other in [p for p, e in _COMDINHEIRO_HISTORY_STATE.items() if _comdinheiro_history_expired(e)]:
+            del _COMDINHEIRO_HISTORY_STATE[other]
+
+
+def _slice_history_by_date(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    if df is None or df.empty or 'date' not in df.columns:
+        return df if df is not None else pd.DataFrame()
+    dates = pd.to_datetime(df['date'])
+    return df.loc[(dates >= start) & (dates <= end)]
+
+
+def _load_historical_positions_one(portfolio: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Posições históricas de uma carteira via store compartilhado.
+
+    Intervalos já cobertos são servidos por fatiamento; só os buracos de datas
+    são buscados no ComDinheiro e incorporados ao store.
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+
+    with _COMDINHEIRO_HISTORY_LOCK:
+        portfolio_lock = _COMDINHEIRO_HISTORY_PORTFOLIO_LOCKS.setdefault(portfolio, threading.Lock())
+
+    # Um fetch por carteira por vez: outra sessão pedindo o mesmo intervalo
+    # espera e encontra o store já preenchido.
+    with portfolio_lock:
+        entry = _comdinheiro_history_entry(portfolio)
+        covered = entry['intervals'] if entry else []
+        gaps = _missing_date_intervals(covered, start, end)
+        if gaps:
+            chunks = [entry['frame']] if entry and not entry['frame'].empty else []
+            for gap_start, gap_end in gaps:
+                chunk = _fetch_historical_positions_one(
+                    portfolio, gap_start.strftime('%Y-%m-%d'), gap_end.strftime('%Y-%m-%d')
+                )
+                chunk = _slice_history_by_date(chunk, gap_start, gap_end)
+                if chunk is not None and not chunk.empty:
+                    chunks.append(chunk)
+            frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            entry = {
+                'frame': frame,
+                'intervals': _merge_date_intervals(covered + gaps),
+                'fetched_at': entry['fetched_at'] if entry else datetime.now(),
+            }
+            _store_comdinheiro_history_entry(portfolio, entry)
+
+    return _slice_history_by_date(entry['frame'], start, end)
+
+
+def comdinheiro_history_covers(portfolios: Iterable[str], start_date, end_date) -> bool:
+    """
+    True se o store já cobre todas as carteiras no intervalo (servível sem hit no ComDinheiro).
+
+    Args:
+        portfolios: Carteiras.
+        start_date: Data de início.
+        end_date: Data fim.
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+    portfolios = list(portfolios)
+    if not portfolios:
+        return False
+    for portfolio in portfolios:
+        entry = _comdinheiro_history_entry(portfolio)
+        if entry is None or _missing_date_intervals(entry['intervals'], start, end):
+            return False
+    return True
+
+
+def comdinheiro_history_version(portfolios: Iterable[str]) -> tuple:
+    """Versão (carteira, instante do primeiro fetch vigente) — muda quando o store expira."""
+    version = []
+    for portfolio in sorted(portfolios):
+        entry = _comdinheiro_history_entry(portfolio)
+        version.append((portfolio, entry['fetched_at'] if entry else None))
+    return tuple(version)
+
+
 def load_historical_positions_from_comdinheiro(portfolios: tuple, start_date: str, end_date: str) -> pd.DataFrame:
     """
     Carrega posições históricas do ComDinheiro.
 
-    Faz fetch por carteira (cache individual) e, com várias carteiras, em paralelo.
-    Assim, adicionar uma carteira à seleção não refetcha as que já estão em cache.
+    Usa um store por carteira compartilhado entre sessões, que entende contenção
+    de intervalos: pedidos já cobertos são só fatiados e apenas os buracos de
+    datas são buscados. Com várias carteiras, as buscas rodam em paralelo.
 
     Args:
         portfolios: Tuple de portfolios.
@@ -426,6 +622,7 @@ def load_historical_positions_from_comdinheiro(portfolios: tuple, start_date: st
         return pd.DataFrame()
     return pd.concat(frames, ignore_index=True)
 
+
 _COMDINHEIRO_PORTFOLIO_COLUMN_MAP = {
     'date': 'Data',
     'carteira': 'Carteira',
@@ -580,53 +777,201 @@ def load_issuers() -> pd.DataFrame:
     return df
 
 
-@st.cache_data(ttl=_CACHE_TTL)
-def load_positions(days_lookback: int = 4) -> pd.DataFrame:
+def _read_positions_raw(where_filter: list, params: dict) -> pd.DataFrame:
+    """Lê linhas brutas de Inv-Asset Allocation/Posição com o filtro informado."""
+    return read_fibery(
+        table_name="Inv-Asset Allocation/Posição",
+        where_filter=where_filter,
+        params=params,
+        include_fibery_fields=False,
+        fields=_POSITIONS_QUERY_FIELDS,
+    )
+
+
+def _creation_high_water_mark(df_raw: pd.DataFrame) -> pd.Timestamp:
+    """Maior ``creation-date`` (UTC) das linhas brutas, antes de qualquer filtro."""
+    if df_raw.empty or 'creation-date' not in df_raw.columns:
+        return pd.NaT
+    return pd.to_datetime(df_raw['creation-date'], utc=True).max()
+
+
+def _with_latest_positions(state: dict) -> dict:
+    """Materializa no estado o índice portfolio → data mais recente e o recorte."""
+    latest_dates = latest_position_dates(state['df'])
+    return {
+        **state,
+        'latest_dates': latest_dates,
+        'df_latest': slice_latest_positions(state['df'], latest_dates),
+    }
+
+
+def _positions_cutoff(days_lookback: int) -> datetime:
+    return (datetime.now() - timedelta(days=days_lookback)).replace(
+        hour=0, minute=0, second=0, microsecond=0,
+    )
+
+
+def _refresh_positions_incremental(
+    key: tuple,
+    where_filter: list,
+    params: dict,
+    incremental: bool = True,
+) -> dict:
+    """
+    Devolve posições normalizadas, indo ao Fibery só pelo delta desde a última carga.
+
+    Mantém por ``key`` o último frame normalizado e o high-water mark de
+    ``creation-date``. Enquanto a carga completa tiver menos de ``_CACHE_TTL``,
+    busca apenas linhas criadas a partir do high-water mark, normaliza e cruza
+    com a taxonomia só essas linhas e faz o merge com a mesma deduplicação de
+    ``_POSITIONS_DEDUP_SUBSET`` da carga completa (lotes irmãos com ``Saldo``
+    diferente são mantidos). A carga completa periódica captura exclusões e
+    correções no Fibery.
+
+    Junto com o histórico, o estado materializa o índice portfolio → data
+    mais recente (``latest_dates``) e o recorte nessa data (``df_latest``),
+    recalculados só quando o frame muda. Um pedido feito menos de
+    ``_POSITIONS_DELTA_TTL`` depois do último refresh reaproveita o estado,
+    para que ``load_positions`` e ``load_latest_positions`` compartilhem a carga.
+
+    A ida ao Fibery segura só o lock da ``key``: sessões pedindo a mesma carga
+    esperam e reaproveitam o resultado, e as demais seguem em paralelo.
+    """
+    with _POSITIONS_DELTA_LOCK:
+        key_lock = _POSITIONS_DELTA_KEY_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        now = datetime.now()
+        with _POSITIONS_DELTA_LOCK:
+            state = _POSITIONS_DELTA_STATE.get(key)
+        full_reload = (
+            not incremental
+            or state is None
+            or pd.isna(state['high_water_mark'])
+            or (now - state['loaded_at']).total_seconds() > _CACHE_TTL
+        )
+
+        if full_reload:
+            raw = _read_positions_raw(where_filter, params)
+            state = _with_latest_positions({
+                'df': _normalize_positions_df(raw, load_assets(), load_business_days()),
+                'high_water_mark': _creation_high_water_mark(raw),
+                'loaded_at': now,
+                'refreshed_at': now,
+            })
+        elif (now - state['refreshed_at']).total_seconds() < _POSITIONS_DELTA_TTL:
+            return state
+        else:
+            # ">=" em vez de ">": linhas com o mesmo timestamp do high-water mark
+            # voltam e são descartadas pela deduplicação.
+            raw = _read_positions_raw(
+                where_filter=[
+                    "q/and",
+                    where_filter,
+                    [">=", ["fibery/creation-date"], "$highWaterMark"],
+                ],
+                params={
+                    **params,
+                    "$highWaterMark": state['high_water_mark'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                },
+            )
+            state = {**state, 'refreshed_at': now}
+            if not raw.empty:
+                df_new = _normalize_positions_df(raw, load_assets(), load_business_days())
+                df = pd.concat([state['df'], df_new], ignore_index=True)
+                state = _with_latest_positions({
+                    **state,
+                    'df': df.drop_duplicates(subset=_POSITIONS_DEDUP_SUBSET, keep='last'),
+                    'high_water_mark': max(state['high_water_mark'], _creation_high_water_mark(raw)),
+                })
+
+        with _POSITIONS_DELTA_LOCK:
+            _POSITIONS_DELTA_STATE[key] = state
+        return state
+
+
+def _refresh_positions_window(days_lookback: int, cutoff: datetime, incremental: bool) -> dict:
+    return _refresh_positions_incremental(
+        ('lookback', days_lookback),
+        where_filter=[">=", ["Inv-Asset Allocation/Data Posição"], "$dataRecente"],
+        params={"$dataRecente": cutoff.strftime('%Y-%m-%dT00:00:00Z')},
+        incremental=incremental,
+    )
+
+
+@st.cache_data(ttl=_POSITIONS_DELTA_TTL)
+def load_positions(days_lookback: int = 4, incremental: bool = True) -> pd.DataFrame:
     """
     Carrega posições do Fibery e cruza com Inv-Taxonomia/Ativos.
 
     Args:
         days_lookback: Número de dias para buscar posições (padrão: 4).
+        incremental: Se True (padrão), a cada ``_POSITIONS_DELTA_TTL`` busca
+            apenas as linhas criadas desde a última carga; a carga completa
+            continua acontecendo a cada ``_CACHE_TTL``.
 
     Returns:
         DataFrame no schema canônico de posições.
     """
-    data_recente = (datetime.now() - timedelta(days=days_lookback)).strftime('%Y-%m-%dT00:00:00Z')
-    
-    df = read_fibery(
-        table_name="Inv-Asset Allocation/Posição",
-        where_filter=[">=", ["Inv-Asset Allocation/Data Posição"], "$dataRecente"],
-        params={"$dataRecente": data_recente},
-        include_fibery_fields=False,
-        fields=_POSITIONS_QUERY_FIELDS,
-    )
+    cutoff = _positions_cutoff(days_lookback)
+    df = _refresh_positions_window(days_lookback, cutoff, incremental)['df']
 
     track_data_load("positions")
-    return _normalize_positions_df(df, load_assets(), load_business_days())
+    # A janela anda com o relógio: descarta o que saiu dela desde a carga completa.
+    return df[df['Data Posição'] >= cutoff]
 
 
-@st.cache_data(ttl=_CACHE_TTL)
-def load_positions_for_portfolio(portfolio: str) -> pd.DataFrame:
+@st.cache_data(ttl=_POSITIONS_DELTA_TTL)
+def load_latest_positions(
+    days_lookback: int = 4,
+    incremental: bool = True,
+) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Posição mais recente de cada portfolio, materializada junto com o histórico.
+
+    Usa o mesmo estado de ``load_positions`` (mesma carga e mesmo refresh
+    incremental), então responder "posição atual" não exige ``groupby`` nas
+    páginas: o recorte e o índice já vêm prontos.
+
+    Args:
+        days_lookback: Ver ``load_positions``.
+        incremental: Ver ``load_positions``.
+
+    Returns:
+        Tupla ``(df_latest, latest_dates)``: posições de cada portfolio na sua
+        data mais recente (schema canônico) e Series portfolio → essa data.
+    """
+    cutoff = _positions_cutoff(days_lookback)
+    state = _refresh_positions_window(days_lookback, cutoff, incremental)
+
+    track_data_load("positions")
+    latest_dates = state['latest_dates'][state['latest_dates'] >= cutoff]
+    df_latest = state['df_latest']
+    return df_latest[df_latest['Portfolio'].isin(latest_dates.index)], latest_dates
+
+
+@st.cache_data(ttl=_POSITIONS_DELTA_TTL)
+def load_positions_for_portfolio(portfolio: str, incremental: bool = True) -> pd.DataFrame:
     """
     Carrega todo o histórico disponível de posições para um único portfolio
     e cruza com Inv-Taxonomia/Ativos.
 
     Args:
         portfolio: Código do portfolio (ex: 'ABCD').
+        incremental: Ver ``load_positions``.
 
     Returns:
         DataFrame no schema canônico de posições.
     """
-    df = read_fibery(
-        table_name="Inv-Asset Allocation/Posição",
+    df = _refresh_positions_incremental(
+        ('portfolio', portfolio),
         where_filter=["=", ["Inv-Asset Allocation/Portfolio", "Ops-Portfolios/Name"], "$portfolio"],
         params={"$portfolio": portfolio},
-        include_fibery_fields=False,
-        fields=_POSITIONS_QUERY_FIELDS,
-    )
+        incremental=incremental,
+    )['df']
 
     track_data_load("positions_portfolio")
-    return _normalize_positions_df(df, load_assets(), load_business_days())
+    return df
 
 
 @st.cache_data(ttl=_CACHE_TTL)
@@ -1061,36 +1406,152 @@ def _coupon_rate_for_instrumento(instrumento) -> float | None:
     return None
 
 
-@st.cache_data(ttl=_CACHE_TTL)
-def _calculate_durations_cached(
-    codes: tuple[str, ...],
-    maturity_dates: tuple[str, ...],
-    indices: tuple[str, ...],
-    coupon_rates: tuple[float | None, ...],
-    settlement_date: str | None,
-) -> pd.DataFrame:
-    """Cacheia o cálculo em lote de duration por código.
+# Store de duration por instrumento: chave (código, vencimento, índice, cupom)
+# particionada por data de liquidação, em memória e em Parquet no disco para
+# sobreviver a reruns e ser compartilhado entre processos do Streamlit.
+_DURATION_STORE_DIR = os.environ.get(
+    "PERSEVERA_DURATION_STORE_DIR",
+    os.path.join(tempfile.gettempdir(), "persevera_duration_store"),
+)
+_DURATION_KEY_COLUMNS = ['code', 'maturity', 'indice', 'coupon']
+_DURATION_VALUE_COLUMNS = ['macaulay_duration', 'source', 'years_to_maturity']
+_DURATION_STORE_STATE: dict[str, dict] = {}
+_DURATION_STORE_LOCK = threading.Lock()
+# Arquivos de liquidação sem gravação há mais que isso (s) são apagados.
+_DURATION_STORE_MAX_AGE = 7 * 24 * 3600
+_DURATION_STORE_LAST_PRUNE = 0.0
+
+
+def _coupon_key(rate: float | None) -> str:
+    """Cupom como texto na chave do store ('' = sem cupom informado)."""
+    return '' if rate is None or pd.isna(rate) else repr(float(rate))
+
+
+def _empty_duration_store() -> pd.DataFrame:
+    frame = pd.DataFrame(
+        {
+            'code': pd.Series(dtype=object),
+            'maturity': pd.Series(dtype=object),
+            'indice': pd.Series(dtype=object),
+            'coupon': pd.Series(dtype=object),
+            'macaulay_duration': pd.Series(dtype=float),
+            'source': pd.Series(dtype=object),
+            'years_to_maturity': pd.Series(dtype=float),
+            'stored_at': pd.Series(dtype=float),
+        }
+    )
+    return frame.set_index(_DURATION_KEY_COLUMNS)
+
+
+def _duration_store_path(settlement: str) -> str:
+    return os.path.join(_DURATION_STORE_DIR, f"{settlement}.parquet")
+
+
+def _read_duration_store_file(path: str) -> pd.DataFrame:
+    try:
+        return pd.read_parquet(path).set_index(_DURATION_KEY_COLUMNS)
+    except (FileNotFoundError, OSError, ValueError, KeyError):
+        return _empty_duration_store()
+
+
+def _duration_store_frame(settlement: str) -> pd.DataFrame:
+    """Entradas da data de liquidação; relê o Parquet se outro processo o atualizou."""
+    path = _duration_store_path(settlement)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _DURATION_STORE_LOCK:
+        entry = _DURATION_STORE_STATE.get(settlement)
+        if entry is not None and (mtime is None or entry['mtime'] == mtime):
+            return entry['frame']
+        frame = _read_duration_store_file(path) if mtime is not None else _empty_duration_store()
+        _DURATION_STORE_STATE[settlement] = {'frame': frame, 'mtime': mtime}
+        return frame
+
+
+def _save_duration_rows(settlement: str, rows: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta ``rows`` ao store (memória + Parquet atômico) e devolve o store atualizado.
+
+    Relê o arquivo antes de gravar para não descartar o que outro processo
+    acabou de escrever; numa corrida entre processos, o pior caso é recalcular.
+    """
+    path = _duration_store_path(settlement)
+    with _DURATION_STORE_LOCK:
+        on_disk = _read_duration_store_file(path) if os.path.exists(path) else _empty_duration_store()
+        entry = _DURATION_STORE_STATE.get(settlement)
+        parts = [on_disk, rows] if entry is None else [entry['frame'], on_disk, rows]
+        frame = pd.concat([part for part in parts if not part.empty])
+        frame = frame[~frame.index.duplicated(keep='last')]
+
+        mtime = None
+        try:
+            os.makedirs(_DURATION_STORE_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=_DURATION_STORE_DIR, suffix=".tmp")
+            os.close(fd)
+            try:
+                frame.reset_index().to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            # Sem disco gravável o store segue só em memória neste processo.
+            pass
+        _DURATION_STORE_STATE[settlement] = {'frame': frame, 'mtime': mtime}
+    _prune_duration_store()
+    return frame
+
+
+def _prune_duration_store() -> None:
+    """Apaga (no máximo a cada ``_CACHE_TTL``) as partições sem gravação há ``_DURATION_STORE_MAX_AGE``."""
+    global _DURATION_STORE_LAST_PRUNE
+    now = time.time()
+    with _DURATION_STORE_LOCK:
+        if now - _DURATION_STORE_LAST_PRUNE < _CACHE_TTL:
+            return
+        _DURATION_STORE_LAST_PRUNE = now
+        try:
+            names = os.listdir(_DURATION_STORE_DIR)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith((".parquet", ".tmp")):
+                continue
+            path = os.path.join(_DURATION_STORE_DIR, name)
+            try:
+                if now - os.path.getmtime(path) > _DURATION_STORE_MAX_AGE:
+                    os.remove(path)
+                    if name.endswith(".parquet"):
+                        _DURATION_STORE_STATE.pop(name[:-len(".parquet")], None)
+            except OSError:
+                # Outro processo pode ter apagado / regravado o arquivo no meio.
+                pass
+
+
+def _compute_durations(requests: pd.DataFrame, settlement_date: str | None) -> pd.DataFrame:
+    """Chama ``calculate_duration`` em lote para as chaves ausentes do store.
 
     Duration ANBIMA vem em dias úteis; convertemos para anos (/252) para
     ficar na mesma unidade do fallback analítico (``calculated``).
     """
-    maturity_by_code = dict(zip(codes, maturity_dates))
-    indice_by_code = dict(zip(codes, indices))
+    codes = requests['code'].tolist()
     coupon_by_code = {
-        code: rate for code, rate in zip(codes, coupon_rates) if rate is not None
+        code: rate for code, rate in zip(codes, requests['coupon_rate']) if rate is not None
     }
-
     result = calculate_duration(
-        list(codes),
-        maturity_date=maturity_by_code,
+        codes,
+        maturity_date=dict(zip(codes, requests['maturity'])),
         settlement_date=settlement_date,
         coupon_rate=coupon_by_code or None,
-        indice=indice_by_code,
+        indice=dict(zip(codes, requests['indice'])),
         use_anbima=True,
     )
     if isinstance(result, dict):
         result = pd.DataFrame([result], index=[codes[0]])
 
+    result = result.reindex(columns=_DURATION_VALUE_COLUMNS)
     anbima_mask = result['source'] == 'anbima'
     if anbima_mask.any():
         result.loc[anbima_mask, 'macaulay_duration'] = (
@@ -1099,6 +1560,57 @@ def _calculate_durations_cached(
     return result
 
 
+def _calculate_durations_cached(
+    codes: tuple[str, ...],
+    maturity_dates: tuple[str, ...],
+    indices: tuple[str, ...],
+    coupon_rates: tuple[float | None, ...],
+    settlement_date: str | None,
+) -> pd.DataFrame:
+    """Duration em lote por código, servida pelo store por instrumento.
+
+    Só as chaves ausentes (ou que não vieram da ANBIMA e têm mais de
+    ``_CACHE_TTL``, para que um ``calculated``/``no_data`` gravado antes da
+    publicação da ANBIMA seja substituído) vão para ``calculate_duration``; o
+    resultado é montado com um reindex no store. Sem data de liquidação, a
+    chave usa a data de hoje.
+    """
+    if not codes:
+        return pd.DataFrame(columns=_DURATION_VALUE_COLUMNS)
+
+    settlement_key = settlement_date or pd.Timestamp.today().strftime('%Y-%m-%d')
+    requests = pd.DataFrame({
+        'code': list(codes),
+        'maturity': list(maturity_dates),
+        'indice': list(indices),
+        'coupon': [_coupon_key(rate) for rate in coupon_rates],
+        'coupon_rate': list(coupon_rates),
+    })
+    keys = pd.MultiIndex.from_frame(requests[_DURATION_KEY_COLUMNS])
+
+    store = _duration_store_frame(settlement_key)
+    stale = (store['source'] != 'anbima') & (store['stored_at'] < time.time() - _CACHE_TTL)
+    missing = ~keys.isin(store.index[~stale.to_numpy()])
+
+    if missing.any():
+        pending = requests.loc[missing]
+        computed = _compute_durations(pending, settlement_date)
+        # Códigos que o cálculo não devolveu ficam fora do store (tentados de novo).
+        pending = pending[pending['code'].isin(computed.index)]
+        if not pending.empty:
+            values = computed.reindex(pending['code'])
+            rows = pd.DataFrame(
+                {col: values[col].to_numpy() for col in _DURATION_VALUE_COLUMNS},
+                index=pd.MultiIndex.from_frame(pending[_DURATION_KEY_COLUMNS]),
+            )
+            rows['stored_at'] = time.time()
+            store = _save_duration_rows(settlement_key, rows)
+
+    result = store.reindex(keys)[_DURATION_VALUE_COLUMNS]
+    result.index = pd.Index(codes)
+    return result[result['source'].notna()]
+
+
 def enrich_dataframe_with_duration(
     df: pd.DataFrame,
     *,
@@ -1429,43 +1941,72 @@ def scheduled_events_coverage(
     return df_assets[columns].sort_values(by='Saldo', ascending=False).reset_index(drop=True)
 
 
+def _normalize_lookup_keys(values: pd.Series) -> pd.Series:
+    """Ticker/emissor como texto sem espaços; vazios e ``nan`` viram NA."""
+    text = values.astype(str).str.strip()
+    return text.mask(values.isna() | text.eq('') | text.str.upper().eq('NAN'))
+
+
+def _issuer_lookup_series(keys: pd.Series, issuers: pd.Series) -> pd.Series:
+    """Series chave (uppercase) → emissor; em chaves repetidas vale a última."""
+    issuers = _normalize_lookup_keys(issuers)
+    keys = _normalize_lookup_keys(keys).str.upper()
+    valid = keys.notna() & issuers.notna()
+    lookup = pd.Series(issuers[valid].to_numpy(), index=keys[valid].to_numpy(), dtype=object)
+    return lookup[~lookup.index.duplicated(keep='last')]
+
+
+def _taxonomy_version(df_assets: pd.DataFrame) -> str:
+    """Fingerprint das colunas do cadastro que definem o mapa ticker → emissor.
+
+    Sensível à ordem das linhas: em chaves repetidas vale a última.
+    """
+    cols = [c for c in ('Name', 'Alias', 'Nome Devedor', 'Nome Emissor') if c in df_assets.columns]
+    return frame_fingerprint(df_assets[cols].astype(str).reset_index(drop=True))
+
+
 @st.cache_data(ttl=_CACHE_TTL)
-def build_ticker_issuer_lookup() -> dict[str, str]:
+def _issuer_lookup_for_taxonomy(taxonomy_version: str, _df_assets: pd.DataFrame) -> pd.Series:
+    """Mapa ticker → emissor, calculado uma vez por versão do cadastro."""
+    df = get_emissor_column(_df_assets)
+    n = len(df)
+    name = df['Name'] if 'Name' in df.columns else pd.Series(pd.NA, index=df.index)
+    alias = df['Alias'] if 'Alias' in df.columns else pd.Series(pd.NA, index=df.index)
+    # Name e Alias intercalados por linha: mesma precedência da varredura linha a linha.
+    keys = pd.Series(np.column_stack([name.to_numpy(dtype=object), alias.to_numpy(dtype=object)]).ravel())
+    issuers = pd.Series(np.repeat(df['Emissor'].to_numpy(dtype=object), 2)) if n else pd.Series(dtype=object)
+    return _issuer_lookup_series(keys, issuers)
+
+
+def build_ticker_issuer_lookup() -> pd.Series:
     """
     Mapa ticker (Name/Alias, uppercase) → emissor via cadastro Fibery.
 
     Usa a mesma regra de ``get_emissor_column`` (devedor, senão emissor).
+    O resultado é compartilhado entre páginas e sessões por versão do cadastro.
     """
-    df = get_emissor_column(load_assets())
-    lookup: dict[str, str] = {}
-    for _, row in df.iterrows():
-        emissor = row.get('Emissor')
-        if pd.isna(emissor) or not str(emissor).strip():
-            continue
-        emissor_str = str(emissor).strip()
-        for key in (row.get('Name'), row.get('Alias')):
-            if pd.notna(key) and str(key).strip():
-                lookup[str(key).strip().upper()] = emissor_str
-    return lookup
+    df_assets = load_assets()
+    return _issuer_lookup_for_taxonomy(_taxonomy_version(df_assets), df_assets)
 
 
-def issuer_lookup_from_snapshot(snapshot: dict) -> dict[str, str]:
+def issuer_lookup_from_snapshot(snapshot: dict) -> pd.Series:
     """Fallback: ticker → emissor a partir de posições no snapshot."""
-    lookup: dict[str, str] = {}
-    for data in snapshot.values():
-        for posicoes in data.get('posicoes_por_classe', {}).values():
-            for pos in posicoes:
-                ticker = pos.get('nome') or pos.get('ticker') or pos.get('codigo')
-                emissor = pos.get('emissor')
-                if ticker and emissor:
-                    lookup[str(ticker).strip().upper()] = str(emissor).strip()
-    return lookup
+    positions = [
+        (pos.get('nome') or pos.get('ticker') or pos.get('codigo'), pos.get('emissor'))
+        for data in snapshot.values()
+        for posicoes in data.get('posicoes_por_classe', {}).values()
+        for pos in posicoes
+    ]
+    if not positions:
+        return pd.Series(dtype=object)
+    df = pd.DataFrame(positions, columns=['ticker', 'emissor'])
+    return _issuer_lookup_series(df['ticker'], df['emissor'])
 
 
 def enrich_assets_with_issuers(
     df_assets: pd.DataFrame,
-    cadastro_lookup: dict[str, str],
-    snapshot_lookup: dict[str, str] | None = None,
+    cadastro_lookup: pd.Series | dict[str, str],
+    snapshot_lookup: pd.Series | dict[str, str] | None = None,
 ) -> pd.DataFrame:
     """
     Preenche coluna ``Emissor`` a partir do cadastro (e snapshot como fallback).
@@ -1475,18 +2016,17 @@ def enrich_assets_with_issuers(
     df = df_assets.copy()
     if 'Emissor' not in df.columns:
         df['Emissor'] = pd.NA
+    if 'Ticker' not in df.columns or df.empty:
+        return df
 
-    fallback = snapshot_lookup or {}
-    for idx, row in df.iterrows():
-        current = row.get('Emissor')
-        if pd.notna(current) and str(current).strip():
-            continue
-        ticker = str(row.get('Ticker', '')).strip().upper()
-        if not ticker or ticker == 'NAN':
-            continue
-        emissor = cadastro_lookup.get(ticker) or fallback.get(ticker)
-        if emissor:
-            df.at[idx, 'Emissor'] = emissor
+    tickers = _normalize_lookup_keys(df['Ticker']).str.upper()
+    resolved = tickers.map(pd.Series(cadastro_lookup, dtype=object))
+    if snapshot_lookup is not None and len(snapshot_lookup):
+        resolved = resolved.fillna(tickers.map(pd.Series(snapshot_lookup, dtype=object)))
+
+    current = df['Emissor']
+    filled = current.notna() & current.astype(str).str.strip().ne('')
+    df['Emissor'] = current.where(filled | resolved.isna(), resolved)
     return df
 
 
@@ -1497,6 +2037,7 @@ def build_portfolio_snapshot(
     reference_date: datetime | None = None,
     active_carteiras_only: bool = True,
     portfolios: Iterable[str] | None = None,
+    latest_dates: pd.Series | None = None,
 ) -> dict:
     """
     Constrói um snapshot JSON estruturado por portfolio com posições e targets,
@@ -1511,6 +2052,10 @@ def build_portfolio_snapshot(
     incluir qualquer portfolio presente nas posições, ou ``portfolios`` para
     uma seleção explícita.
 
+    ``latest_dates`` (portfolio → data mais recente, ver
+    ``load_latest_positions``) evita recalcular o índice; nesse caso
+    ``df_positions`` pode ser só o recorte mais recente.
+
     O snapshot inclui por portfolio:
     - data_referencia: data do snapshot mais recente disponível para o portfolio
     - patrimonio_brl: patrimônio total
@@ -1540,147 +2085,219 @@ def build_portfolio_snapshot(
 
     hoje = pd.Timestamp((reference_date or datetime.now()).date())
 
-    snapshot = {}
-
-    for portfolio in portfolio_list:
-        df_port = df_positions[df_positions['Portfolio'] == portfolio].copy()
-        latest_date = df_port['Data Posição'].max()
-        data_referencia = str(latest_date.date()) if pd.notna(latest_date) else None
-        df_port = df_port[df_port['Data Posição'] == latest_date].copy()
+    # ------------------------------------------------------------------
+    # Data mais recente por portfolio e recorte das posições nessa data
+    # ------------------------------------------------------------------
+    df_all = df_positions[df_positions['Portfolio'].isin(portfolio_list)]
+    if latest_dates is None:
+        latest_dates = latest_position_dates(df_all)
+    latest_by_portfolio = latest_dates.reindex(portfolio_list)
+    df_latest = slice_latest_positions(df_all, latest_by_portfolio).copy()
+
+    df_latest['Emissor Geral'] = df_latest['Emissor Geral'].fillna('N/A')
+    df_latest['Nome Ativo Completo'] = df_latest['Nome Ativo Completo'].fillna('')
+    df_latest['Classificação Instrumento'] = df_latest['Classificação Instrumento'].fillna('')
+
+    patrimonio_by_portfolio = (
+        df_latest.groupby('Portfolio')['Saldo'].sum()
+        .reindex(portfolio_list, fill_value=0.0)
+    )
 
-        patrimonio = float(df_port['Saldo'].sum()) if not df_port.empty else 0.0
+    # ------------------------------------------------------------------
+    # Posições agregadas por ativo (ordenadas por saldo dentro do portfolio)
+    # ------------------------------------------------------------------
+    has_indexador = 'Indexador' in df_latest.columns
 
-        df_port['Emissor Geral'] = df_port['Emissor Geral'].fillna('N/A')
-        df_port['Nome Ativo Completo'] = df_port['Nome Ativo Completo'].fillna('')
-        df_port['Classificação Instrumento'] = df_port['Classificação Instrumento'].fillna('')
+    group_cols = [
+        'Portfolio', 'Nome Ativo', 'Nome Ativo Completo',
+        'Classificação do Conjunto', 'Classificação Instrumento', 'Emissor Geral',
+    ]
+    agg_dict: dict = {
+        'Saldo': ('Saldo', 'sum'),
+        'Quantidade': ('Quantidade', 'sum'),
+        'Data Vencimento': ('Data Vencimento', 'first'),
+    }
+    if has_indexador:
+        agg_dict['Indexador'] = ('Indexador', 'first')
+
+    df_pos = df_latest.groupby(group_cols, dropna=False).agg(**agg_dict).reset_index()
+    df_pos = df_pos.sort_values(['Portfolio', 'Saldo'], ascending=[True, False])
+    pos_patrimonio = df_pos['Portfolio'].map(patrimonio_by_portfolio).to_numpy(dtype=float)
+    pos_saldo = df_pos['Saldo'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pos_pct = np.where(pos_patrimonio != 0, pos_saldo / pos_patrimonio * 100, 0.0)
+
+    n_ativos_by_portfolio = df_pos.groupby('Portfolio').size()
+    maior_posicao = df_pos.drop_duplicates(subset=['Portfolio'], keep='first').set_index('Portfolio')
+
+    # ------------------------------------------------------------------
+    # Distribuição por classe (portfolio × classe)
+    # ------------------------------------------------------------------
+    saldo_por_classe = (
+        df_latest.groupby(['Portfolio', 'Classificação do Conjunto'])['Saldo'].sum()
+        .unstack('Classificação do Conjunto')
+        .reindex(index=portfolio_list, columns=ASSET_CLASSES_ORDER)
+    )
 
-        has_indexador = 'Indexador' in df_port.columns
+    # ------------------------------------------------------------------
+    # Concentração por emissor e vencimentos (RF)
+    # ------------------------------------------------------------------
+    df_rf = df_latest[df_latest['Classificação Instrumento'].isin(INSTRUMENTOS_RF)]
+    emissores_rf = (
+        df_rf.groupby(['Portfolio', 'Emissor Geral'])['Saldo'].sum()
+        .reset_index()
+        .sort_values(['Portfolio', 'Saldo'], ascending=[True, False])
+    )
+    top3_emissores_rf = emissores_rf.groupby('Portfolio').head(3).groupby('Portfolio')['Saldo'].sum()
+
+    vencimento_buckets = ['0_90d', '91_365d', '366d_mais']
+    vencimentos_by_portfolio = pd.DataFrame(columns=vencimento_buckets, dtype=float)
+    if 'Data Vencimento' in df_rf.columns:
+        df_rf_venc = df_rf[df_rf['Data Vencimento'].notna()]
+        dias_venc = (pd.to_datetime(df_rf_venc['Data Vencimento']) - hoje).dt.days.to_numpy()
+        bucket = np.select(
+            [dias_venc <= 90, dias_venc <= 365],
+            vencimento_buckets[:2],
+            default=vencimento_buckets[2],
+        )
+        vencimentos_by_portfolio = (
+            df_rf_venc['Saldo'].groupby([df_rf_venc['Portfolio'].to_numpy(), bucket]).sum()
+            .unstack()
+            .reindex(columns=vencimento_buckets)
+            .fillna(0.0)
+        )
 
-        group_cols = [
-            'Nome Ativo', 'Nome Ativo Completo',
-            'Classificação do Conjunto', 'Classificação Instrumento', 'Emissor Geral',
-        ]
-        agg_dict: dict = {
-            'Saldo': ('Saldo', 'sum'),
-            'Quantidade': ('Quantidade', 'sum'),
-            'Data Vencimento': ('Data Vencimento', 'first'),
+    # ------------------------------------------------------------------
+    # Targets mais recentes por portfolio/classe
+    # ------------------------------------------------------------------
+    df_targets_latest = df_targets_latest[df_targets_latest['Portfolio'].isin(portfolio_list)]
+
+    # ------------------------------------------------------------------
+    # Custodiantes com posição atual
+    # ------------------------------------------------------------------
+    custodiantes_by_portfolio: dict[str, set] = {}
+    if 'Custodiante Acronimo' in df_latest.columns:
+        df_cust = df_latest[['Portfolio', 'Custodiante Acronimo']].dropna()
+        df_cust = df_cust.assign(
+            **{'Custodiante Acronimo': df_cust['Custodiante Acronimo'].astype(str).str.strip()}
+        ).drop_duplicates()
+        for portfolio, custodiante in zip(df_cust['Portfolio'], df_cust['Custodiante Acronimo']):
+            if custodiante:
+                custodiantes_by_portfolio.setdefault(portfolio, set()).add(custodiante)
+
+    # ------------------------------------------------------------------
+    # Emissão do dict (só leitura dos resultados colunares)
+    # ------------------------------------------------------------------
+    posicoes_by_portfolio: dict[str, dict] = {}
+    pos_columns = [
+        df_pos['Portfolio'].tolist(),
+        df_pos['Classificação do Conjunto'].tolist(),
+        df_pos['Nome Ativo'].tolist(),
+        df_pos['Nome Ativo Completo'].tolist(),
+        df_pos['Classificação Instrumento'].tolist(),
+        df_pos['Emissor Geral'].tolist(),
+        pos_saldo.tolist(),
+        pos_pct.tolist(),
+        df_pos['Data Vencimento'].tolist(),
+        df_pos['Indexador'].tolist() if has_indexador else [None] * len(df_pos),
+    ]
+    for (portfolio, asset_class, nome, nome_completo, instrumento, emissor,
+         saldo, pct_total, dv, ix) in zip(*pos_columns):
+        entry: dict = {
+            'nome': nome,
+            'nome_completo': nome_completo or None,
+            'instrumento': instrumento or None,
+            'emissor': emissor if emissor != 'N/A' else None,
+            'saldo_brl': round(saldo, 2),
+            'pct_total': round(pct_total, 4),
+            'data_vencimento': str(dv)[:10] if pd.notna(dv) else None,
         }
         if has_indexador:
-            agg_dict['Indexador'] = ('Indexador', 'first')
-
-        df_pos = df_port.groupby(group_cols, dropna=False).agg(**agg_dict).reset_index()
-        df_pos = df_pos.sort_values('Saldo', ascending=False)
-
-        posicoes_por_classe: dict = {}
-        for _, row in df_pos.iterrows():
-            asset_class = row['Classificação do Conjunto']
-            pct_total = (row['Saldo'] / patrimonio * 100) if patrimonio else 0.0
-            dv = row['Data Vencimento']
-            entry: dict = {
-                'nome': row['Nome Ativo'],
-                'nome_completo': row['Nome Ativo Completo'] or None,
-                'instrumento': row['Classificação Instrumento'] or None,
-                'emissor': row['Emissor Geral'] if row['Emissor Geral'] != 'N/A' else None,
-                'saldo_brl': round(float(row['Saldo']), 2),
-                'pct_total': round(pct_total, 4),
-                'data_vencimento': str(dv)[:10] if pd.notna(dv) else None,
-            }
-            if has_indexador:
-                ix = row.get('Indexador')
-                entry['indexador'] = ix if pd.notna(ix) and ix else None
-            posicoes_por_classe.setdefault(asset_class, []).append(entry)
+            entry['indexador'] = ix if pd.notna(ix) and ix else None
+        posicoes_by_portfolio.setdefault(portfolio, {}).setdefault(asset_class, []).append(entry)
 
-        saldo_por_classe = df_port.groupby('Classificação do Conjunto')['Saldo'].sum()
+    dist_by_portfolio: dict[str, dict] = {}
+    for portfolio, row in zip(portfolio_list, saldo_por_classe.to_numpy(dtype=float).tolist()):
+        patrimonio = float(patrimonio_by_portfolio[portfolio])
         dist_por_classe: dict = {}
-        for asset_class in ASSET_CLASSES_ORDER:
-            saldo_classe = saldo_por_classe.get(asset_class, np.nan)
+        for asset_class, saldo_classe in zip(ASSET_CLASSES_ORDER, row):
             if pd.notna(saldo_classe) and saldo_classe > 0:
-                pct_classe = float(saldo_classe) / patrimonio * 100 if patrimonio else 0.0
+                pct_classe = saldo_classe / patrimonio * 100 if patrimonio else 0.0
                 dist_por_classe[asset_class] = {
-                    'saldo_brl': round(float(saldo_classe), 2),
+                    'saldo_brl': round(saldo_classe, 2),
                     'pct_total': round(pct_classe, 4),
                 }
+        dist_by_portfolio[portfolio] = dist_por_classe
+
+    targets_by_portfolio: dict[str, dict] = {}
+    for portfolio, classe, target in zip(
+        df_targets_latest['Portfolio'], df_targets_latest['Name'], df_targets_latest['Target'],
+    ):
+        patrimonio = float(patrimonio_by_portfolio[portfolio])
+        target_pct = float(target) * 100 if pd.notna(target) else None
+        atual_info = dist_by_portfolio[portfolio].get(classe)
+        atual_pct = atual_info['pct_total'] if atual_info else 0.0
+        gap_pp = round(target_pct - atual_pct, 4) if target_pct is not None else None
+        gap_brl = round((target_pct - atual_pct) / 100 * patrimonio, 2) \
+            if target_pct is not None and patrimonio else None
+        targets_by_portfolio.setdefault(portfolio, {})[classe] = {
+            'target_pct': round(target_pct, 4) if target_pct is not None else None,
+            'atual_pct': round(atual_pct, 4),
+            'gap_pp': gap_pp,
+            'gap_brl': gap_brl,
+        }
 
-        df_port_targets = df_targets_latest[df_targets_latest['Portfolio'] == portfolio]
-        targets: dict = {}
-        for _, trow in df_port_targets.iterrows():
-            classe = trow['Name']
-            target_pct = float(trow['Target']) * 100 if pd.notna(trow['Target']) else None
-            atual_info = dist_por_classe.get(classe)
-            atual_pct = atual_info['pct_total'] if atual_info else 0.0
-            gap_pp = round(target_pct - atual_pct, 4) if target_pct is not None else None
-            gap_brl = round((target_pct - atual_pct) / 100 * patrimonio, 2) \
-                if target_pct is not None and patrimonio else None
-            targets[classe] = {
-                'target_pct': round(target_pct, 4) if target_pct is not None else None,
-                'atual_pct': round(atual_pct, 4),
-                'gap_pp': gap_pp,
-                'gap_brl': gap_brl,
-            }
-
-        df_rf = df_port[df_port['Classificação Instrumento'].isin(INSTRUMENTOS_RF)]
-        emissores_rf = df_rf.groupby('Emissor Geral')['Saldo'].sum().sort_values(ascending=False)
-        concentracao_emissores_rf = {
-            emissor: {
-                'saldo_brl': round(float(saldo), 2),
-                'pct_total': round(float(saldo) / patrimonio * 100, 4) if patrimonio else 0.0,
-            }
-            for emissor, saldo in emissores_rf.items()
-            if emissor != 'N/A' and saldo > 0
+    emissores_by_portfolio: dict[str, dict] = {}
+    for portfolio, emissor, saldo in zip(
+        emissores_rf['Portfolio'], emissores_rf['Emissor Geral'], emissores_rf['Saldo'].astype(float),
+    ):
+        if emissor == 'N/A' or not saldo > 0:
+            continue
+        patrimonio = float(patrimonio_by_portfolio[portfolio])
+        emissores_by_portfolio.setdefault(portfolio, {})[emissor] = {
+            'saldo_brl': round(saldo, 2),
+            'pct_total': round(saldo / patrimonio * 100, 4) if patrimonio else 0.0,
         }
 
+    snapshot = {}
+
+    for portfolio in portfolio_list:
+        latest_date = latest_by_portfolio.get(portfolio, pd.NaT)
+        data_referencia = str(latest_date.date()) if pd.notna(latest_date) else None
+        patrimonio = float(patrimonio_by_portfolio[portfolio])
+
         vencimentos_rf: dict = {}
-        if 'Data Vencimento' in df_rf.columns:
-            df_rf_venc = df_rf[df_rf['Data Vencimento'].notna()].copy()
-            df_rf_venc['dias_venc'] = (
-                pd.to_datetime(df_rf_venc['Data Vencimento']) - hoje
-            ).dt.days
-            buckets = {
-                '0_90d': df_rf_venc[df_rf_venc['dias_venc'] <= 90]['Saldo'].sum(),
-                '91_365d': df_rf_venc[
-                    (df_rf_venc['dias_venc'] > 90) & (df_rf_venc['dias_venc'] <= 365)
-                ]['Saldo'].sum(),
-                '366d_mais': df_rf_venc[df_rf_venc['dias_venc'] > 365]['Saldo'].sum(),
-            }
+        if portfolio in vencimentos_by_portfolio.index:
             vencimentos_rf = {
                 k: {
                     'saldo_brl': round(float(v), 2),
                     'pct_total': round(float(v) / patrimonio * 100, 4) if patrimonio else 0.0,
                 }
-                for k, v in buckets.items()
+                for k, v in vencimentos_by_portfolio.loc[portfolio].items()
                 if v > 0
             }
 
-        if not df_pos.empty:
-            idx_max = df_pos['Saldo'].idxmax()
-            maior_nome = df_pos.loc[idx_max, 'Nome Ativo']
-            maior_pct = round(float(df_pos.loc[idx_max, 'Saldo']) / patrimonio * 100, 4) \
+        if portfolio in maior_posicao.index:
+            maior_nome = maior_posicao.at[portfolio, 'Nome Ativo']
+            maior_pct = round(float(maior_posicao.at[portfolio, 'Saldo']) / patrimonio * 100, 4) \
                 if patrimonio else 0.0
         else:
             maior_nome = None
             maior_pct = 0.0
 
         top3_emissores_rf_pct = round(
-            float(emissores_rf.head(3).sum()) / patrimonio * 100, 4
-        ) if patrimonio and not emissores_rf.empty else 0.0
+            float(top3_emissores_rf[portfolio]) / patrimonio * 100, 4
+        ) if patrimonio and portfolio in top3_emissores_rf.index else 0.0
 
+        targets = targets_by_portfolio.get(portfolio, {})
         gaps_criticos = [
             f"{cls}: {info['gap_pp']:+.2f}pp"
             for cls, info in targets.items()
             if info['gap_pp'] is not None and abs(info['gap_pp']) >= 2.0
         ]
 
-        if 'Custodiante Acronimo' in df_port.columns:
-            custodiantes = sorted({
-                str(c).strip()
-                for c in df_port['Custodiante Acronimo'].dropna().unique()
-                if str(c).strip()
-            })
-        else:
-            custodiantes = []
-
         metricas = {
-            'n_ativos': int(len(df_pos)),
+            'n_ativos': int(n_ativos_by_portfolio.get(portfolio, 0)),
             'maior_posicao_nome': maior_nome,
             'maior_posicao_pct': maior_pct,
             'top3_emissores_rf_pct': top3_emissores_rf_pct,
@@ -1691,12 +2308,12 @@ def build_portfolio_snapshot(
             'data_referencia': data_referencia,
             'patrimonio_brl': round(patrimonio, 2),
             'metricas': metricas,
-            'distribuicao_por_classe': dist_por_classe,
+            'distribuicao_por_classe': dist_by_portfolio[portfolio],
             'targets_e_gaps': targets,
-            'concentracao_emissores_rf': concentracao_emissores_rf,
+            'concentracao_emissores_rf': emissores_by_portfolio.get(portfolio, {}),
             'vencimentos_rf': vencimentos_rf,
-            'posicoes_por_classe': posicoes_por_classe,
-            'custodiantes': custodiantes,
+            'posicoes_por_classe': posicoes_by_portfolio.get(portfolio, {}),
+            'custodiantes': sorted(custodiantes_by_portfolio.get(portfolio, set())),
         }
 
     return snapshot
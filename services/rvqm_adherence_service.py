@@ -7,6 +7,18 @@ import pandas as pd
 
 RVQM_INSTRUMENTS = ("Ação", "BDR")
 
+# Teto de memória do bloco 3-D (carteiras × datas × tickers) em float64.
+_TWR_BLOCK_BYTES = 256 * 1024 * 1024
+
+_ADHERENCE_BASE_COLS = [
+    "excess_return",
+    "tracking_error",
+    "correlation",
+    "hit_ratio",
+    "active_share",
+    "obs",
+]
+
 
 def pivot_model_weights(equities_portfolio: pd.DataFrame) -> pd.DataFrame:
     """Converte a carteira-modelo (date, code, weight) em matriz de pesos normalizados."""
@@ -106,6 +118,203 @@ def calculate_portfolio_twr(
     return daily
 
 
+def _stack_weights(
+    weights_by_portfolio: dict[str, pd.DataFrame],
+    dates: pd.DatetimeIndex,
+    tickers: pd.Index,
+) -> np.ndarray:
+    """
+    Empilha pesos (carteira × data × ticker) no eixo comum, com a mesma regra de
+    ``calculate_portfolio_twr``: reindex exato nas datas de preço, ffill, 0 antes
+    da primeira data.
+    """
+    n_dates, n_tickers = len(dates), len(tickers)
+    stacked = np.zeros((len(weights_by_portfolio), n_dates, n_tickers))
+    all_dates = np.arange(n_dates)
+    for i, weights in enumerate(weights_by_portfolio.values()):
+        if weights.empty:
+            continue
+        rows = dates.get_indexer(pd.to_datetime(weights.index))
+        cols = tickers.get_indexer(weights.columns)
+        keep_rows = rows >= 0
+        keep_cols = cols >= 0
+        if not keep_rows.any() or not keep_cols.any():
+            continue
+        order = np.argsort(rows[keep_rows], kind="stable")
+        observed_rows = rows[keep_rows][order]
+        values = weights.to_numpy(dtype=float)[keep_rows][order][:, keep_cols]
+        # Linha 0 = zeros (antes da primeira data observada); linha k = k-ésima data observada
+        dense = np.zeros((len(observed_rows) + 1, n_tickers))
+        dense[1:, cols[keep_cols]] = np.nan_to_num(values)
+        # ffill: cada data usa a última data observada até ela
+        stacked[i] = dense[np.searchsorted(observed_rows, all_dates, side="right")]
+    return stacked
+
+
+def calculate_portfolios_twr(
+    weights_by_portfolio: dict[str, pd.DataFrame],
+    prices: pd.DataFrame,
+    *,
+    lag_weights: bool = True,
+) -> pd.DataFrame:
+    """
+    TWR diário de várias carteiras de uma vez (mesma regra de ``calculate_portfolio_twr``).
+
+    Retornos dos ativos são calculados uma única vez; os pesos de todas as carteiras
+    são empilhados num array 3-D (carteira × data × ticker) no eixo comum de datas
+    de preço e tickers, processado em blocos para limitar memória.
+
+    Args:
+        weights_by_portfolio: Pesos (index=date, columns=ticker) por carteira.
+        prices: Preços de fechamento (index=date, columns=ticker).
+        lag_weights: Se True, usa pesos do dia anterior com retorno de hoje.
+
+    Returns:
+        DataFrame (date × carteira). Carteiras sem pesos ou sem ticker com preço
+        ficam de fora.
+    """
+    if not weights_by_portfolio or prices.empty:
+        return pd.DataFrame(index=pd.to_datetime(prices.index))
+
+    dates = pd.DatetimeIndex(pd.to_datetime(prices.index))
+    all_tickers = pd.Index(sorted({t for w in weights_by_portfolio.values() for t in w.columns}))
+    tickers = all_tickers.intersection(prices.columns)
+    names = [
+        name for name, w in weights_by_portfolio.items()
+        if not w.empty and len(w.columns.intersection(tickers)) > 0
+    ]
+    if not names or tickers.empty:
+        return pd.DataFrame(index=dates)
+
+    price_values = prices[tickers].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_returns = price_values[1:] / price_values[:-1] - 1
+    asset_returns = np.vstack([np.full((1, len(tickers)), np.nan), asset_returns])
+    asset_returns = np.nan_to_num(asset_returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    block_size = max(1, _TWR_BLOCK_BYTES // max(1, len(dates) * len(tickers) * 8))
+    out = np.empty((len(dates), len(names)))
+    for start in range(0, len(names), block_size):
+        block_names = names[start:start + block_size]
+        stacked = _stack_weights(
+            {name: weights_by_portfolio[name] for name in block_names}, dates, tickers
+        )
+        if lag_weights:
+            stacked = np.concatenate(
+                [np.zeros((len(block_names), 1, len(tickers))), stacked[:, :-1]], axis=1
+            )
+        out[:, start:start + len(block_names)] = np.einsum("ptn,tn->tp", stacked, asset_returns)
+
+    return pd.DataFrame(out, index=dates, columns=names)
+
+
+def _latest_common_row(
+    weights: pd.DataFrame,
+    other_index: pd.DatetimeIndex,
+) -> tuple[pd.Timestamp, np.ndarray] | None:
+    index = pd.DatetimeIndex(pd.to_datetime(weights.index))
+    common_dates = index.intersection(other_index)
+    if common_dates.empty:
+        return None
+    date = common_dates.max()
+    return date, weights.iloc[index.get_loc(date)].to_numpy(dtype=float)
+
+
+def _active_share_rows(
+    portfolio_weights: dict[str, pd.DataFrame],
+    strategy_weights: dict[str, pd.DataFrame],
+    names: list[str],
+) -> np.ndarray:
+    """Active share de cada carteira na data mais recente comum com a estratégia."""
+    tickers = pd.Index(sorted(
+        {t for w in portfolio_weights.values() for t in w.columns}
+        | {t for w in strategy_weights.values() for t in w.columns}
+    ))
+    # Eixo comum (carteiras × tickers) e uma única redução
+    wp = np.zeros((len(names), len(tickers)))
+    wb = np.zeros((len(names), len(tickers)))
+    valid = np.zeros(len(names), dtype=bool)
+
+    strategy_index_cache: dict[int, pd.DatetimeIndex] = {}
+    for i, name in enumerate(names):
+        pw = portfolio_weights.get(name, pd.DataFrame())
+        bw = strategy_weights.get(name, pd.DataFrame())
+        if pw.empty or bw.empty:
+            continue
+        b_index = strategy_index_cache.get(id(bw))
+        if b_index is None:
+            b_index = strategy_index_cache[id(bw)] = pd.DatetimeIndex(pd.to_datetime(bw.index))
+        latest = _latest_common_row(pw, b_index)
+        if latest is None:
+            continue
+        date, p_row = latest
+        wp[i, tickers.get_indexer(pw.columns)] = np.nan_to_num(p_row)
+        wb[i, tickers.get_indexer(bw.columns)] = np.nan_to_num(
+            bw.iloc[b_index.get_loc(date)].to_numpy(dtype=float)
+        )
+        valid[i] = True
+
+    active = 0.5 * np.abs(wp - wb).sum(axis=1)
+    return np.where(valid, active, np.nan)
+
+
+def calculate_adherence_metrics_batch(
+    portfolio_returns: pd.DataFrame,
+    strategy_returns: pd.DataFrame,
+    *,
+    trading_days: int = 252,
+) -> pd.DataFrame:
+    """
+    ``calculate_adherence_metrics`` para todas as carteiras de uma vez.
+
+    Args:
+        portfolio_returns: Retornos diários (date × carteira).
+        strategy_returns: Retornos da estratégia de cada carteira (date × carteira,
+            mesmas colunas). Só datas com os dois retornos entram no cálculo.
+
+    Returns:
+        DataFrame (carteira × métricas) com excess_return, tracking_error,
+        correlation, hit_ratio e obs.
+    """
+    index = portfolio_returns.index.union(strategy_returns.index)
+    port = portfolio_returns.reindex(index).to_numpy(dtype=float)
+    strat = strategy_returns.reindex(index=index, columns=portfolio_returns.columns).to_numpy(dtype=float)
+
+    mask = ~np.isnan(port) & ~np.isnan(strat)
+    obs = mask.sum(axis=0).astype(float)
+    p = np.where(mask, port, 0.0)
+    b = np.where(mask, strat, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cum_port = np.where(mask, 1 + port, 1.0).prod(axis=0) - 1
+        cum_strat = np.where(mask, 1 + strat, 1.0).prod(axis=0) - 1
+
+        mean_p = p.sum(axis=0) / obs
+        mean_b = b.sum(axis=0) / obs
+        dp = np.where(mask, port - mean_p, 0.0)
+        db = np.where(mask, strat - mean_b, 0.0)
+        excess_dev = dp - db
+        tracking_error = np.sqrt(trading_days) * np.sqrt((excess_dev ** 2).sum(axis=0) / (obs - 1))
+        correlation = (dp * db).sum(axis=0) / np.sqrt((dp ** 2).sum(axis=0) * (db ** 2).sum(axis=0))
+        hit_ratio = (mask & (np.sign(port) == np.sign(strat))).sum(axis=0) / obs
+
+    metrics = pd.DataFrame(
+        {
+            "excess_return": cum_port - cum_strat,
+            "tracking_error": tracking_error,
+            "correlation": correlation,
+            "hit_ratio": hit_ratio,
+            "obs": obs,
+        },
+        index=portfolio_returns.columns,
+    )
+    # Mesmo contrato de calculate_adherence_metrics: < 2 observações → NaN e obs 0
+    too_short = obs < 2
+    metrics.loc[too_short, ["excess_return", "tracking_error", "correlation", "hit_ratio"]] = np.nan
+    metrics.loc[too_short, "obs"] = 0.0
+    return metrics
+
+
 def calculate_active_share(
     portfolio_weights: pd.DataFrame,
     benchmark_weights: pd.DataFrame,
@@ -187,38 +396,29 @@ def build_adherence_summary(
     ``strategy_returns`` / ``strategy_weights`` podem ser únicos (todas as carteiras
     vs a mesma estratégia) ou dicts indexados pelo nome da carteira.
     """
-    rows = []
-    for name, rets in portfolio_returns.items():
-        strat_rets = (
-            strategy_returns[name]
-            if isinstance(strategy_returns, dict)
-            else strategy_returns
-        )
-        strat_weights = (
-            strategy_weights[name]
-            if isinstance(strategy_weights, dict)
-            else strategy_weights
-        )
-        metrics = calculate_adherence_metrics(rets, strat_rets)
-        weights = portfolio_weights.get(name, pd.DataFrame())
-        metrics["active_share"] = calculate_active_share(weights, strat_weights)
-        metrics["carteira"] = name
-        if strategy_by_portfolio is not None:
-            metrics["estrategia"] = strategy_by_portfolio.get(name, "")
-        rows.append(metrics)
-
-    base_cols = [
-        "excess_return",
-        "tracking_error",
-        "correlation",
-        "hit_ratio",
-        "active_share",
-        "obs",
-    ]
-    if not rows:
-        cols = (["carteira", "estrategia"] + base_cols) if strategy_by_portfolio is not None else (["carteira"] + base_cols)
+    names = list(portfolio_returns)
+    if not names:
+        cols = (["carteira", "estrategia"] + _ADHERENCE_BASE_COLS) if strategy_by_portfolio is not None else (["carteira"] + _ADHERENCE_BASE_COLS)
         return pd.DataFrame(columns=cols)
 
-    summary = pd.DataFrame(rows).set_index("carteira")
-    out_cols = (["estrategia"] + base_cols) if "estrategia" in summary.columns else base_cols
-    return summary[out_cols]
+    def _per_portfolio(value, name):
+        return value[name] if isinstance(value, dict) else value
+
+    port_panel = pd.concat(
+        {name: portfolio_returns[name] for name in names}, axis=1
+    ).reindex(columns=names)
+    strat_panel = pd.concat(
+        {name: _per_portfolio(strategy_returns, name) for name in names}, axis=1
+    ).reindex(columns=names)
+
+    summary = calculate_adherence_metrics_batch(port_panel, strat_panel)
+    summary["active_share"] = _active_share_rows(
+        portfolio_weights,
+        {name: _per_portfolio(strategy_weights, name) for name in names},
+        names,
+    )
+    summary.index = pd.Index(names, name="carteira")
+    if strategy_by_portfolio is not None:
+        summary["estrategia"] = [strategy_by_portfolio.get(name, "") for name in names]
+        return summary[["estrategia"] + _ADHERENCE_BASE_COLS]
+    return summary[_ADHERENCE_BASE_COLS]
@@ -0,0 +1,399 @@
+"""Store local de séries (Parquet) compartilhado na frente de ``get_series``.
+
+Cada view tinha o seu ``@st.cache_data`` em volta de
+:func:`persevera_tools.data.get_series`, com chave igual à tupla exata de
+códigos + data inicial. O mesmo indicador era buscado de novo a cada página,
+a cada mudança de data e em cada processo do Streamlit.
+
+Este módulo mantém um store colunar em disco, uma pasta por ``(field, code)``
+particionada por ano::
+
+    <STORE_DIR>/<field>/<code>/2024.parquet
+    <STORE_DIR>/<field>/<code>/_meta.json   # cobertura já buscada no banco
+    <STORE_DIR>/<field>/<code>/_lock        # lock entre processos da série
+
+:func:`load_series` consulta a cobertura de cada par, vai ao banco só pelos
+intervalos que faltam (agrupando pares com o mesmo intervalo numa única
+chamada) sem segurar lock durante a busca e responde lendo os Parquets com
+memory-map. Partições e cobertura de cada série são mescladas e gravadas
+(arquivo temporário + ``os.replace``) sob um lock por série, entre threads e
+entre processos, relendo o estado atual do disco antes de gravar. A cauda
+recente é rebuscada depois de ``TAIL_REFRESH_TTL`` segundos para capturar
+revisões e o dado do dia.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads do processo
+    fcntl = None
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from persevera_tools.data import get_series
+
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.environ.get(
+    "PERSEVERA_SERIES_STORE_DIR",
+    os.path.join(tempfile.gettempdir(), "persevera_series_store"),
+)
+
+# Idade máxima (s) da última busca da cauda antes de rebuscá-la no banco.
+TAIL_REFRESH_TTL = 3600
+# Janela rebuscada na cauda: cobre revisões de indicadores mensais.
+TAIL_REFRESH_DAYS = 45
+
+# Início usado quando a view não informa ``start_date`` (histórico completo).
+_HISTORY_START = pd.Timestamp("1900-01-01")
+_META_FILE = "_meta.json"
+_LOCK_FILE = "_lock"
+
+
+def _safe_name(value: str) -> str:
+    """Nome de pasta seguro para códigos com ``/``, ``:`` ou espaços."""
+    return "".join(c if c.isalnum() or c in "-_.+" else "_" for c in str(value))
+
+
+def _atomic_write_bytes(path: str, payload: bytes) -> None:
+    """Grava em arquivo temporário e troca com ``os.replace`` (atômico no mesmo FS)."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _split_fetched(
+    raw: pd.DataFrame | pd.Series | None,
+    codes: list[str],
+    fields: list[str],
+) -> dict[tuple[str, str], pd.Series]:
+    """Quebra o retorno de ``get_series`` em uma Series por ``(code, field)``.
+
+    ``get_series`` devolve Series para um único código/field, colunas = códigos
+    para um field e MultiIndex ``(code, field)`` para vários fields.
+    """
+    if raw is None or raw.empty:
+        return {}
+
+    if isinstance(raw, pd.Series):
+        frame = raw.to_frame()
+        frame.columns = pd.MultiIndex.from_tuples([(codes[0], fields[0])])
+    elif isinstance(raw.columns, pd.MultiIndex):
+        frame = raw
+    elif len(fields) == 1:
+        frame = raw.copy()
+        frame.columns = pd.MultiIndex.from_product([frame.columns, fields])
+    else:
+        frame = raw.copy()
+        frame.columns = pd.MultiIndex.from_product([codes[:1], frame.columns])
+
+    frame.index = pd.to_datetime(frame.index).normalize()
+    out: dict[tuple[str, str], pd.Series] = {}
+    for code, field in frame.columns:
+        series = pd.to_numeric(frame[(code, field)], errors="coerce").dropna()
+        out[(str(code), str(field))] = series[~series.index.duplicated(keep="last")].sort_index()
+    return out
+
+
+class SeriesStore:
+    """Store colunar em disco, por ``(code, field)`` e particionado por ano."""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    # ------------------------------------------------------------------
+    # Layout em disco
+    # ------------------------------------------------------------------
+
+    def _series_dir(self, code: str, field: str) -> str:
+        return os.path.join(self.root, _safe_name(field), _safe_name(code))
+
+    @contextmanager
+    def _series_lock(self, code: str, field: str):
+        """Lock exclusivo da série: entre threads do processo e, com ``fcntl``, entre processos."""
+        with self._lock:
+            key_lock = self._key_locks.setdefault((code, field), threading.Lock())
+        with key_lock:
+            if fcntl is None:
+                yield
+                return
+            directory = self._series_dir(code, field)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, _LOCK_FILE), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_meta(self, code: str, field: str) -> dict | None:
+        path = os.path.join(self._series_dir(code, field), _META_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return {
+            "start": pd.Timestamp(meta["start"]),
+            "end": pd.Timestamp(meta["end"]),
+            "fetched_at": float(meta.get("fetched_at", 0.0)),
+        }
+
+    def _write_meta(self, code: str, field: str, meta: dict) -> None:
+        payload = {
+            "start": meta["start"].strftime("%Y-%m-%d"),
+            "end": meta["end"].strftime("%Y-%m-%d"),
+            "fetched_at": meta["fetched_at"],
+        }
+        path = os.path.join(self._series_dir(code, field), _META_FILE)
+        _atomic_write_bytes(path, json.dumps(payload).encode("utf-8"))
+
+    def _read_partition(self, path: str) -> pd.Series:
+        table = pq.read_table(path, memory_map=True)
+        df = table.to_pandas()
+        return pd.Series(df["value"].to_numpy(), index=pd.DatetimeIndex(df["date"]))
+
+    def _write_partition(self, path: str, series: pd.Series) -> None:
+        table = pa.table({
+            "date": pa.array(series.index.to_numpy(dtype="datetime64[ns]")),
+            "value": pa.array(series.to_numpy(dtype="float64")),
+        })
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink)
+        _atomic_write_bytes(path, sink.getvalue().to_pybytes())
+
+    # ------------------------------------------------------------------
+    # Leitura e escrita por série
+    # ------------------------------------------------------------------
+
+    def read(self, code: str, field: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        """Lê ``[start, end]`` de uma série só nas partições (anos) necessárias."""
+        directory = self._series_dir(code, field)
+        parts = []
+        for year in range(start.year, end.year + 1):
+            path = os.path.join(directory, f"{year}.parquet")
+            if os.path.exists(path):
+                parts.append(self._read_partition(path))
+        if not parts:
+            return pd.Series(dtype="float64")
+        series = pd.concat(parts).sort_index()
+        return series.loc[start:end]
+
+    def _merge_fetched(
+        self,
+        code: str,
+        field: str,
+        series: pd.Series,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> None:
+        """Substitui ``[start, end]`` pelos dados buscados, reescrevendo só os anos afetados.
+
+        Deve ser chamado com :meth:`_series_lock` da série.
+        """
+        directory = self._series_dir(code, field)
+        os.makedirs(directory, exist_ok=True)
+        for year in range(start.year, end.year + 1):
+            path = os.path.join(directory, f"{year}.parquet")
+            fresh = series[series.index.year == year]
+            if os.path.exists(path):
+                existing = self._read_partition(path)
+                keep = (existing.index < start) | (existing.index > end)
+                fresh = pd.concat([existing[keep], fresh]).sort_index()
+            if fresh.empty:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            self._write_partition(path, fresh)
+
+    # ------------------------------------------------------------------
+    # Sincronização com o banco
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _missing_ranges(
+        meta: dict | None,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        now: float,
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """Intervalos de ``[start, end]`` ainda não cobertos (ou com cauda vencida)."""
+        if meta is None:
+            return [(start, end)]
+
+        ranges = []
+        if start < meta["start"]:
+            ranges.append((start, meta["start"] - pd.Timedelta(days=1)))
+
+        tail_stale = now - meta["fetched_at"] > TAIL_REFRESH_TTL
+        if end > meta["end"] or (tail_stale and end >= meta["end"]):
+            tail_start = max(meta["start"], meta["end"] - pd.Timedelta(days=TAIL_REFRESH_DAYS))
+            ranges.append((tail_start, end))
+        return ranges
+
+    def _fetch_range(
+        self,
+        keys: list[tuple[str, str]],
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> dict[tuple[str, str], pd.Series]:
+        codes = sorted({code for code, _ in keys})
+        fields = sorted({field for _, field in keys})
+        raw = get_series(
+            codes,
+            start_date=start.strftime("%Y-%m-%d"),
+            end_date=end.strftime("%Y-%m-%d"),
+            field=fields,
+        )
+        return _split_fetched(raw, codes, fields)
+
+    @staticmethod
+    def _merged_meta(
+        meta: dict | None,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        fetched_at: float,
+    ) -> dict:
+        """Cobertura após gravar ``[start, end]`` sobre ``meta`` (lida sob o lock)."""
+        if meta is None:
+            return {"start": start, "end": end, "fetched_at": fetched_at}
+        one_day = pd.Timedelta(days=1)
+        if start > meta["end"] + one_day or end < meta["start"] - one_day:
+            # Intervalo desconexo (outro processo mudou a cobertura no meio da
+            # busca): mantém a cobertura atual; os dados gravados fora dela
+            # são só rebuscados depois.
+            return meta
+        return {
+            "start": min(meta["start"], start),
+            "end": max(meta["end"], end),
+            "fetched_at": fetched_at if end >= meta["end"] else meta["fetched_at"],
+        }
+
+    def sync(
+        self,
+        codes: list[str],
+        fields: list[str],
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> None:
+        """Garante que ``[start, end]`` de todos os pares esteja no store.
+
+        A busca no banco roda sem lock; cada série é mesclada depois sob o seu
+        lock, sobre a cobertura relida do disco, para que escritas concorrentes
+        (de outras threads ou processos) não se sobrescrevam.
+        """
+        now = time.time()
+        metas = {(c, f): self._read_meta(c, f) for c in codes for f in fields}
+
+        pending: dict[tuple[pd.Timestamp, pd.Timestamp], list[tuple[str, str]]] = defaultdict(list)
+        for key, meta in metas.items():
+            for rng in self._missing_ranges(meta, start, end, now):
+                pending[rng].append(key)
+
+        for (rng_start, rng_end), keys in pending.items():
+            fetched = self._fetch_range(keys, rng_start, rng_end)
+            for key in keys:
+                code, field = key
+                series = fetched.get(key, pd.Series(dtype="float64"))
+                with self._series_lock(code, field):
+                    self._merge_fetched(code, field, series.loc[rng_start:rng_end], rng_start, rng_end)
+                    meta = self._merged_meta(self._read_meta(code, field), rng_start, rng_end, now)
+                    self._write_meta(code, field, meta)
+
+
+_STORE: Optional[SeriesStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> SeriesStore:
+    """Instância única do store por processo."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = SeriesStore()
+        return _STORE
+
+
+def load_series(
+    codes: str | Iterable[str],
+    start_date=None,
+    end_date=None,
+    field: str | Iterable[str] = "close",
+) -> pd.DataFrame:
+    """
+    Substituto de ``get_series`` servido pelo store local.
+
+    Busca no banco apenas os pares ``(code, field)`` e intervalos ausentes do
+    store; o restante é lido dos Parquets em disco.
+
+    Args:
+        codes: Código ou lista de códigos.
+        start_date: Data inicial (``None`` = histórico completo).
+        end_date: Data final (``None`` = hoje).
+        field: Field único ou lista de fields.
+
+    Returns:
+        DataFrame indexado por data. Com ``field`` string, as colunas são os
+        códigos; com lista de fields, MultiIndex ``(code, field)``. Diferente
+        de ``get_series``, um único código também volta como DataFrame.
+    """
+    code_list = [codes] if isinstance(codes, str) else [str(c) for c in codes]
+    field_list = [field] if isinstance(field, str) else list(field)
+    if not code_list or not field_list:
+        return pd.DataFrame()
+
+    today = pd.Timestamp.today().normalize()
+    start = pd.Timestamp(start_date).normalize() if start_date is not None else _HISTORY_START
+    end = min(pd.Timestamp(end_date).normalize(), today) if end_date is not None else today
+    if start > end:
+        return pd.DataFrame()
+
+    store = get_store()
+    try:
+        store.sync(code_list, field_list, start, end)
+    except OSError as e:
+        # Disco indisponível/somente leitura: segue direto no banco.
+        logger.warning("Series store indisponível (%s); usando get_series direto.", e)
+        df = get_series(code_list, start_date=start_date, end_date=end_date, field=field)
+        # Com um único código get_series devolve Series; mantém o contrato de DataFrame
+        return df.to_frame(code_list[0]) if isinstance(df, pd.Series) else df
+
+    columns = {}
+    for code in code_list:
+        for f in field_list:
+            series = store.read(code, f, start, end)
+            if not series.empty:
+                columns[(code, f)] = series
+    if not columns:
+        return pd.DataFrame()
+
+    df = pd.concat(columns, axis=1).sort_index()
+    df.columns = df.columns.set_names(["code", "field"])
+    df.index.name = "date"
+    if isinstance(field, str):
+        df = df.droplevel("field", axis=1)
+    return df
@@ -0,0 +1,218 @@
+"""Execução paralela e cacheada do best-subset style analysis.
+
+A view rodava ``BestSubsetStyleAnalysis.run_analysis`` para todos os fundos
+de uma vez, em sequência, e refazia tudo a cada clique em "Run". Aqui cada
+fundo vira uma tarefa independente:
+
+- a regressão de um fundo usa só as colunas dele e dos fatores (o
+  ``dropna`` não depende mais dos outros fundos da comparação);
+- o resultado fica num cache do processo, compartilhado entre sessões, com
+  chave ``(fundo, fatores, janela mín., janela máx., métrica, última data)``;
+- só os fundos sem resultado em cache vão para um pool de processos.
+
+Assim, incluir um fundo numa comparação calcula apenas esse fundo.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import pandas as pd
+
+from persevera_style_analysis.core.best_subset_style_analysis import BestSubsetStyleAnalysis
+
+
+logger = logging.getLogger(__name__)
+
+# Validade (s) de um resultado em cache; cobre revisões de cota no mesmo dia.
+_RESULT_TTL = 3600
+# Resultados mantidos em memória (os menos usados recentemente saem primeiro).
+_MAX_CACHED_RESULTS = 512
+_MAX_WORKERS = int(os.environ.get("PERSEVERA_STYLE_ANALYSIS_WORKERS", min(4, os.cpu_count() or 1)))
+
+_RESULTS: "OrderedDict[tuple, tuple[float, pd.DataFrame]]" = OrderedDict()
+_RESULTS_LOCK = threading.Lock()
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+def _result_key(
+    fund: str,
+    factor_cols: tuple,
+    min_window: int,
+    max_window: int,
+    selection_metric: str,
+    last_date: pd.Timestamp,
+) -> tuple:
+    return (fund, factor_cols, int(min_window), int(max_window), selection_metric, pd.Timestamp(last_date))
+
+
+def _get_cached(key: tuple) -> Optional[pd.DataFrame]:
+    with _RESULTS_LOCK:
+        entry = _RESULTS.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > _RESULT_TTL:
+            del _RESULTS[key]
+            return None
+        _RESULTS.move_to_end(key)
+        return result
+
+
+def _store(key: tuple, result: pd.DataFrame) -> None:
+    with _RESULTS_LOCK:
+        _RESULTS[key] = (time.time(), result)
+        _RESULTS.move_to_end(key)
+        while len(_RESULTS) > _MAX_CACHED_RESULTS:
+            _RESULTS.popitem(last=False)
+
+
+# ==============================================================================
+# EXECUÇÃO
+# ==============================================================================
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Pool único por processo; ``spawn`` evita herdar as threads do Streamlit."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(
+                max_workers=_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def _reset_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def _run_fund(
+    fund: str,
+    returns: pd.DataFrame,
+    factor_cols: list,
+    min_window: int,
+    max_window: int,
+    selection_metric: str,
+) -> Optional[pd.DataFrame]:
+    """Roda a análise do período mais recente para um único fundo (executa no worker)."""
+    analysis = BestSubsetStyleAnalysis(returns_data=returns, fund_cols=[fund], factor_cols=factor_cols)
+    results = analysis.run_analysis(
+        min_window=min_window,
+        max_window=max_window,
+        selection_metric=selection_metric,
+        most_recent_only=True,
+    )
+    return results.get(fund)
+
+
+def _fund_returns(returns: pd.DataFrame, fund: str, funds: list) -> pd.DataFrame:
+    """Retornos do fundo e dos fatores (sem os demais fundos), sem datas faltantes."""
+    others = [f for f in funds if f != fund and f in returns.columns]
+    return returns.drop(columns=others).dropna(how='any')
+
+
+def run_style_analysis(
+    returns: pd.DataFrame,
+    funds: list,
+    factor_cols: list,
+    min_window: int,
+    max_window: int,
+    selection_metric: str,
+) -> tuple[dict, dict]:
+    """
+    Best-subset style analysis (período mais recente) para vários fundos.
+
+    Args:
+        returns: Retornos (datas × fundos e fatores), como em ``helpers.prepare_data``.
+        funds: Fundos a analisar (colunas de ``returns``).
+        factor_cols: Fatores candidatos da regressão.
+        min_window: Menor janela testada.
+        max_window: Maior janela testada.
+        selection_metric: 'aic', 'bic' ou 'adjr2'.
+
+    Returns:
+        Tupla ``(resultados, erros)``: fundo → DataFrame de ``run_analysis`` e
+        fundo → mensagem de erro. Fundos sem dados não aparecem em nenhum dos dois.
+    """
+    factor_cols = list(factor_cols)
+    factor_key = tuple(factor_cols)
+    results: dict = {}
+    errors: dict = {}
+    pending: dict = {}
+
+    for fund in funds:
+        if fund not in returns.columns:
+            continue
+        fund_returns = _fund_returns(returns, fund, funds)
+        if fund_returns.empty:
+            continue
+        key = _result_key(fund, factor_key, min_window, max_window, selection_metric, fund_returns.index.max())
+        cached = _get_cached(key)
+        if cached is not None:
+            results[fund] = cached
+        else:
+            pending[fund] = (key, fund_returns)
+
+    if not pending:
+        return results, errors
+
+    def _collect(fund, key, result):
+        if result is not None:
+            _store(key, result)
+            results[fund] = result
+
+    if len(pending) == 1 or _MAX_WORKERS <= 1:
+        for fund, (key, fund_returns) in pending.items():
+            try:
+                _collect(fund, key, _run_fund(fund, fund_returns, factor_cols, min_window, max_window, selection_metric))
+            except Exception as e:
+                errors[fund] = str(e)
+        return results, errors
+
+    try:
+        pool = _get_pool()
+        futures = {
+            pool.submit(_run_fund, fund, fund_returns, factor_cols, min_window, max_window, selection_metric): (fund, key)
+            for fund, (key, fund_returns) in pending.items()
+        }
+        for future in as_completed(futures):
+            fund, key = futures[future]
+            try:
+                _collect(fund, key, future.result())
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                errors[fund] = str(e)
+    except BrokenProcessPool:
+        # Worker morto (ex.: falta de memória): recria o pool na próxima chamada
+        # e termina em sequência os fundos que ficaram sem resultado.
+        logger.warning("Pool do style analysis quebrou; executando em sequência.")
+        _reset_pool()
+        for fund, (key, fund_returns) in pending.items():
+            if fund in results or fund in errors:
+                continue
+            try:
+                _collect(fund, key, _run_fund(fund, fund_returns, factor_cols, min_window, max_window, selection_metric))
+            except Exception as e:
+                errors[fund] = str(e)
+
+    return results, errors
@@ -0,0 +1,122 @@
+"""Batch backtest engine for fixed-weight portfolios.
+
+Takes the asset returns panel once plus a (portfolios × assets) weight matrix
+and computes every portfolio's return series with a single masked matrix
+product, so dozens of candidate allocations can be compared interactively.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+RebalanceFrequency = Literal["daily", "monthly", "quarterly"]
+
+_PERIOD_BY_FREQUENCY: dict[str, str] = {
+    "monthly": "M",
+    "quarterly": "Q",
+}
+
+
+def rebalance_segments(index: pd.DatetimeIndex, frequency: RebalanceFrequency = "daily") -> np.ndarray:
+    """
+    Integer id of the holding period each date belongs to.
+
+    Weights are reset to target at the start of every segment: each day for
+    'daily' (constant mix), the first trading day of each month/quarter otherwise.
+    """
+    if frequency == "daily":
+        return np.arange(len(index))
+    period = _PERIOD_BY_FREQUENCY.get(frequency)
+    if period is None:
+        raise ValueError(f"Unsupported rebalance frequency '{frequency}'.")
+    periods = pd.DatetimeIndex(index).to_period(period).asi8
+    return np.r_[0, np.cumsum(periods[1:] != periods[:-1])]
+
+
+def _segment_start_rows(segments: np.ndarray) -> np.ndarray:
+    """Row of each segment's first date, broadcast to every date of the segment."""
+    is_start = np.r_[True, segments[1:] != segments[:-1]]
+    return np.maximum.accumulate(np.where(is_start, np.arange(len(segments)), 0))
+
+
+def _drift_factors(returns: np.ndarray, segments: np.ndarray, start_rows: np.ndarray) -> np.ndarray:
+    """
+    Growth of each asset since the start of its segment, up to the previous
+    close (1.0 on the rebalance day). Shape T × N; shared by every portfolio.
+    """
+    log_growth = np.log1p(returns)
+    cum = np.cumsum(log_growth, axis=0)
+    # Cumulative log growth up to (and excluding) each row, restarted per segment
+    cum_prev = np.vstack([np.zeros((1, returns.shape[1])), cum[:-1]])
+    return np.exp(cum_prev - cum_prev[start_rows])
+
+
+def run_backtest(
+    returns: pd.DataFrame,
+    weights: pd.DataFrame,
+    leveraged: pd.Series | None = None,
+    rebalance: RebalanceFrequency = "daily",
+) -> pd.DataFrame:
+    """
+    Portfolio return series for every row of ``weights``.
+
+    Parameters
+    ----------
+    returns : pd.DataFrame
+        Simple returns (dates × assets). NaN means the asset has no data that day.
+    weights : pd.DataFrame
+        Target weights (portfolios × assets) as fractions. Missing assets count as 0.
+    leveraged : pd.Series, optional
+        Per-portfolio flag. Long-only portfolios (False) have their weights
+        renormalized over the assets available at each rebalance; leveraged
+        ones use the weights as absolute allocations (remainder in cash at 0%).
+    rebalance : {'daily', 'monthly', 'quarterly'}
+        'daily' keeps a constant mix (assets without data that day are masked out).
+        'monthly'/'quarterly' let holdings drift between rebalances; an asset
+        only enters the portfolio at the first rebalance after its history starts.
+
+    Returns
+    -------
+    pd.DataFrame
+        Portfolio returns (dates × portfolios).
+    """
+    W = weights.reindex(columns=returns.columns).fillna(0.0).to_numpy(dtype=float)
+    if leveraged is None:
+        leveraged = pd.Series(False, index=weights.index)
+    is_leveraged = leveraged.reindex(weights.index).fillna(False).to_numpy(dtype=bool)
+
+    R = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(R)
+    R0 = np.where(valid, R, 0.0)
+    segments = rebalance_segments(returns.index, rebalance)
+
+    if rebalance == "daily":
+        live = valid.astype(float)
+        drift = np.ones_like(R0)
+    else:
+        start_rows = _segment_start_rows(segments)
+        started = np.maximum.accumulate(valid, axis=0)
+        live = started[start_rows].astype(float)
+        drift = _drift_factors(R0, segments, start_rows)
+
+    held = live * drift
+    # One product per term for all portfolios: (T × N) @ (N × P)
+    numerator = (held * R0) @ W.T
+    held_value = held @ W.T
+    live_weight = live @ W.T
+
+    # Long-only: value of the (renormalized) holdings at the previous close.
+    # Leveraged: allocations are absolute, cash (1 - Σw) stays flat.
+    denominator = np.where(is_leveraged, 1.0 + held_value - live_weight, held_value)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        portfolio_returns = np.where(denominator != 0, numerator / denominator, 0.0)
+
+    return pd.DataFrame(portfolio_returns, index=returns.index, columns=weights.index)
+
+
+def returns_to_index(returns: pd.DataFrame | pd.Series, base: float = 100.0) -> pd.DataFrame | pd.Series:
+    """Compounds simple returns into an index starting at ``base``."""
+    return (1 + returns).cumprod() * base
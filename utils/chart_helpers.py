@@ -1,7 +1,8 @@
 import pandas as pd
 from typing import List, Dict, Any, Optional, Union, Tuple
 from utils.charts import create_highcharts_options
-from utils.data_transformers import apply_transformations
+from utils.data_transformers import get_transformation_pipeline
+from utils.versioned import VersionedFrame
 from utils.highcharts_wrapper import render_highcharts_with_fullscreen
 import streamlit_highcharts as hct
 
@@ -218,6 +219,26 @@ def _update_column_names_recursively(columns_structure: Union[str, List[Any]], t
         # For any other type, return as is
         return columns_structure
 
+def _plotted_columns(chart_config: Dict[str, Any]) -> Optional[List[str]]:
+    """
+    Flattens the "columns" structure and instrument ids a chart plots.
+    Returns None (keep every column) when the chart does not name its columns.
+    """
+    if chart_config.get("columns") is None and not chart_config.get("instruments"):
+        return None
+    plotted = []
+
+    def _flatten(cols_struct):
+        if isinstance(cols_struct, str):
+            plotted.append(cols_struct)
+        elif isinstance(cols_struct, (list, tuple)):
+            for item in cols_struct:
+                _flatten(item)
+
+    _flatten(chart_config.get("columns"))
+    plotted.extend(instrument['id'] for instrument in chart_config.get("instruments", []) or [])
+    return plotted
+
 def extract_codes_from_config(chart_configs):
     """
     Extracts all unique column codes from chart configurations.
@@ -281,14 +302,21 @@ def organize_charts_by_group(chart_configs):
     
     return charts_by_group
 
+def _split_versioned(data):
+    """Returns ``(frame, version)``; the version is None for plain DataFrames."""
+    if isinstance(data, VersionedFrame):
+        return data.frame, data.version
+    return data, None
+
 def render_chart_group(data, chart_configs, group_name, charts_by_group):
     """
     Renders a group of charts in a responsive grid layout.
     
     Parameters:
     -----------
-    data : pd.DataFrame
-        DataFrame containing the chart data
+    data : pd.DataFrame or VersionedFrame
+        DataFrame containing the chart data. A VersionedFrame (fingerprinted
+        once at load time) spares hashing the frame on every call.
     chart_configs : Dict[str, Dict]
         Dictionary of chart configurations
     group_name : str
@@ -310,6 +338,11 @@ def render_chart_group(data, chart_configs, group_name, charts_by_group):
     # Format group name for display
     st.markdown(f"### {group_name}")
     
+    # Shared across charts: each chain runs only on the columns it reads and
+    # identical steps/chains are computed once per data version
+    data, version = _split_versioned(data)
+    pipeline = get_transformation_pipeline(data, version)
+
     # Calculate number of rows needed (2 charts per row)
     chart_ids = charts_by_group[group_name]
     num_charts = len(chart_ids)
@@ -330,7 +363,9 @@ def render_chart_group(data, chart_configs, group_name, charts_by_group):
                 transformations_to_apply = config.get("transformations")
 
                 if transformations_to_apply:
-                    chart_data_for_this_chart = apply_transformations(data, transformations_to_apply)
+                    chart_data_for_this_chart = pipeline.run(
+                        transformations_to_apply, keep_columns=_plotted_columns(current_chart_config)
+                    )
                 else:
                     chart_data_for_this_chart = data
 
@@ -380,8 +415,10 @@ def render_chart_group_with_context(data, chart_configs_original, context, group
     
     Parameters:
     -----------
-    data : pd.DataFrame
-        DataFrame containing the chart data (original, pre-transformation for this call)
+    data : pd.DataFrame or VersionedFrame
+        DataFrame containing the chart data (original, pre-transformation for this call).
+        A VersionedFrame (fingerprinted once at load time) spares hashing the
+        frame on every call.
     chart_configs_original : Dict[str, Dict]
         Not used directly, but kept for signature consistency if needed elsewhere.
         The necessary configs are inside charts_by_context_organized.
@@ -407,6 +444,11 @@ def render_chart_group_with_context(data, chart_configs_original, context, group
         return
     
     chart_id_config_list = charts_by_context_organized[context][group]
+
+    # Shared across charts: each chain runs only on the columns it reads and
+    # identical steps/chains are computed once per data version
+    data, version = _split_versioned(data)
+    pipeline = get_transformation_pipeline(data, version)
     
     charts_by_block = defaultdict(list)
     block_order = [] 
@@ -454,7 +496,9 @@ def render_chart_group_with_context(data, chart_configs_original, context, group
                     transformations_to_apply_list = full_config_entry_for_chart.get("transformations")
 
                     if transformations_to_apply_list:
-                        chart_data_for_this_specific_chart = apply_transformations(data, transformations_to_apply_list)
+                        chart_data_for_this_specific_chart = pipeline.run(
+                            transformations_to_apply_list, keep_columns=_plotted_columns(current_chart_config_dict)
+                        )
                     else:
                         chart_data_for_this_specific_chart = data
 
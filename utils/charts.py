@@ -126,6 +126,155 @@ def _apply_light_theme(options: Dict[str, Any]) -> None:
     export_chart.setdefault("borderRadius", CHART_BORDER_RADIUS)
 
 
+
+# ==============================================================================
+# COLUMNAR SERIES SERIALIZATION
+# ==============================================================================
+
+# Default number of points kept per series when downsampling is enabled
+DEFAULT_DOWNSAMPLE_THRESHOLD = 2000
+
+
+def _datetime_to_epoch_ms(values: Union[pd.Index, pd.Series]) -> np.ndarray:
+    """Converts datetime values to int64 epoch milliseconds (naive = UTC, like Timestamp.timestamp())."""
+    dt_index = pd.DatetimeIndex(values)
+    if dt_index.tz is not None:
+        dt_index = dt_index.tz_convert('UTC').tz_localize(None)
+    return dt_index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+
+def _numeric_values(values: Union[pd.Index, pd.Series]) -> np.ndarray:
+    """Returns values as a float array, with missing values as NaN."""
+    return pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+
+
+def _point_names(values: Union[pd.Index, pd.Series], fallback: Optional[pd.Index] = None) -> np.ndarray:
+    """
+    Converts values to point names (str). Missing values become str(fallback)
+    when a fallback index is given, else None.
+    """
+    if fallback is None:
+        names = [str(v) if pd.notna(v) else None for v in values]
+    else:
+        names = [str(v) if pd.notna(v) else str(f) for v, f in zip(values, fallback)]
+    return np.array(names, dtype=object)
+
+
+def _minmax_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Keeps the min and max point of equal-count buckets plus both ends (at most ``threshold`` points)."""
+    n = len(y)
+    n_buckets = max((threshold - 2) // 2, 1)
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.concatenate(([0, n - 1], order[starts], order[ends]))
+    return np.unique(keep)
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``threshold`` point indices."""
+    n = len(y)
+    if threshold < 3 or threshold >= n:
+        return np.arange(n)
+
+    # Boundaries of the threshold - 2 inner buckets (first and last points are always kept)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    method: Literal['lttb', 'minmax'] = 'lttb',
+    threshold: int = DEFAULT_DOWNSAMPLE_THRESHOLD,
+) -> np.ndarray:
+    """
+    Returns the (sorted) positions of the points to keep when downsampling a series.
+
+    Parameters:
+    -----------
+    x, y : np.ndarray
+        Numeric x values (e.g. epoch ms) in ascending order and y values without NaNs.
+    method : {'lttb', 'minmax'}
+        'lttb' keeps the visually most significant point per bucket (Largest-Triangle-Three-Buckets);
+        'minmax' keeps the min and max of each bucket, preserving every spike.
+    threshold : int
+        Maximum number of points kept. Series at or below it are returned untouched.
+    """
+    n = len(y)
+    if threshold is None or n <= threshold:
+        return np.arange(n)
+    if method == 'lttb':
+        return _lttb_indices(x.astype(float), y, threshold)
+    if method == 'minmax':
+        return _minmax_indices(x, y, threshold)
+    raise ValueError(f"Unsupported downsample method '{method}'. Use 'lttb' or 'minmax'.")
+
+
+def serialize_series_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    names: Optional[np.ndarray] = None,
+    scatter: bool = False,
+    downsample: Optional[Literal['lttb', 'minmax']] = None,
+    downsample_threshold: int = DEFAULT_DOWNSAMPLE_THRESHOLD,
+) -> List[Union[List[Any], Dict[str, Any]]]:
+    """
+    Builds Highcharts series data from column arrays.
+
+    Missing y values (NaN) are dropped. Points come out as ``[x, y]`` pairs, or as
+    ``{"x", "y", "name"}`` dicts when a point has a name (and always for scatter).
+    Downsampling applies only to numeric x axes without point names.
+    """
+    keep = np.flatnonzero(~np.isnan(y))
+    if downsample and names is None and not scatter and x.dtype.kind in 'iuf':
+        keep = keep[downsample_indices(x[keep], y[keep], downsample, downsample_threshold)]
+
+    x_kept = x[keep]
+    if scatter:
+        if x_kept.dtype.kind in 'iuf':
+            x_kept = x_kept.astype(float)
+        else:
+            x_kept = np.array([
+                float(v) if str(v).replace('.', '', 1).isdigit() else v for v in x_kept
+            ], dtype=object)
+    xs = x_kept.tolist()
+    ys = y[keep].tolist()
+
+    if names is None:
+        if scatter:
+            return [{"x": x_val, "y": y_val} for x_val, y_val in zip(xs, ys)]
+        return [[x_val, y_val] for x_val, y_val in zip(xs, ys)]
+
+    points: List[Union[List[Any], Dict[str, Any]]] = []
+    for x_val, y_val, name in zip(xs, ys, names[keep].tolist()):
+        if name is not None:
+            points.append({"x": x_val, "y": y_val, "name": name})
+        elif scatter:
+            points.append({"x": x_val, "y": y_val})
+        else:
+            points.append([x_val, y_val])
+    return points
+
 def create_highcharts_options(
     data: pd.DataFrame,
     y_column: Optional[Union[str, List[str], Tuple[str, str], Tuple[List[str], List[str]]]] = None,
@@ -157,6 +306,8 @@ def create_highcharts_options(
     show_legend: bool = True,
     show_point_name_labels: bool = False,
     enable_fullscreen_on_dblclick: bool = False,
+    downsample: Optional[Literal['lttb', 'minmax']] = None,
+    downsample_threshold: int = DEFAULT_DOWNSAMPLE_THRESHOLD,
     # Nested pie parameters
     inner_data: Optional[pd.DataFrame] = None,
     inner_y_column: Optional[str] = None,
@@ -275,6 +426,13 @@ def create_highcharts_options(
         Whether to display the legend. Defaults to True.
     enable_fullscreen_on_dblclick : bool, optional
         When True, enables fullscreen mode by double-clicking on the chart. Defaults to False.
+    downsample : {'lttb', 'minmax'}, optional
+        Downsamples series longer than `downsample_threshold` points before sending them to the browser.
+        'lttb' (Largest-Triangle-Three-Buckets) keeps the shape of long line series; 'minmax' keeps the
+        min and max of each bucket, so no spike is lost. Only applies to datetime/linear x axes, series
+        without point names, non-scatter and non-stacked charts. Defaults to None (all points).
+    downsample_threshold : int, optional
+        Maximum number of points per series when `downsample` is set. Defaults to 2000.
     inner_data : pd.DataFrame, optional
         DataFrame containing the data for the inner ring in 'nested_pie' charts.
         Required when chart_type='nested_pie'.
@@ -902,45 +1060,32 @@ def create_highcharts_options(
         # Set up series
         chart_options["series"] = []
 
+        # X values are serialized once per chart, as arrays
+        if is_using_index and isinstance(temp_data.index, pd.DatetimeIndex):
+            _x_values = _datetime_to_epoch_ms(temp_data.index)
+        elif not is_using_index and pd.api.types.is_datetime64_any_dtype(temp_data[x_column_effective]):
+            _x_values = _datetime_to_epoch_ms(temp_data[x_column_effective])
+        elif x_axis_type == 'category': # For category axis, x_value should be the category name
+            _x_values = np.array([str(v) for v in temp_data[x_column_effective]], dtype=object)
+        else: # Linear axis — Python floats to ensure JSON serialization
+            _x_values = _numeric_values(temp_data[x_column_effective])
+
+        _point_name_values = None
+        if point_name_column and point_name_column in temp_data.columns:
+            _point_name_values = _point_names(temp_data[point_name_column])
+
+        # Per-series downsampling would misalign stacked series
+        _downsample_method = downsample if not stacking else None
+
         def _prepare_series_data_points(y_col_for_series: str) -> List[Union[List[Union[int, float, str]], Dict[str, Union[int, float, str]]]]: # Allow dict for scatter points
-            _s_data = []
-            for _idx, _row in temp_data.iterrows():
-                _x_val: Union[int, float, str]
-                if is_using_index and isinstance(temp_data.index, pd.DatetimeIndex):
-                    _x_val = int(pd.Timestamp(_idx).timestamp() * 1000)
-                elif not is_using_index and pd.api.types.is_datetime64_any_dtype(temp_data[x_column_effective]):
-                    _x_val = int(_row[x_column_effective].timestamp() * 1000)
-                elif x_axis_type == 'category': # For category axis, x_value should be the category name
-                    _x_val = str(_row[x_column_effective]) if x_column_effective in _row else str(_idx)
-                else: # Linear axis — convert to Python float to ensure JSON serialization
-                    _x_val = float(_row[x_column_effective])
-                
-                point_name_val = None
-                if point_name_column and point_name_column in _row and pd.notna(_row[point_name_column]):
-                    point_name_val = str(_row[point_name_column])
-
-                if pd.notna(_row[y_col_for_series]):
-                    y_value = float(_row[y_col_for_series])
-                    if chart_type == 'scatter':
-                        scatter_x = float(_x_val) if isinstance(_x_val, (int, float, str)) and str(_x_val).replace('.', '', 1).isdigit() else _x_val
-                        point_entry = {
-                            "x": scatter_x,
-                            "y": y_value
-                        }
-                        if point_name_val is not None:
-                            point_entry["name"] = point_name_val
-                        _s_data.append(point_entry)
-                    else:
-                        if point_name_val is not None:
-                            point_entry = {
-                                "x": _x_val,
-                                "y": y_value,
-                                "name": point_name_val
-                            }
-                            _s_data.append(point_entry)
-                        else:
-                            _s_data.append([_x_val, y_value])
-            return _s_data
+            return serialize_series_points(
+                _x_values,
+                _numeric_values(temp_data[y_col_for_series]),
+                names=_point_name_values,
+                scatter=chart_type == 'scatter',
+                downsample=_downsample_method,
+                downsample_threshold=downsample_threshold,
+            )
 
         if is_dual_axis:
             # Loop for Axis 0 series (Primary Y-Axis)
@@ -1040,16 +1185,17 @@ def create_highcharts_options(
             # Prepare INNER ring data (categories/parent level)
             inner_pie_data = []
             color_idx = 0
-            for idx, row in inner_data.iterrows():
-                name = str(row[inner_x_column]) if inner_x_column in row and pd.notna(row[inner_x_column]) else str(idx)
-                if pd.notna(row[inner_y_column]):
+            inner_names = _point_names(inner_data[inner_x_column], fallback=inner_data.index)
+            inner_values = _numeric_values(inner_data[inner_y_column])
+            for name, y_value in zip(inner_names.tolist(), inner_values.tolist()):
+                if not np.isnan(y_value):
                     # Assign color to this category
                     assigned_color = colors_to_use[color_idx % len(colors_to_use)]
                     category_color_map[name] = assigned_color
                     
                     inner_pie_data.append({
                         "name": name,
-                        "y": float(row[inner_y_column]),
+                        "y": y_value,
                         "color": assigned_color
                     })
                     color_idx += 1
@@ -1076,19 +1222,23 @@ def create_highcharts_options(
             # Determine the parent column for color inheritance
             parent_col = outer_parent_column if outer_parent_column else inner_x_column
             
-            for idx, row in temp_data.iterrows():
-                name = str(row[x_column_effective]) if x_column_effective in row and pd.notna(row[x_column_effective]) else str(idx)
-                if pd.notna(row[y_col_outer]):
+            outer_names = _point_names(temp_data[x_column_effective], fallback=temp_data.index)
+            outer_values = _numeric_values(temp_data[y_col_outer])
+            if parent_col and parent_col in temp_data.columns:
+                parent_categories = [str(v) for v in temp_data[parent_col]]
+            else:
+                parent_categories = [None] * len(temp_data)
+
+            for name, y_value, parent_category in zip(outer_names.tolist(), outer_values.tolist(), parent_categories):
+                if not np.isnan(y_value):
                     point_data: Dict[str, Any] = {
                         "name": name,
-                        "y": float(row[y_col_outer])
+                        "y": y_value
                     }
                     
                     # Inherit color from parent category if parent column exists
-                    if parent_col and parent_col in row:
-                        parent_category = str(row[parent_col])
-                        if parent_category in category_color_map:
-                            point_data["color"] = category_color_map[parent_category]
+                    if parent_category in category_color_map:
+                        point_data["color"] = category_color_map[parent_category]
                     
                     outer_pie_data.append(point_data)
             
@@ -1125,12 +1275,13 @@ def create_highcharts_options(
             # Use only the first y_column for pie charts (from y_cols_for_single_axis)
             y_col_pie = y_cols_for_single_axis[0]
             
-            for idx, row in temp_data.iterrows():
-                name = str(row[x_column_effective]) if x_column_effective in row and pd.notna(row[x_column_effective]) else str(idx)
-                if pd.notna(row[y_col_pie]):
+            pie_names = _point_names(temp_data[x_column_effective], fallback=temp_data.index)
+            pie_values = _numeric_values(temp_data[y_col_pie])
+            for name, y_value in zip(pie_names.tolist(), pie_values.tolist()):
+                if not np.isnan(y_value):
                     pie_data.append({
                         "name": name,
-                        "y": float(row[y_col_pie])
+                        "y": y_value
                     })
             
             chart_options["series"] = [{
@@ -1237,14 +1388,12 @@ def prepare_point_markers(
         return None
     
     # Format data for Highcharts
-    marker_data = []
-    for idx, row in marker_points.iterrows():
-        # Check if the date_column contains datetime objects
-        if pd.api.types.is_datetime64_any_dtype(marker_points[date_column]):
-            x_value = int(row[date_column].timestamp() * 1000)
-        else:
-            x_value = row[date_column]
-        marker_data.append([x_value, float(row[value_column])])
+    if pd.api.types.is_datetime64_any_dtype(marker_points[date_column]):
+        x_values = _datetime_to_epoch_ms(marker_points[date_column]).tolist()
+    else:
+        x_values = marker_points[date_column].tolist()
+    y_values = _numeric_values(marker_points[value_column]).tolist()
+    marker_data = [[x_value, y_value] for x_value, y_value in zip(x_values, y_values)]
     
     # Create marker series configuration
     marker_series = {
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Union, Any
+from typing import Dict, List, Optional, Union, Any
 import streamlit as st
 
 class DataTransformer:
@@ -1041,4 +1041,153 @@ def apply_transformations(data: pd.DataFrame, transformations_config: List[Dict[
         transformer = TRANSFORMERS.get(transformer_type, DataTransformer)
         result = transformer.transform(result, config)
         
-    return result
\ No newline at end of file
+    return result
+
+# Config keys that name input columns read by a transformer
+_INPUT_COLUMN_KEYS = ('column', 'dependent_column', 'independent_column', 'base_column', 'target_column')
+
+# Number of data versions whose pipelines are kept in memory
+_PIPELINE_CACHE_SIZE = 4
+
+
+def _freeze(value: Any) -> Any:
+    """Converts nested dicts/lists into hashable tuples (used as cache keys)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def transformation_input_columns(config: Dict[str, Any]) -> List[str]:
+    """Returns the column names a single transformation config reads."""
+    return [config[key] for key in _INPUT_COLUMN_KEYS if isinstance(config.get(key), str)]
+
+
+def required_source_columns(
+    data_columns: pd.Index,
+    transformations_config: List[Dict[str, Any]],
+    keep_columns: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Works out which source columns a transformation chain (plus the plotted
+    columns in ``keep_columns``) actually reads, in the order of ``data_columns``.
+
+    Columns produced by earlier steps of the chain are not in ``data_columns``
+    and are therefore ignored. ``keep_columns=None`` keeps every source column.
+    """
+    if keep_columns is None:
+        return list(data_columns)
+    needed = set(keep_columns)
+    for config in transformations_config or []:
+        needed.update(transformation_input_columns(config))
+    return [col for col in data_columns if col in needed]
+
+
+def data_version(data: pd.DataFrame) -> int:
+    """Content fingerprint of a DataFrame (values, index and column labels)."""
+    hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    weights = np.arange(1, len(hashed) + 1, dtype=np.uint64)
+    return hash((tuple(data.columns), int((hashed * weights).sum())))
+
+
+class TransformationPipeline:
+    """
+    Runs transformation chains over a single source DataFrame, lazily by column.
+
+    Each chain runs only on the source columns it reads (see
+    ``required_source_columns``) instead of copying the whole frame on every
+    step. Every step is memoized by its config and by the lineage of the
+    columns it reads, so the same step on the same column (e.g. a
+    ``yearly_variation`` of one indicator used by several charts) is computed
+    once. Whole-chain outputs are memoized as well.
+
+    Returned frames are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._step_cache: Dict[Any, pd.DataFrame] = {}
+        self._result_cache: Dict[Any, pd.DataFrame] = {}
+
+    def run(
+        self,
+        transformations_config: List[Dict[str, Any]],
+        keep_columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Applies ``transformations_config`` and returns the source columns read
+        plus ``keep_columns`` and every column produced by the chain
+        (``keep_columns=None`` keeps every source column, like
+        ``apply_transformations``).
+        """
+        result_key = (_freeze(transformations_config), _freeze(keep_columns))
+        cached = self._result_cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        columns = required_source_columns(self.data.columns, transformations_config, keep_columns)
+        working = self.data[columns]
+        lineage = {col: ('source', col) for col in columns}
+
+        for config in transformations_config or []:
+            working, lineage = self._apply_step(working, lineage, config)
+
+        self._result_cache[result_key] = working
+        return working
+
+    def _apply_step(
+        self,
+        working: pd.DataFrame,
+        lineage: Dict[str, Any],
+        config: Dict[str, Any],
+    ) -> tuple:
+        reads = [col for col in transformation_input_columns(config) if col in working.columns]
+        step_key = (_freeze(config), tuple((col, lineage[col]) for col in reads))
+        inputs = working[reads]
+
+        out = self._step_cache.get(step_key)
+        if out is None:
+            transformer = TRANSFORMERS.get(config.get('type', 'default'), DataTransformer)
+            out = transformer.transform(inputs, config)
+            self._step_cache[step_key] = out
+
+        if not out.index.equals(working.index):
+            # Transformer returned a brand-new frame (e.g. accumulated_by_year)
+            return out, {col: (step_key, col) for col in out.columns}
+
+        produced = [col for col in out.columns if col not in inputs.columns]
+        if not produced:
+            return working, lineage
+
+        working = working.assign(**{col: out[col] for col in produced})
+        lineage = {**lineage, **{col: (step_key, col) for col in produced}}
+        return working, lineage
+
+
+_PIPELINES: Dict[Any, TransformationPipeline] = {}
+
+
+def get_transformation_pipeline(data: pd.DataFrame, version: Any = None) -> TransformationPipeline:
+    """
+    Returns the shared ``TransformationPipeline`` for this data version.
+
+    Pipelines are keyed by the data version so memoized outputs survive
+    reruns (Streamlit hands back a fresh copy of cached frames every time).
+    Pass ``version`` when the fingerprint is already known (e.g. the
+    ``VersionedFrame.version`` computed at load time); otherwise the frame is
+    hashed here with ``data_version``.
+    """
+    if version is None:
+        version = data_version(data)
+    pipeline = _PIPELINES.get(version)
+    if pipeline is None:
+        if len(_PIPELINES) >= _PIPELINE_CACHE_SIZE:
+            _PIPELINES.pop(next(iter(_PIPELINES)))
+        pipeline = TransformationPipeline(data)
+        _PIPELINES[version] = pipeline
+    return pipeline
@@ -0,0 +1,159 @@
+"""Cross-sectional factor scoring on (date × ticker × descriptor) arrays.
+
+Winsorization, standardization and sign alignment are computed per date and
+descriptor across tickers with broadcast NumPy reductions, so composite scores
+(Momentum, Value, Liquidity, Risk, Quality) for a whole history come out of a
+single pass. Each descriptor is standardized once and shared by every factor
+that uses it.
+"""
+
+from __future__ import annotations
+
+import warnings
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROBUST_Z = 3.0
+CONVENTIONAL_Z = 3.0
+MAD_SCALE = 1.4826
+
+
+def _clip(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """``clip`` that leaves values untouched where a bound is NaN (as pandas does)."""
+    clipped = np.where(values < lower, lower, values)
+    return np.where(clipped > upper, upper, clipped)
+
+
+def standardize_descriptors(
+    values: np.ndarray,
+    *,
+    robust_z: float = ROBUST_Z,
+    conventional_z: float = CONVENTIONAL_Z,
+) -> np.ndarray:
+    """
+    Winsorized cross-sectional z-scores.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Descriptor values shaped (dates, tickers, descriptors). NaN = missing.
+    robust_z : float
+        First trim at median ± ``robust_z`` × MAD-based std.
+    conventional_z : float
+        Second trim at mean ± ``conventional_z`` × std of the trimmed values.
+
+    Returns
+    -------
+    np.ndarray
+        Z-scores with the same shape; statistics are taken across tickers
+        (axis 1) for each date and descriptor, skipping NaN.
+    """
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        median = np.nanmedian(values, axis=1, keepdims=True)
+        robust_std = MAD_SCALE * np.nanmedian(np.abs(values - median), axis=1, keepdims=True)
+        trimmed = _clip(values, median - robust_z * robust_std, median + robust_z * robust_std)
+
+        mean = np.nanmean(trimmed, axis=1, keepdims=True)
+        std = np.nanstd(trimmed, axis=1, ddof=1, keepdims=True)
+        trimmed = _clip(trimmed, mean - conventional_z * std, mean + conventional_z * std)
+
+        mean = np.nanmean(trimmed, axis=1, keepdims=True)
+        std = np.nanstd(trimmed, axis=1, ddof=1, keepdims=True)
+        return (trimmed - mean) / std
+
+
+def _sign_vector(descriptors: Sequence[str], higher_is_better_map: Mapping[str, bool] | None) -> np.ndarray:
+    """+1 / -1 per descriptor so every component reads "higher is better"."""
+    higher_is_better_map = higher_is_better_map or {}
+    return np.array([1.0 if higher_is_better_map.get(d, True) else -1.0 for d in descriptors])
+
+
+def _composites(
+    z_scores: np.ndarray,
+    descriptors: Sequence[str],
+    factor_components: Mapping[str, Sequence[str]],
+) -> dict[str, np.ndarray]:
+    """Equal-weight average of each factor's aligned z-scores (dates × tickers)."""
+    position = {d: i for i, d in enumerate(descriptors)}
+    out = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for factor, components in factor_components.items():
+            idx = [position[c] for c in dict.fromkeys(components) if c in position]
+            out[factor] = np.nanmean(z_scores[:, :, idx], axis=2)
+    return out
+
+
+def cross_sectional_factor_scores(
+    df: pd.DataFrame,
+    factor_components: Mapping[str, Sequence[str]],
+    higher_is_better_map: Mapping[str, bool] | None = None,
+) -> pd.DataFrame:
+    """
+    Composite factor scores for a single cross-section.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Descriptor values (tickers × descriptors).
+    factor_components : Mapping[str, Sequence[str]]
+        Factor name → descriptors averaged into it.
+    higher_is_better_map : Mapping[str, bool], optional
+        Descriptors mapped to False have their z-score inverted.
+
+    Returns
+    -------
+    pd.DataFrame
+        Scores (tickers × factors).
+    """
+    descriptors = list(df.columns)
+    values = df.to_numpy(dtype=float)[None, :, :]
+    z_scores = standardize_descriptors(values) * _sign_vector(descriptors, higher_is_better_map)
+    composites = _composites(z_scores, descriptors, factor_components)
+    return pd.DataFrame(
+        {factor: scores[0] for factor, scores in composites.items()},
+        index=df.index,
+    )
+
+
+def factor_score_history(
+    panel: pd.DataFrame,
+    factor_components: Mapping[str, Sequence[str]],
+    higher_is_better_map: Mapping[str, bool] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Composite factor scores for every date of a descriptor panel.
+
+    Parameters
+    ----------
+    panel : pd.DataFrame
+        Descriptor history (dates × MultiIndex columns ``(code, descriptor)``),
+        as returned by ``get_descriptors``.
+    factor_components : Mapping[str, Sequence[str]]
+        Factor name → descriptors averaged into it.
+    higher_is_better_map : Mapping[str, bool], optional
+        Descriptors mapped to False have their z-score inverted.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Factor name → scores (dates × tickers). The cross-section on each date
+        is every ticker in the panel.
+    """
+    codes = list(dict.fromkeys(panel.columns.get_level_values(0)))
+    descriptors = list(dict.fromkeys(panel.columns.get_level_values(1)))
+    full_columns = pd.MultiIndex.from_product([codes, descriptors], names=panel.columns.names)
+    values = (
+        panel.reindex(columns=full_columns)
+        .to_numpy(dtype=float)
+        .reshape(len(panel.index), len(codes), len(descriptors))
+    )
+    z_scores = standardize_descriptors(values) * _sign_vector(descriptors, higher_is_better_map)
+    composites = _composites(z_scores, descriptors, factor_components)
+    return {
+        factor: pd.DataFrame(scores, index=panel.index, columns=pd.Index(codes, name="code"))
+        for factor, scores in composites.items()
+    }
@@ -0,0 +1,241 @@
+"""Windowed fund metrics for a whole NAV panel at once.
+
+All funds share one date axis. For each distinct window length, one masked
+pass over the (dates × funds) arrays gives the metrics with simple closed
+forms for every fund: window return, annualized volatility of daily returns
+and maximum drawdown. Each fund's window ends at its own last NAV, as a
+per-fund ``nav.dropna().loc[end - window:]`` would.
+
+The vectorized formulas must agree with the ``persevera_tools`` definitions
+used on the other pages. For every window, the first eligible fund is also
+computed with the library function; if the two disagree, that metric falls
+back to the library for every fund (and a warning is logged).
+
+Metrics without a simple closed form (consistency, Sharpe, Sortino, Calmar)
+are the library functions on each fund's window slice. The slices come from
+the same window bounds, and the CDI slice and annualized CDI return (the
+risk-free rate) are computed once per distinct ``(start, end)``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from persevera_tools.quant_research.metrics import (
+    calculate_annualized_return,
+    calculate_annualized_volatility,
+    calculate_calmar_ratio,
+    calculate_consistency,
+    calculate_max_drawdown,
+    calculate_sharpe_ratio,
+    calculate_sortino_ratio,
+)
+
+from utils.panel_stats import TRADING_DAYS_PER_YEAR, valid_bounds
+
+logger = logging.getLogger(__name__)
+
+MIN_OBSERVATIONS = 10
+MIN_WINDOW_OBSERVATIONS = 5
+
+METRIC_KEYS = ("retorno", "consistencia", "volatilidade", "max_dd", "sharpe", "sortino", "calmar")
+VECTORIZED_KEYS = ("retorno", "volatilidade", "max_dd")
+
+# Library definition of each vectorized metric, used by the agreement check.
+_LIBRARY_METRICS = {
+    "retorno": lambda pnav: float(pnav.iloc[-1] / pnav.iloc[0] - 1),
+    "volatilidade": lambda pnav: calculate_annualized_volatility(pnav, frequency="daily"),
+    "max_dd": lambda pnav: abs(calculate_max_drawdown(pnav)),
+}
+
+
+def _ffill_rows(values: np.ndarray) -> np.ndarray:
+    """Forward fill along axis 0 (NaN stays NaN before the first value)."""
+    idx = np.where(~np.isnan(values), np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return values[idx, np.arange(values.shape[1])]
+
+
+def _agree(vectorized: float, library: float) -> bool:
+    if np.isnan(vectorized) and np.isnan(library):
+        return True
+    return bool(np.isclose(vectorized, library, rtol=1e-9, atol=1e-12))
+
+
+class FundMetricsPanel:
+    """
+    Windowed metrics for every fund in a NAV panel.
+
+    Parameters
+    ----------
+    nav : pd.DataFrame
+        NAV levels (dates × funds). NaN = no quote.
+    cdi : pd.Series
+        CDI index levels.
+    """
+
+    def __init__(self, nav: pd.DataFrame, cdi: pd.Series):
+        self.funds = nav.columns
+        cdi = cdi.dropna()
+        if not isinstance(cdi.index, pd.DatetimeIndex):
+            cdi.index = pd.to_datetime(cdi.index)
+        self.cdi = cdi.sort_index()
+
+        nav = nav.sort_index()
+        if not isinstance(nav.index, pd.DatetimeIndex):
+            nav.index = pd.to_datetime(nav.index)
+        self.dates = pd.DatetimeIndex(nav.index)
+        self.values = nav.to_numpy(dtype=float)
+        self.valid = ~np.isnan(self.values)
+        _, last, self.n_obs = valid_bounds(self.values)
+        self.end_pos = np.maximum(last, 0)
+        self.end_dates = pd.DatetimeIndex(np.where(last >= 0, self.dates.values[self.end_pos], np.datetime64("NaT")))
+        self._navs = {fund: nav[fund].dropna() for fund in self.funds}
+
+        # Return between consecutive valid NAVs (pct_change of the dropna'd series)
+        previous = np.vstack([np.full((1, self.values.shape[1]), np.nan), _ffill_rows(self.values)[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.returns = self.values / previous - 1
+
+        self._windows: dict[int, dict] = {}
+        self._library_only: set[str] = set()
+        self._cdi_windows: dict[tuple, pd.Series] = {}
+        self._risk_free: dict[tuple, float] = {}
+
+    # ------------------------------------------------------------------ CDI
+
+    def _cdi_window(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        """CDI levels in ``[start, end]`` (cached)."""
+        key = (start, end)
+        if key not in self._cdi_windows:
+            self._cdi_windows[key] = self.cdi.loc[start:end]
+        return self._cdi_windows[key]
+
+    def _risk_free_rate(self, start: pd.Timestamp, end: pd.Timestamp) -> float:
+        """Annualized CDI return over ``[start, end]`` (cached)."""
+        key = (start, end)
+        if key not in self._risk_free:
+            self._risk_free[key] = calculate_annualized_return(self._cdi_window(start, end))
+        return self._risk_free[key]
+
+    # -------------------------------------------------------------- windows
+
+    def _window_slice(self, position: int, start: pd.Timestamp) -> pd.Series:
+        nav = self._navs[self.funds[position]]
+        return nav.iloc[nav.index.searchsorted(start):]
+
+    def window(self, months: int) -> dict:
+        """Bounds and vectorized metrics for the trailing ``months`` (cached)."""
+        if months in self._windows:
+            return self._windows[months]
+
+        cols = np.arange(len(self.funds))
+        rows = np.arange(len(self.dates))[:, None]
+        starts = self.end_dates - pd.DateOffset(months=months)
+        in_window = self.valid & (self.dates.values[:, None] >= starts.values[None, :])
+        count = in_window.sum(axis=0)
+        ok = (self.n_obs >= MIN_OBSERVATIONS) & (count >= MIN_WINDOW_OBSERVATIONS)
+
+        first_pos = in_window.argmax(axis=0)
+        ret_mask = in_window & (rows > first_pos[None, :])
+        n_returns = ret_mask.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total_return = self.values[self.end_pos, cols] / self.values[first_pos, cols] - 1
+
+            mean = np.where(ret_mask, self.returns, 0.0).sum(axis=0) / n_returns
+            centered = np.where(ret_mask, self.returns - mean, 0.0)
+            volatility = np.sqrt((centered ** 2).sum(axis=0) / (n_returns - 1)) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+            windowed = np.where(in_window, self.values, np.nan)
+            running_max = np.fmax.accumulate(windowed, axis=0)
+            drawdown = np.min(np.where(in_window, windowed / running_max - 1, np.inf), axis=0)
+            max_dd = np.abs(np.where(np.isfinite(drawdown), drawdown, np.nan))
+
+        window = {
+            "starts": starts,
+            "ok": ok,
+            "retorno": np.where(ok, total_return, np.nan),
+            "volatilidade": np.where(ok, volatility, np.nan),
+            "max_dd": np.where(ok, max_dd, np.nan),
+        }
+        self._check_against_library(months, window)
+        self._windows[months] = window
+        return window
+
+    def _check_against_library(self, months: int, window: dict) -> None:
+        """Falls back to the library for metrics whose vectorized value disagrees on one fund."""
+        eligible = np.flatnonzero(window["ok"])
+        if not len(eligible):
+            return
+        position = eligible[0]
+        pnav = self._window_slice(position, window["starts"][position])
+        for key in VECTORIZED_KEYS:
+            if key in self._library_only:
+                continue
+            try:
+                library = float(_LIBRARY_METRICS[key](pnav))
+            except Exception:
+                continue
+            if not _agree(window[key][position], library):
+                logger.warning(
+                    "Métrica '%s' vetorizada difere da persevera_tools (%s vs %s, janela %sm); usando a biblioteca.",
+                    key, window[key][position], library, months,
+                )
+                self._library_only.add(key)
+
+    # -------------------------------------------------------------- metrics
+
+    def _library_metric(self, key: str, pnav: pd.Series, start: pd.Timestamp, end: pd.Timestamp) -> float:
+        if key in _LIBRARY_METRICS:
+            return _LIBRARY_METRICS[key](pnav)
+        if key == "consistencia":
+            return calculate_consistency(pnav, self._cdi_window(start, end))
+        if key == "sharpe":
+            return calculate_sharpe_ratio(pnav, risk_free_rate=self._risk_free_rate(start, end))
+        if key == "sortino":
+            return calculate_sortino_ratio(pnav, risk_free_rate=self._risk_free_rate(start, end))
+        if key == "calmar":
+            return calculate_calmar_ratio(pnav)
+        return np.nan
+
+    def _library_column(self, key: str, months: int) -> np.ndarray:
+        window = self.window(months)
+        out = np.full(len(self.funds), np.nan)
+        for position in np.flatnonzero(window["ok"]):
+            start = window["starts"][position]
+            try:
+                out[position] = self._library_metric(
+                    key, self._window_slice(position, start), start, self.end_dates[position]
+                )
+            except Exception:
+                pass
+        return out
+
+    def metrics(self, requested: Mapping[str, tuple[str, int]]) -> pd.DataFrame:
+        """
+        Table of metrics (funds × requested names).
+
+        Parameters
+        ----------
+        requested : Mapping[str, tuple[str, int]]
+            Column name → (metric key from ``METRIC_KEYS``, window in months).
+
+        Returns
+        -------
+        pd.DataFrame
+            One column per requested metric; funds with fewer than
+            ``MIN_OBSERVATIONS`` NAVs (or ``MIN_WINDOW_OBSERVATIONS`` in the
+            window) and metrics the library cannot compute get NaN.
+        """
+        columns = {}
+        for name, (key, months) in requested.items():
+            window = self.window(months)
+            if key in VECTORIZED_KEYS and key not in self._library_only:
+                columns[name] = window[key]
+            else:
+                columns[name] = self._library_column(key, months)
+        return pd.DataFrame(columns, index=self.funds, columns=list(requested), dtype=float)
@@ -0,0 +1,83 @@
+"""Column-wise operations on fund NAV panels (dates × funds).
+
+Helpers shared by the fund pages to rename, date and rebase whole NAV panels
+without per-column ``apply`` calls or ``stack``/``unstack`` round-trips.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import pandas as pd
+
+from utils.panel_stats import valid_bounds
+
+
+def rename_fund_columns(df: pd.DataFrame, mapping: Mapping[str, str], level: int | str | None = None) -> pd.DataFrame:
+    """
+    Renames fund identifiers (e.g. CNPJ → short name) in the column labels.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Panel whose columns (or one level of its MultiIndex columns) are fund
+        identifiers.
+    mapping : Mapping[str, str]
+        Identifier → display name. Identifiers not in the mapping are kept.
+    level : int or str, optional
+        MultiIndex level holding the identifiers.
+
+    Returns
+    -------
+    pd.DataFrame
+        Same data with renamed columns (only the labels are rebuilt).
+    """
+    return df.rename(columns=dict(mapping), level=level)
+
+
+def last_valid_dates(nav: pd.DataFrame) -> pd.Series:
+    """
+    Date of the last non-null value of each column.
+
+    Parameters
+    ----------
+    nav : pd.DataFrame
+        NAV levels (dates × funds), sorted by date.
+
+    Returns
+    -------
+    pd.Series
+        Fund → last valid date (NaT for empty columns).
+    """
+    first, last, count = valid_bounds(nav.to_numpy(dtype=float))
+    dates = pd.Series(pd.NaT, index=nav.columns, dtype="datetime64[ns]")
+    has_data = count > 0
+    if has_data.any():
+        dates[has_data] = pd.DatetimeIndex(nav.index)[last[has_data]]
+    return dates
+
+
+def cumulative_returns(nav: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cumulative return of each column since its first value in the panel.
+
+    NAVs are forward filled; rows before a fund's first NAV are 0.
+
+    Parameters
+    ----------
+    nav : pd.DataFrame
+        NAV levels (dates × funds), sorted by date.
+
+    Returns
+    -------
+    pd.DataFrame
+        Cumulative returns (decimal), same shape as ``nav``.
+    """
+    if nav.empty or nav.shape[0] < 2:
+        return nav
+    levels = nav.ffill()
+    values = levels.to_numpy(dtype=float)
+    first, _, count = valid_bounds(values)
+    base = values[first, range(values.shape[1])]
+    base[count == 0] = float("nan")
+    return (levels / base - 1).fillna(0.0)
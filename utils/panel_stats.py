@@ -0,0 +1,129 @@
+"""Column-wise statistics for price panels (dates × assets).
+
+Every statistic is computed for all assets at once: valid-data bounds come
+from ``argmax`` over the NaN mask, CAGR from the values at those bounds, and
+return moments from full-frame pandas reductions, so the cost is independent
+of how many series share the panel.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.25
+WEEKS_PER_YEAR = 52
+TRADING_DAYS_PER_YEAR = 252
+
+
+def valid_bounds(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Positions of the first and last valid observation of each column.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Panel values (rows × columns). NaN = missing.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        ``(first, last, count)``; ``first``/``last`` are -1 for empty columns.
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    has_data = count > 0
+    first = np.where(has_data, valid.argmax(axis=0), -1)
+    last = np.where(has_data, len(values) - 1 - valid[::-1].argmax(axis=0), -1)
+    return first, last, count
+
+
+def weekly_returns(prices: pd.DataFrame) -> pd.DataFrame:
+    """Week-end (Sunday) to week-end simple returns."""
+    return prices.resample('W').last().pct_change(fill_method=None)
+
+
+def long_term_stats(
+    prices: pd.DataFrame,
+    *,
+    min_coverage_years: float = 0.5,
+) -> pd.DataFrame:
+    """
+    CAGR, annualized weekly volatility, skewness, kurtosis and coverage.
+
+    Each asset uses its own full window (first to last valid price).
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Price levels (dates × assets), sorted by date.
+    min_coverage_years : float
+        CAGR is NaN for assets with less coverage than this.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per asset with ``Retorno (a.a.)`` and ``Volatilidade (a.a.)``
+        in percent, ``Assimetria``, ``Curtose`` (excess), ``Início`` and
+        ``Anos``.
+    """
+    values = prices.to_numpy(dtype=float)
+    first, last, count = valid_bounds(values)
+    columns = np.arange(values.shape[1])
+    has_window = count >= 2
+
+    dates = pd.DatetimeIndex(prices.index)
+    starts = pd.Series(pd.NaT, index=prices.columns, dtype='datetime64[ns]')
+    years = np.full(values.shape[1], np.nan)
+    cagr = np.full(values.shape[1], np.nan)
+    if has_window.any():
+        first_dates = dates[first[has_window]]
+        last_dates = dates[last[has_window]]
+        starts[has_window] = first_dates
+        years[has_window] = (last_dates - first_dates).days / DAYS_PER_YEAR
+
+        first_value = values[first, columns]
+        last_value = values[last, columns]
+        eligible = has_window & (years >= min_coverage_years) & (first_value > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr[eligible] = (
+                np.power(last_value[eligible] / first_value[eligible], 1 / years[eligible]) - 1
+            )
+
+    weekly = weekly_returns(prices)
+    vol = weekly.std() * np.sqrt(WEEKS_PER_YEAR)
+
+    return pd.DataFrame({
+        'Retorno (a.a.)': pd.Series(cagr, index=prices.columns) * 100,
+        'Volatilidade (a.a.)': vol * 100,
+        'Assimetria': weekly.skew(),
+        'Curtose': weekly.kurt(),
+        'Início': starts,
+        'Anos': pd.Series(years, index=prices.columns).round(1),
+    })
+
+
+def mask_after_last_valid(values: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Masks each column of ``values`` after the last valid price of that column.
+
+    Rolling / recursive statistics carry their last value forward once a
+    series stops; masking keeps charts from drawing a flat line up to the
+    panel's last date.
+
+    Parameters
+    ----------
+    values : pd.DataFrame
+        Statistic computed from ``prices`` (same shape and column order).
+    prices : pd.DataFrame
+        Price levels (dates × assets), sorted by date.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``values`` with NaN after each column's last valid price (the whole
+        column for assets without prices).
+    """
+    _, last, _ = valid_bounds(prices.to_numpy(dtype=float))
+    rows = np.arange(len(prices))[:, None]
+    return values.where(rows <= last[None, :])
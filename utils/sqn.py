@@ -0,0 +1,216 @@
+"""Panel rolling SQN (System Quality Number) engine.
+
+SQN over a trailing window of ``period`` daily returns is
+``sqrt(period) * mean / std``. Instead of applying a rolling function per
+ticker, all tickers are computed at once from cumulative sums of returns and
+squared returns. The engine keeps the last window per lookback, so a new
+trading day only costs O(tickers), and results for each lookback stay cached
+while the slider moves.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Lookbacks kept in memory (least recently used are evicted).
+MAX_CACHED_LOOKBACKS = 8
+
+
+def _simple_returns(prices: np.ndarray, previous: np.ndarray | None = None) -> np.ndarray:
+    """Row-over-row simple returns (``pct_change(fill_method=None)``)."""
+    prev = np.vstack([
+        np.full((1, prices.shape[1]), np.nan) if previous is None else previous[None, :],
+        prices[:-1],
+    ])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices / prev - 1.0
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+@dataclass
+class _WindowState:
+    """Trailing window of one lookback, enough to roll one day forward."""
+
+    period: int
+    columns: pd.Index
+    index: pd.DatetimeIndex
+    sqn: np.ndarray  # T × N history
+    center: np.ndarray  # per-ticker constant subtracted before summing
+    window: np.ndarray  # period × N ring buffer of centered returns (NaN kept)
+    head: int  # ring buffer slot of the oldest return
+    s1: np.ndarray
+    s2: np.ndarray
+    nan_count: np.ndarray
+    last_prices: np.ndarray
+
+
+def rolling_sqn(prices: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    Rolling SQN for every column of a price panel.
+
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Close prices (dates × tickers), sorted by date.
+    period : int
+        Number of daily returns in each window (>= 2).
+
+    Returns
+    -------
+    pd.DataFrame
+        SQN (dates × tickers); NaN until a full window of returns without
+        gaps is available.
+    """
+    state = _full_state(prices, period)
+    return pd.DataFrame(state.sqn, index=state.index, columns=state.columns)
+
+
+def _full_state(prices: pd.DataFrame, period: int) -> _WindowState:
+    if period < 2:
+        raise ValueError("period must be at least 2")
+    values = prices.to_numpy(dtype=float)
+    returns = _simple_returns(values)
+    n_rows, n_cols = returns.shape
+
+    # Centering keeps the sum-of-squares subtraction well conditioned.
+    with np.errstate(invalid="ignore"):
+        center = np.nan_to_num(np.nanmean(returns, axis=0)) if n_rows else np.zeros(n_cols)
+    centered = returns - center
+    is_nan = np.isnan(centered)
+    x = np.where(is_nan, 0.0, centered)
+
+    zeros = np.zeros((1, n_cols))
+    c1 = np.vstack([zeros, np.cumsum(x, axis=0)])
+    c2 = np.vstack([zeros, np.cumsum(x * x, axis=0)])
+    cn = np.vstack([zeros, np.cumsum(is_nan, axis=0)])
+
+    sqn = np.full((n_rows, n_cols), np.nan)
+    if n_rows >= period:
+        s1 = c1[period:] - c1[:-period]
+        s2 = c2[period:] - c2[:-period]
+        nan_count = cn[period:] - cn[:-period]
+        sqn[period - 1:] = _centered_sqn(s1, s2, nan_count, center, period)
+
+    # Last window (the oldest slot is the head of the ring buffer).
+    window = np.full((period, n_cols), np.nan)
+    tail = centered[-period:]
+    window[period - len(tail):] = tail
+    last_window = np.where(np.isnan(window), 0.0, window)
+    return _WindowState(
+        period=period,
+        columns=prices.columns,
+        index=pd.DatetimeIndex(prices.index),
+        sqn=sqn,
+        center=center,
+        window=window,
+        head=0,
+        s1=last_window.sum(axis=0),
+        s2=(last_window * last_window).sum(axis=0),
+        nan_count=np.isnan(window).sum(axis=0),
+        last_prices=values[-1] if n_rows else np.full(n_cols, np.nan),
+    )
+
+
+def _centered_sqn(s1, s2, nan_count, center, period) -> np.ndarray:
+    """SQN from sums of centered returns (restores the mean before dividing)."""
+    mean_c = s1 / period
+    var = np.clip((s2 - s1 * mean_c) / (period - 1), 0.0, None)
+    std = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqn = np.sqrt(period) * (mean_c + center) / std
+    sqn[(nan_count > 0) | ~(std > 0)] = np.nan
+    return sqn
+
+
+def _append_rows(state: _WindowState, new_prices: pd.DataFrame) -> None:
+    """Rolls the window forward one day at a time (O(tickers) per day)."""
+    values = new_prices.to_numpy(dtype=float)
+    returns = _simple_returns(values, previous=state.last_prices) - state.center
+    new_sqn = np.empty_like(returns)
+    for i, row in enumerate(returns):
+        old = state.window[state.head]
+        old_nan = np.isnan(old)
+        row_nan = np.isnan(row)
+        old0 = np.where(old_nan, 0.0, old)
+        row0 = np.where(row_nan, 0.0, row)
+        state.s1 += row0 - old0
+        state.s2 += row0 * row0 - old0 * old0
+        state.nan_count += row_nan.astype(int) - old_nan.astype(int)
+        state.window[state.head] = row
+        state.head = (state.head + 1) % state.period
+        new_sqn[i] = _centered_sqn(
+            state.s1[None, :], state.s2[None, :], state.nan_count[None, :],
+            state.center, state.period,
+        )[0]
+    state.sqn = np.vstack([state.sqn, new_sqn])
+    state.index = state.index.append(pd.DatetimeIndex(new_prices.index))
+    state.last_prices = values[-1]
+
+
+class RollingSQNEngine:
+    """Per-process cache of rolling SQN histories, keyed by lookback."""
+
+    def __init__(self, max_lookbacks: int = MAX_CACHED_LOOKBACKS):
+        self._states: OrderedDict[int, _WindowState] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_lookbacks = max_lookbacks
+
+    def _can_extend(self, state: _WindowState, prices: pd.DataFrame) -> bool:
+        """True when ``prices`` is the cached panel plus (possibly) newer rows."""
+        if not state.columns.equals(prices.columns) or len(state.index) == 0:
+            return False
+        last_date = state.index[-1]
+        pos = prices.index.searchsorted(last_date)
+        if pos >= len(prices.index) or prices.index[pos] != last_date:
+            return False
+        row = prices.iloc[pos].to_numpy(dtype=float)
+        return bool(np.allclose(row, state.last_prices, equal_nan=True))
+
+    def history(self, prices: pd.DataFrame, period: int) -> pd.DataFrame:
+        """
+        Rolling SQN history for ``prices`` (dates × tickers) and ``period``.
+
+        Reuses the cached state for ``period`` when ``prices`` only adds new
+        dates after the cached ones (older dates may have been dropped by a
+        moving start date); otherwise recomputes the whole panel.
+        """
+        prices = prices.sort_index()
+        with self._lock:
+            state = self._states.get(period)
+            if state is not None and self._can_extend(state, prices):
+                new_rows = prices.loc[prices.index > state.index[-1]]
+                if not new_rows.empty:
+                    _append_rows(state, new_rows)
+                # Dates before the panel's (moving) start are no longer needed.
+                keep = state.index >= prices.index[0]
+                if not keep.all():
+                    state.sqn = state.sqn[keep]
+                    state.index = state.index[keep]
+            else:
+                state = _full_state(prices, period)
+            self._states[period] = state
+            self._states.move_to_end(period)
+            while len(self._states) > self._max_lookbacks:
+                self._states.popitem(last=False)
+
+            sqn = pd.DataFrame(state.sqn, index=state.index, columns=state.columns)
+        return sqn.reindex(prices.index)
+
+
+_ENGINE: RollingSQNEngine | None = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_sqn_engine() -> RollingSQNEngine:
+    """Single engine instance per process."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = RollingSQNEngine()
+        return _ENGINE
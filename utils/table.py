@@ -750,68 +750,77 @@ def style_table_aggrid(
     }
 
 
-def get_performance_table(series):
+PERFORMANCE_HORIZON_MONTHS = {'1m': 1, '3m': 3, '6m': 6, '12m': 12, '24m': 24, '36m': 36}
+
+
+def _performance_start_dates(end_date: pd.Timestamp) -> Dict[str, pd.Timestamp]:
+    """As-of dates of the starting level for MTD, YTD and each trailing horizon."""
+    month_start = end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    year_start = end_date.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    starts = {
+        'mtd': month_start - pd.Timedelta(days=1),
+        'ytd': year_start - pd.Timedelta(days=1),
+    }
+    for label, months in PERFORMANCE_HORIZON_MONTHS.items():
+        starts[label] = end_date - relativedelta(months=months)
+    return starts
+
+
+def _asof_rows(values: np.ndarray, index: pd.DatetimeIndex, dates: List[pd.Timestamp]) -> np.ndarray:
+    """
+    Rows of a forward-filled panel as of each date (NaN before the first date).
+
+    On a forward-filled column the last row at or before ``at`` already holds
+    the column's last valid value, so one ``searchsorted`` over all dates is
+    equivalent to a per-column ``Series.asof``.
+    """
+    positions = index.searchsorted(pd.DatetimeIndex(dates), side='right') - 1
+    rows = values[np.clip(positions, 0, None)]
+    rows[positions < 0] = np.nan
+    return rows
+
+
+def get_performance_table(series, *, ffilled: bool = False):
     """Build a snapshot of period returns (%) from price/NAV levels.
 
     Expects a Series or DataFrame of price/NAV levels (not returns), indexed by
     date (DatetimeIndex or MultiIndex with a 'date' level).
-    """
-    df = series.to_frame() if isinstance(series, pd.Series) else series.copy()
-    if df.empty:
-        return pd.DataFrame()
 
-    if isinstance(df.index, pd.MultiIndex):
-        if 'date' not in df.index.names:
-            raise ValueError("MultiIndex must include a 'date' level")
-        df.index = pd.to_datetime(df.index.get_level_values('date'))
+    Pass ``ffilled=True`` when ``series`` is already a date-sorted,
+    forward-filled panel with a DatetimeIndex (e.g. reused across reruns) to
+    skip the copy, sort and fill.
+    """
+    if ffilled:
+        df = series.to_frame() if isinstance(series, pd.Series) else series
     else:
-        df.index = pd.to_datetime(df.index)
-
-    df = df.sort_index().ffill()
+        df = series.to_frame() if isinstance(series, pd.Series) else series.copy()
     if df.empty:
         return pd.DataFrame()
 
-    last = df.iloc[-1]
-    end_date = df.index[-1]
-    nan_row = pd.Series(np.nan, index=df.columns)
-
-    def _period_return(end: pd.Series, start) -> pd.Series:
-        if start is None:
-            return nan_row
-        with np.errstate(divide='ignore', invalid='ignore'):
-            ret = end / start - 1.0
-        return ret.where(np.isfinite(ret))
+    if not ffilled:
+        if isinstance(df.index, pd.MultiIndex):
+            if 'date' not in df.index.names:
+                raise ValueError("MultiIndex must include a 'date' level")
+            df.index = pd.to_datetime(df.index.get_level_values('date'))
+        else:
+            df.index = pd.to_datetime(df.index)
+        df = df.sort_index().ffill()
 
-    def _asof_values(at: pd.Timestamp) -> pd.Series:
-        # Per-column asof: DataFrame.asof requires a fully non-NaN row, which
-        # fails when assets have staggered start dates (e.g. 36m lookback).
-        return pd.Series({col: df[col].asof(at) for col in df.columns}, index=df.columns)
-
-    def get_relative_return(months: int) -> pd.Series:
-        start_date_calc = end_date - relativedelta(months=months)
-        return _period_return(last, _asof_values(start_date_calc))
-
-    day_ret = _period_return(last, df.iloc[-2]) if len(df) >= 2 else nan_row
+    values = df.to_numpy(dtype=float)
+    end_date = df.index[-1]
+    last = values[-1]
 
-    month_start = end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    mtd_ret = _period_return(last, _asof_values(month_start - pd.Timedelta(days=1)))
+    starts = _performance_start_dates(end_date)
+    start_rows = {'1d': values[-2] if len(values) >= 2 else np.full(values.shape[1], np.nan)}
+    start_rows.update(zip(starts, _asof_rows(values, df.index, list(starts.values()))))
 
-    year_start = end_date.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    ytd_ret = _period_return(last, _asof_values(year_start - pd.Timedelta(days=1)))
-
-    returns = {
-        '1d': day_ret,
-        'mtd': mtd_ret,
-        'ytd': ytd_ret,
-        '1m': get_relative_return(1),
-        '3m': get_relative_return(3),
-        '6m': get_relative_return(6),
-        '12m': get_relative_return(12),
-        '24m': get_relative_return(24),
-        '36m': get_relative_return(36),
-    }
+    labels = ['1d', 'mtd', 'ytd', *PERFORMANCE_HORIZON_MONTHS]
+    start_matrix = np.vstack([start_rows[label] for label in labels])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = last / start_matrix - 1.0
+    ret[~np.isfinite(ret)] = np.nan
 
-    df_result = pd.DataFrame(returns) * 100
+    df_result = pd.DataFrame(ret.T * 100, index=df.columns, columns=labels)
     return df_result.reset_index()
 
 
@@ -16,8 +16,6 @@ import streamlit_highcharts as hct
 from persevera_tools.quant_research.metrics import (
     calculate_annualized_return,
     calculate_annualized_volatility,
-    calculate_drawdown,
-    calculate_max_drawdown,
     calculate_sharpe_ratio,
 )
 
@@ -53,17 +51,10 @@ def _as_frame(data: pd.DataFrame | pd.Series, default_name: str = "series") -> p
 
 def _levels_from_returns(returns: pd.DataFrame) -> pd.DataFrame:
     """Wealth index (base 1) from simple returns, preserving leading NaNs."""
-    levels = pd.DataFrame(index=returns.index, columns=returns.columns, dtype=float)
-    for col in returns.columns:
-        series = returns[col]
-        valid = series.first_valid_index()
-        if valid is None:
-            levels[col] = np.nan
-            continue
-        tail = series.loc[valid:]
-        wealth = (1 + tail.fillna(0.0)).cumprod()
-        levels.loc[wealth.index, col] = wealth
-    return levels
+    started = returns.notna().cummax()
+    # Before each column's first valid return the factor is 1, so one cumprod
+    # over the whole panel equals compounding from the first valid point.
+    return (1 + returns.fillna(0.0)).cumprod().where(started).astype(float)
 
 
 def _returns_from_levels(levels: pd.DataFrame) -> pd.DataFrame:
@@ -98,17 +89,102 @@ def resolve_levels_and_returns(
     return _levels_from_returns(returns_df), returns_df
 
 
+def _drawdown_panel(levels: pd.DataFrame) -> pd.DataFrame:
+    """Drawdown (fraction) for every column; NaN gaps are skipped by the running peak."""
+    df = levels.astype(float)
+    return df / df.cummax() - 1
+
+
 def compute_drawdown(levels: pd.DataFrame | pd.Series) -> pd.DataFrame:
     """Drawdown (%) from price / NAV / index levels."""
-    df = _as_frame(levels)
-    out = pd.DataFrame(index=df.index)
-    for col in df.columns:
-        series = df[col].dropna()
-        if series.empty:
-            out[col] = np.nan
+    return _drawdown_panel(_as_frame(levels)) * 100
+
+
+def _returns_panel(levels: pd.DataFrame, returns: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Simple returns on each column's valid levels.
+
+    Columns present in ``returns`` use those values (restricted to dates with a
+    valid level); the others use the change against the previous valid level,
+    i.e. ``pct_change`` of the series after ``dropna``.
+    """
+    valid = levels.notna()
+    rets = (levels / levels.ffill().shift(1) - 1).where(valid)
+    if returns is not None:
+        given = [c for c in levels.columns if c in returns.columns]
+        if given:
+            rets[given] = returns[given].reindex(levels.index).where(valid[given])
+    return rets
+
+
+def _monthly_returns_panel(rets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compounded monthly returns via log-sum, one column per series.
+
+    Months between a column's first and last return with no observations
+    count as 0%, as in ``resample("ME")`` over the column alone; months
+    outside that span are NaN.
+    """
+    log_sum = np.log1p(rets).resample("ME").sum()
+    monthly = np.expm1(log_sum)
+    month = monthly.index.to_period("M").asi8[:, None]
+    first = pd.DatetimeIndex(rets.apply(pd.Series.first_valid_index)).to_period("M")
+    last = pd.DatetimeIndex(rets.apply(pd.Series.last_valid_index)).to_period("M")
+    in_span = (month >= first.asi8) & (month <= last.asi8) & ~first.isna()
+    return monthly.where(in_span)
+
+
+def _stats_panel(
+    levels: pd.DataFrame,
+    *,
+    risk_free_rate: float,
+    returns: pd.DataFrame | None,
+    include_extremes: bool,
+    include_n_obs: bool,
+) -> pd.DataFrame:
+    """Performance metrics for every column of ``levels`` at once (index = Portfólio)."""
+    levels = levels.astype(float)
+    n_obs = levels.notna().sum()
+    first = levels.bfill().iloc[0] if len(levels) else pd.Series(np.nan, index=levels.columns)
+    last = levels.ffill().iloc[-1] if len(levels) else pd.Series(np.nan, index=levels.columns)
+
+    stats = pd.DataFrame(index=levels.columns)
+    stats["Retorno Total"] = (last / first - 1) * 100
+
+    # Annualization and Sharpe follow persevera_tools' conventions, per series.
+    annualized = {}
+    for col in levels.columns:
+        clean = levels[col].dropna()
+        if clean.empty:
+            annualized[col] = (np.nan, np.nan, np.nan)
             continue
-        out[col] = calculate_drawdown(series) * 100
-    return out
+        annualized[col] = (
+            calculate_annualized_return(clean) * 100,
+            calculate_annualized_volatility(clean, frequency="daily") * 100,
+            calculate_sharpe_ratio(clean, risk_free_rate=risk_free_rate),
+        )
+    annualized_df = pd.DataFrame.from_dict(
+        annualized,
+        orient="index",
+        columns=["Retorno Anualizado", "Volatilidade Anual", "Sharpe Ratio"],
+    )
+    stats = stats.join(annualized_df)
+    stats["Máx. Drawdown"] = _drawdown_panel(levels).min() * 100
+
+    if include_extremes:
+        rets = _returns_panel(levels, returns)
+        monthly = _monthly_returns_panel(rets)
+        stats["Melhor Dia"] = rets.max() * 100
+        stats["Pior Dia"] = rets.min() * 100
+        stats["Melhor Mês"] = monthly.max() * 100
+        stats["Pior Mês"] = monthly.min() * 100
+
+    if include_n_obs:
+        stats["Observações"] = n_obs.astype(int)
+
+    stats.index = [str(c) for c in levels.columns]
+    stats.index.name = "Portfólio"
+    return stats
 
 
 def compute_performance_stats(
@@ -121,63 +197,14 @@ def compute_performance_stats(
     include_n_obs: bool = False,
 ) -> dict:
     """Canonical performance metrics for a single series (levels = price/NAV/index)."""
-    clean = levels.dropna()
-    if clean.empty:
-        row = {
-            "Portfólio": label,
-            "Retorno Total": np.nan,
-            "Retorno Anualizado": np.nan,
-            "Volatilidade Anual": np.nan,
-            "Sharpe Ratio": np.nan,
-            "Máx. Drawdown": np.nan,
-        }
-        if include_extremes:
-            row.update(
-                {
-                    "Melhor Dia": np.nan,
-                    "Pior Dia": np.nan,
-                    "Melhor Mês": np.nan,
-                    "Pior Mês": np.nan,
-                }
-            )
-        if include_n_obs:
-            row["Observações"] = 0
-        return row
-
-    rets = (
-        returns.reindex(clean.index).dropna()
-        if returns is not None
-        else clean.pct_change(fill_method=None).dropna()
+    stats = _stats_panel(
+        levels.to_frame(name=label),
+        risk_free_rate=risk_free_rate,
+        returns=returns.to_frame(name=label) if returns is not None else None,
+        include_extremes=include_extremes,
+        include_n_obs=include_n_obs,
     )
-
-    row = {
-        "Portfólio": label,
-        "Retorno Total": (clean.iloc[-1] / clean.iloc[0] - 1) * 100,
-        "Retorno Anualizado": calculate_annualized_return(clean) * 100,
-        "Volatilidade Anual": calculate_annualized_volatility(clean, frequency="daily") * 100,
-        "Sharpe Ratio": calculate_sharpe_ratio(clean, risk_free_rate=risk_free_rate),
-        "Máx. Drawdown": calculate_max_drawdown(clean) * 100,
-    }
-
-    if include_extremes:
-        monthly = (
-            rets.resample("ME").apply(lambda x: (1 + x).prod() - 1)
-            if not rets.empty
-            else pd.Series(dtype=float)
-        )
-        row.update(
-            {
-                "Melhor Dia": rets.max() * 100 if not rets.empty else np.nan,
-                "Pior Dia": rets.min() * 100 if not rets.empty else np.nan,
-                "Melhor Mês": monthly.max() * 100 if not monthly.empty else np.nan,
-                "Pior Mês": monthly.min() * 100 if not monthly.empty else np.nan,
-            }
-        )
-
-    if include_n_obs:
-        row["Observações"] = int(len(clean))
-
-    return row
+    return {"Portfólio": label, **stats.astype(object).iloc[0].to_dict()}
 
 
 def compute_stats_table(
@@ -191,37 +218,25 @@ def compute_stats_table(
 ) -> pd.DataFrame:
     """Stats table with one row per series (index = Portfólio)."""
     cols = list(columns) if columns is not None else list(levels.columns)
-    rows = []
-    for col in cols:
-        if col not in levels.columns:
-            continue
-        series_returns = returns[col] if returns is not None and col in returns.columns else None
-        rows.append(
-            compute_performance_stats(
-                levels[col],
-                label=str(col),
-                risk_free_rate=risk_free_rate,
-                returns=series_returns,
-                include_extremes=include_extremes,
-                include_n_obs=include_n_obs,
-            )
-        )
-    if not rows:
+    cols = [c for c in cols if c in levels.columns]
+    if not cols:
         return pd.DataFrame()
-    return pd.DataFrame(rows).set_index("Portfólio")
+    return _stats_panel(
+        levels[cols],
+        risk_free_rate=risk_free_rate,
+        returns=returns,
+        include_extremes=include_extremes,
+        include_n_obs=include_n_obs,
+    )
 
 
 def _to_cumulative_return(levels: pd.DataFrame) -> pd.DataFrame:
     """Cumulative return (%) from the first valid point of each column."""
-    out = pd.DataFrame(index=levels.index)
-    for col in levels.columns:
-        series = levels[col]
-        first = series.first_valid_index()
-        if first is None or series.loc[first] == 0:
-            out[col] = np.nan
-        else:
-            out[col] = (series / series.loc[first] - 1.0) * 100
-    return out
+    if levels.empty:
+        return pd.DataFrame(index=levels.index, columns=levels.columns, dtype=float)
+    base = levels.bfill().iloc[0]
+    base = base.where(base != 0)
+    return (levels / base - 1.0) * 100
 
 
 def compute_rolling_returns(levels: pd.DataFrame | pd.Series, window: int) -> pd.DataFrame:
@@ -0,0 +1,99 @@
+"""DataFrames tagged with a content fingerprint, for cheap cache lookups.
+
+``st.cache_data`` hashes every DataFrame argument on every rerun to find the
+cache entry, which costs seconds on multi-year panels. Loaders instead return
+a :class:`VersionedFrame`, whose fingerprint is computed once when the data is
+loaded. Functions decorated with :func:`cache_by_version` hash only that
+fingerprint, so the lookup is O(1) in the size of the frame.
+
+Frames derived from versioned inputs (slices, merges) get their version from
+:func:`derive_version` over the parent versions and the derivation
+parameters, without touching the data again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def frame_fingerprint(df: pd.DataFrame | pd.Series) -> str:
+    """
+    Content fingerprint of a DataFrame or Series.
+
+    Covers values, index, column labels and dtypes. Frames pandas cannot hash
+    (e.g. list-valued cells) get a random version, so they are never served a
+    stale cache entry.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or pd.Series
+        Data to fingerprint.
+
+    Returns
+    -------
+    str
+        Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        if isinstance(df, pd.DataFrame):
+            labels = np.asarray([str(c) for c in df.columns], dtype=object)
+            digest.update(pd.util.hash_array(labels).tobytes())
+            digest.update(str(tuple(map(str, df.dtypes))).encode())
+        else:
+            digest.update(f"{df.name}:{df.dtype}".encode())
+    except TypeError:
+        return uuid.uuid4().hex
+    digest.update(str(df.shape).encode())
+    return digest.hexdigest()
+
+
+def derive_version(*parts: Any) -> str:
+    """Version of a frame derived from versioned inputs and parameters."""
+    text = "\x1f".join(p.version if isinstance(p, VersionedFrame) else repr(p) for p in parts)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class VersionedFrame:
+    """A DataFrame (or Series) and the fingerprint of its content."""
+
+    frame: pd.DataFrame
+    version: str
+
+    @classmethod
+    def of(cls, frame: pd.DataFrame) -> "VersionedFrame":
+        """Wraps ``frame`` fingerprinting its content (done once, at load time)."""
+        return cls(frame, frame_fingerprint(frame))
+
+    def derive(self, frame: pd.DataFrame, *params: Any) -> "VersionedFrame":
+        """Wraps a frame computed from this one with ``params``, without rehashing."""
+        return VersionedFrame(frame, derive_version(self, *params))
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+
+def _version_of(value: VersionedFrame) -> str:
+    return value.version
+
+
+def cache_by_version(func: Callable | None = None, **cache_kwargs) -> Callable:
+    """
+    ``st.cache_data`` that hashes :class:`VersionedFrame` arguments by version.
+
+    Accepts the same keyword arguments as ``st.cache_data``; usable with or
+    without them (``@cache_by_version`` / ``@cache_by_version(ttl=3600)``).
+    """
+    hash_funcs = {VersionedFrame: _version_of, **cache_kwargs.pop("hash_funcs", {})}
+    decorator = st.cache_data(hash_funcs=hash_funcs, **cache_kwargs)
+    return decorator(func) if func is not None else decorator
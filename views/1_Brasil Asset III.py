@@ -7,23 +7,25 @@ import streamlit_highcharts as hct
 from utils.chart_helpers import create_chart, extract_codes_from_config, organize_charts_by_context, render_chart_group_with_context
 from configs.pages.reuniao_brasil_asset import CHARTS_BRASIL_ASSET
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
+from utils.versioned import VersionedFrame
 from persevera_tools.fixed_income import calculate_spread
 
 st.title("Reunião · Brasil Asset III")
 
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date):
+    # Fingerprint computed once per load: the chart groups reuse it as pipeline key
     try:
-        return get_series(codes, start_date=start_date, field="close")
+        return VersionedFrame.of(load_series(codes, start_date=start_date, field="close"))
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
 @st.cache_data(ttl=3600)
 def load_spreads(codes, start_date):
     try:
-        return get_series(codes, start_date=start_date, field=["median", "mean", "weighted_mean"])
+        return load_series(codes, start_date=start_date, field=["median", "mean", "weighted_mean"])
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -13,62 +13,33 @@ from configs.pages.capital_market_assumptions import (
     BUCKET_COLORS,
 )
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 from persevera_tools.quant_research.metrics import calculate_ewma_volatility
+from utils.panel_stats import long_term_stats, mask_after_last_valid, weekly_returns
+from utils.versioned import VersionedFrame
 
 st.title("Capital Market Assumptions")
 
 LOOKBACK_YEARS = 15
-WEEKS_PER_YEAR = 52
-DAYS_PER_YEAR = 365.25
 MIN_COVERAGE_YEARS = 0.5  # ignore series with less than this for long-term stats
 
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date):
     try:
-        df = get_series(codes, start_date=start_date, field='close')
-        return df
+        df = load_series(codes, start_date=start_date, field='close')
+        return VersionedFrame.of(df)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
-def _weekly_returns(df):
-    return df.resample('W').last().pct_change(fill_method=None)
-
-def compute_long_term_stats(df):
+@st.cache_data(ttl=3600)
+def compute_long_term_stats(data_version, _df):
     """CAGR (geométrico), volatilidade anualizada, assimetria, curtose e
     janela de cobertura por ativo. Cada métrica usa toda a janela disponível
     do próprio ativo, evitando comparar séries com históricos diferentes
     sob uma mesma janela artificial.
     """
-    weekly = _weekly_returns(df)
-
-    cagr = pd.Series(np.nan, index=df.columns, dtype=float)
-    starts = pd.Series(pd.NaT, index=df.columns, dtype='datetime64[ns]')
-    years = pd.Series(np.nan, index=df.columns, dtype=float)
-
-    for col in df.columns:
-        s = df[col].dropna()
-        if len(s) < 2:
-            continue
-        first_idx, last_idx = s.index[0], s.index[-1]
-        n_years = (last_idx - first_idx).days / DAYS_PER_YEAR
-        starts[col] = first_idx
-        years[col] = n_years
-        if n_years < MIN_COVERAGE_YEARS or s.iloc[0] <= 0:
-            continue
-        cagr[col] = (s.iloc[-1] / s.iloc[0]) ** (1 / n_years) - 1
-
-    vol = weekly.std() * np.sqrt(WEEKS_PER_YEAR)
-
-    return pd.DataFrame({
-        'Retorno (a.a.)': cagr * 100,
-        'Volatilidade (a.a.)': vol * 100,
-        'Assimetria': weekly.skew(),
-        'Curtose': weekly.kurt(),
-        'Início': starts,
-        'Anos': years.round(1),
-    })
+    return long_term_stats(_df, min_coverage_years=MIN_COVERAGE_YEARS)
 
 def calculate_custom_return(df, start, end):
     period_df = df.loc[start:end].ffill()
@@ -94,13 +65,18 @@ def attach_bucket_index(df, asset_names, asset_buckets):
     )
     return df.drop(columns=['__rank', '__bucket', '__name'])
 
-def compute_ewma_volatility_panel(df, asset_names):
-    """EWMA volatility (annualized) for each asset, indexed by display name."""
-    vol = pd.DataFrame(index=df.index)
-    for code in df.columns:
-        name = asset_names.get(code, code)
-        vol[name] = calculate_ewma_volatility(df[code], decay=0.995)
-    return vol * 100
+@st.cache_data(ttl=3600)
+def compute_ewma_volatility_panel(data_version, _df, asset_names):
+    """EWMA volatility (annualized) for each asset, indexed by display name.
+
+    Blank after each asset's last price, instead of repeating the last value.
+    """
+    vol = pd.DataFrame(
+        {code: calculate_ewma_volatility(_df[code], decay=0.995) for code in _df.columns},
+        index=_df.index,
+    )
+    vol = mask_after_last_valid(vol, _df)
+    return vol.rename(columns=lambda code: asset_names.get(code, code)) * 100
 
 def scatter_data_by_bucket(stats_df, x_col, y_col):
     """Build a flat DataFrame where each bucket becomes a y-column. Each
@@ -147,7 +123,8 @@ with st.sidebar:
 
 with st.spinner(f"Carregando {lookback_years} anos de dados..."):
     start_date = pd.to_datetime(date.today() - timedelta(days=lookback_years * 365))
-    data = load_data(codes, start_date.strftime('%Y-%m-%d'))
+    loaded = load_data(codes, start_date.strftime('%Y-%m-%d'))
+    data, data_version = loaded.frame, loaded.version
 
 if data.empty:
     st.warning("Sem dados carregados.")
@@ -160,7 +137,7 @@ performance_table = get_performance_table(data)
 if 'code' in performance_table.columns:
     performance_table = performance_table.set_index('code')
 
-stats = compute_long_term_stats(data)
+stats = compute_long_term_stats(data_version, data)
 
 data_min = data.index.min().date()
 data_max = data.index.max().date()
@@ -347,7 +324,7 @@ with tabs[1]:   # Longo Prazo
         """)
 
 with tabs[2]:   # Volatilidade
-    vol_evolution = compute_ewma_volatility_panel(data, asset_names)
+    vol_evolution = compute_ewma_volatility_panel(data_version, data, asset_names)
     vol_columns = list(vol_evolution.columns)
     vol_colors = [
         BUCKET_COLORS.get(asset_buckets.get(code, ''), '#999999')
@@ -383,7 +360,7 @@ with tabs[2]:   # Volatilidade
     """)
 
 with tabs[3]:   # Correlações
-    correlation_matrix = _weekly_returns(data.rename(columns=asset_names)).corr()
+    correlation_matrix = weekly_returns(data.rename(columns=asset_names)).corr()
     correlation_matrix = correlation_matrix.where(np.tril(np.ones(correlation_matrix.shape)).astype(np.bool_))
     height = max(550, 50 * len(BUCKET_ORDER) + 100)
     correlation_heatmap = create_chart(
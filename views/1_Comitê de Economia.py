@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from persevera_tools.data import get_series
+from services.series_store import load_series
+from utils.versioned import VersionedFrame
 from utils.chart_helpers import extract_codes_from_config, organize_charts_by_context, render_chart_group_with_context
 from configs.pages.reuniao_economia import CHARTS_ECONOMIA
 
@@ -9,11 +10,12 @@ st.title('Comitê de Economia')
 
 @st.cache_data(ttl=7200)
 def load_data(codes, start_date):
+    # Fingerprint computed once per load: the chart groups reuse it as pipeline key
     try:
-        return get_series(codes, start_date=start_date, field='close')
+        return VersionedFrame.of(load_series(codes, start_date=start_date, field='close'))
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
 # Chart configurations
 chart_configs = CHARTS_ECONOMIA
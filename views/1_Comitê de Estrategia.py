@@ -3,18 +3,20 @@ import pandas as pd
 from datetime import datetime, timedelta
 from utils.chart_helpers import extract_codes_from_config, organize_charts_by_context, render_chart_group_with_context
 from configs.pages.reuniao_estrategia import CHARTS_ESTRATEGIA
-from persevera_tools.data import get_series
+from services.series_store import load_series
+from utils.versioned import VersionedFrame
 from utils.table import get_performance_table, style_table
 
 st.title('Comitê de Estratégia')
 
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date, field='close'):
+    # Fingerprint computed once per load: the chart groups reuse it as pipeline key
     try:
-        return get_series(codes, start_date=start_date, field=field)
+        return VersionedFrame.of(load_series(codes, start_date=start_date, field=field))
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
 # Chart configurations
 chart_configs = CHARTS_ESTRATEGIA
@@ -55,7 +57,7 @@ with st.spinner("Carregando cotações das moedas...", show_time=True):
         "nzd_usd": "NZD",
         "zar_usd": "ZAR",
     }
-    data_currencies = load_data(list(curr_codes.keys()), start_date=start_date_str)
+    data_currencies = load_data(list(curr_codes.keys()), start_date=start_date_str).frame
 
     non_inverted = ["usd_twi", "dxy_index", "jpm_em_currency_index", "eur_usd", "gbp_usd", "nzd_usd", "aud_usd"]
     set_inverse = list(set(curr_codes.keys()) - set(non_inverted))
@@ -113,7 +115,7 @@ else:
     with tabs[2]:
         commodities_context = charts_by_context.get("Commodities", {})
         commodities_codes = {col: name for entry in commodities_context['Commodities'] for col, name in zip(entry[1]['chart_config']['columns'], entry[1]['chart_config']['names'])}
-        data_commodities = data[list(commodities_codes.keys())].rename(columns=commodities_codes)
+        data_commodities = data.frame[list(commodities_codes.keys())].rename(columns=commodities_codes)
         render_chart_group_with_context(data, chart_configs, "Commodities", "Commodities", charts_by_context)
 
         styled_performance_table = st.dataframe(
@@ -10,7 +10,7 @@ from utils.table import style_table
 from utils.chart_helpers import create_chart
 from configs.pages.pilares_de_alocacao_bonds import INDICADORES
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 
 st.title('Pilares de Alocação (Bonds)')
 
@@ -23,7 +23,7 @@ with st.sidebar:
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date, field='close'):
     try:
-        return get_series(codes, start_date=start_date, field=field)
+        return load_series(codes, start_date=start_date, field=field)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -9,7 +9,7 @@ from utils.chart_helpers import create_chart
 from utils.table import style_table
 
 from persevera_tools.fixed_income import get_emissions, calculate_spread
-from persevera_tools.data import get_series
+from services.series_store import load_series
 
 
 st.title("Spreads de Crédito")
@@ -34,7 +34,7 @@ def load_data(codes, start_date):
             'volume_above_mean',
             'volume_under_mean'
         ]        
-        return get_series(codes, start_date=start_date, field=fields)
+        return load_series(codes, start_date=start_date, field=fields)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -6,7 +6,7 @@ import streamlit_highcharts as hct
 from utils.chart_helpers import create_chart
 from utils.data_transformers import apply_transformations
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 
 st.title('B3 · Fluxo de Investidores')
 
@@ -21,7 +21,7 @@ FLUXO_DE_INVESTIMENTOS = {
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date):
     try:
-        return get_series(codes, start_date=start_date, field='close')
+        return load_series(codes, start_date=start_date, field='close')
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
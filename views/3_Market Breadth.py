@@ -10,14 +10,14 @@ from utils.table import style_table
 
 import streamlit_highcharts as hct
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 
 st.title('Market Breadth')
 
 @st.cache_data(ttl=3600)
 def load_data(codes, field, start_date):
     try:
-        return get_series(codes, start_date=start_date, field=field)
+        return load_series(codes, start_date=start_date, field=field)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -5,10 +5,11 @@ import numpy as np
 from datetime import datetime, timedelta, date
 
 from utils.chart_helpers import create_chart
+from utils.sqn import get_sqn_engine
 from utils.table import style_table
+from utils.versioned import VersionedFrame, cache_by_version
 
 from persevera_tools.data import get_securities_by_exchange, get_descriptors
-from persevera_tools.quant_research.metrics import calculate_sqn
 
 st.title("SQN Scanner")
 
@@ -21,22 +22,27 @@ with st.sidebar:
 def load_data(start_date, descriptors_list):
     try:
         codes = get_securities_by_exchange(exchange='BZ').values()
-        return get_descriptors(list(codes), start_date=start_date, descriptors=descriptors_list)
+        return VersionedFrame.of(get_descriptors(list(codes), start_date=start_date, descriptors=descriptors_list))
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
-@st.cache_data
-def process_data(df, min_liquidity, lookback_days):
+@cache_by_version(ttl=3600)
+def process_data(data, min_liquidity, lookback_days):
     """
     Filters the most liquid assets and calculates the SQN.
+
+    The SQN panel covers the whole universe and is kept per lookback by the
+    engine, so changing liquidity or lookback (or a new trading day) does not
+    recompute the full history. The cache is keyed by the panel's version,
+    not by hashing the panel.
     """
-    df_swapped = df.swaplevel(0, axis=1)
+    df_swapped = data.frame.swaplevel(0, axis=1)
     most_liquid = df_swapped["median_dollar_volume_traded_21d"].dropna(how='all', axis='rows').iloc[-1]
     most_liquid = most_liquid[most_liquid > min_liquidity]
 
+    df_sqn_history = get_sqn_engine().history(df_swapped["price_close"], lookback_days)[most_liquid.index]
     price_close = df_swapped["price_close"][most_liquid.index]
-    df_sqn_history = price_close.apply(calculate_sqn, period=lookback_days, axis=0)
     
     df_sqn = df_sqn_history.tail(10).T
     df_sqn = df_sqn[sorted(df_sqn.columns, reverse=True)]
@@ -51,13 +57,13 @@ if 'df' not in st.session_state:
 start_date = pd.to_datetime(date.today() - timedelta(days=365*5))
 
 with st.spinner("Carregando dados...", show_time=True):
-    df = load_data(start_date=start_date, descriptors_list=["price_close", "median_dollar_volume_traded_21d"])
+    data = load_data(start_date=start_date, descriptors_list=["price_close", "median_dollar_volume_traded_21d"])
 
-if df.empty:
+if data.empty:
     st.warning("Não foi possível carregar os dados.")
     st.stop()
 else:
-    df_sqn, df_sqn_history, price_close = process_data(df, min_liquidity, lookback_days)
+    df_sqn, df_sqn_history, price_close = process_data(data, min_liquidity, lookback_days)
 
     st.dataframe(
         style_table(
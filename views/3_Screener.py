@@ -6,6 +6,7 @@ from datetime import datetime, timedelta, date
 
 from utils.table import style_table
 from utils.chart_helpers import create_chart
+from utils.factor_scores import cross_sectional_factor_scores, factor_score_history
 import streamlit_highcharts as hct
 
 from configs.pages.screener import (
@@ -57,59 +58,22 @@ def load_data(start_date, descriptors_list) -> pd.DataFrame:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
-def calculate_factor_exposure(df, factor_name, higher_is_better_map=None) -> pd.DataFrame:
-    """
-    Calculate factor scores for all configured factors.
-
-    The process follows these steps:
-    1. Prepare factor data by aligning with universe
-    2. Apply cross-sectional z-score standardization
-    3. Handle outliers through winsorization
-    4. Align signs so every component is "higher is better" before averaging
-    5. Calculate final factor scores through equal-weighted average
-    """
+@st.cache_data(ttl=3600)
+def load_factor_score_history(codes, factor_components, start_date, higher_is_better_items) -> dict:
+    """Scores compostos para todas as datas, cacheados pelo conjunto de descritores."""
+    descriptors = sorted({d for _, components in factor_components for d in components})
     try:
-        # -- Outlier handling: Two-step outlier trimming process --
-        # Step 1: Handle extreme outliers using robust statistics, column-wise
-        zR = 3
-        zC = 3
-
-        median = df.median()
-        robust_std = 1.4826 * (df - median).abs().median()
-        
-        df_trimmed = df.apply(
-            lambda col: col.clip(lower=median[col.name] - zR * robust_std[col.name],
-                                 upper=median[col.name] + zR * robust_std[col.name])
-        )
-
-        # Step 2: Handle remaining outliers using conventional statistics, column-wise
-        mean = df_trimmed.mean()
-        std = df_trimmed.std()
-        
-        df_trimmed = df_trimmed.apply(
-            lambda col: col.clip(lower=mean[col.name] - zC * std[col.name],
-                                 upper=mean[col.name] + zC * std[col.name])
-        )
-
-        # -- Standardization: Standardize series to equal-weighted unit std and cap-weighted zero mean --
-        mean = df_trimmed.mean()
-        std = df_trimmed.std()
-        z_scores = (df_trimmed - mean) / std
-
-        # -- Sign alignment: invert columns where lower values are preferred --
-        if higher_is_better_map:
-            for col in z_scores.columns:
-                if not higher_is_better_map.get(col, True):
-                    z_scores[col] = -z_scores[col]
-
-        # -- Factor Exposure: Equal-weight individual standardized scores --
-        factor_exposure = z_scores.mean(axis=1)
-
-        return factor_exposure.to_frame(name=factor_name)
-
+        panel = get_descriptors(list(codes), start_date=start_date, descriptors=descriptors)
     except Exception as e:
-        st.warning(f"Error calculating factor scores: {str(e)}")
-        raise
+        st.error(f"Erro ao carregar histórico dos descritores: {str(e)}")
+        return {}
+    if not isinstance(panel, pd.DataFrame) or not isinstance(panel.columns, pd.MultiIndex) or panel.empty:
+        return {}
+    return factor_score_history(
+        panel,
+        {factor: list(components) for factor, components in factor_components},
+        dict(higher_is_better_items),
+    )
 
 st.title('Screener')
 
@@ -194,17 +158,24 @@ if not raw_data.empty:
     data = data.rename(columns=inverted_selected_cols)
 
     # Include factor exposures (sign alignment driven by `Maior Melhor` in FACTOR_DEFINITIONS)
+    # Winsorização, z-score e alinhamento de sinal por descritor, uma única vez para todos os fatores.
     higher_is_better_map = get_higher_is_better_map()
-    factor_exposure_momentum = calculate_factor_exposure(raw_data[selected_descriptors_list_momentum], 'Momentum Score', higher_is_better_map)
-    factor_exposure_value = calculate_factor_exposure(raw_data[selected_descriptors_list_value], 'Value Score', higher_is_better_map)
-    factor_exposure_liquidity = calculate_factor_exposure(raw_data[selected_descriptors_list_liquidity], 'Liquidity Score', higher_is_better_map)
-    factor_exposure_risk = calculate_factor_exposure(raw_data[selected_descriptors_list_risk], 'Risk Score', higher_is_better_map)
-    factor_exposure_quality = calculate_factor_exposure(raw_data[selected_descriptors_list_quality], 'Quality Score', higher_is_better_map)
+    factor_components = {
+        'Momentum Score': selected_descriptors_list_momentum,
+        'Value Score': selected_descriptors_list_value,
+        'Liquidity Score': selected_descriptors_list_liquidity,
+        'Risk Score': selected_descriptors_list_risk,
+        'Quality Score': selected_descriptors_list_quality,
+    }
+    factor_descriptors = list(dict.fromkeys(d for components in factor_components.values() for d in components))
+    factor_scores = cross_sectional_factor_scores(
+        raw_data[factor_descriptors], factor_components, higher_is_better_map
+    )
 
-    data = pd.concat([data, factor_exposure_momentum, factor_exposure_value, factor_exposure_liquidity, factor_exposure_risk, factor_exposure_quality], axis=1)
+    data = pd.concat([data, factor_scores], axis=1)
 
     # Apply styling
-    factor_cols = ['Momentum Score', 'Value Score', 'Liquidity Score', 'Risk Score', 'Quality Score']
+    factor_cols = list(factor_components.keys())
     cols = factor_cols + [col for col in data.columns if col not in factor_cols]
     data = data[cols]
 
@@ -224,6 +195,73 @@ if not raw_data.empty:
     )
     st.write(styled_data)
 
+    with st.expander("Histórico de Scores", expanded=False):
+        row_1 = st.columns([1, 3])
+        with row_1[0]:
+            history_factor = st.selectbox("Score", options=factor_cols, key="screener_history_factor")
+        with row_1[1]:
+            history_tickers = st.multiselect(
+                "Ativos",
+                options=sorted(data.index.tolist()),
+                default=data[history_factor].nlargest(5).index.tolist(),
+                key="screener_history_tickers",
+            )
+
+        if st.button("Carregar histórico", key="screener_history_button"):
+            st.session_state.screener_history_request = True
+
+        if st.session_state.get("screener_history_request"):
+            with st.spinner("Calculando histórico de scores...", show_time=True):
+                score_history = load_factor_score_history(
+                    tuple(sorted(data.index.tolist())),
+                    tuple((factor, tuple(components)) for factor, components in factor_components.items()),
+                    data_load_date,
+                    tuple(sorted(higher_is_better_map.items())),
+                )
+
+            scores = score_history.get(history_factor, pd.DataFrame()).dropna(how="all")
+            if scores.empty:
+                st.warning("Não há histórico de descritores para calcular os scores.")
+            else:
+                # Ranking diário (1 = maior score) e variação em 1 e 3 meses (~21 e ~63 pregões)
+                ranks = scores.rank(axis=1, ascending=False)
+                rank_changes = pd.DataFrame({
+                    "Rank Atual": ranks.iloc[-1],
+                    "Rank 1m": ranks.iloc[-22] if len(ranks) > 21 else np.nan,
+                    "Rank 3m": ranks.iloc[-64] if len(ranks) > 63 else np.nan,
+                })
+                rank_changes["Δ 1m"] = rank_changes["Rank 1m"] - rank_changes["Rank Atual"]
+                rank_changes["Δ 3m"] = rank_changes["Rank 3m"] - rank_changes["Rank Atual"]
+                rank_changes = rank_changes.dropna(subset=["Rank Atual"]).sort_values("Rank Atual")
+
+                row_2 = st.columns([3, 2])
+                with row_2[0]:
+                    chart_scores = scores[[t for t in history_tickers if t in scores.columns]]
+                    if chart_scores.empty:
+                        st.info("Selecione ao menos um ativo para o gráfico.")
+                    else:
+                        hct.streamlit_highcharts(
+                            create_chart(
+                                data=chart_scores,
+                                columns=list(chart_scores.columns),
+                                names=list(chart_scores.columns),
+                                chart_type="line",
+                                title=history_factor,
+                                y_axis_title="Score",
+                                x_axis_title="Data",
+                                decimal_precision=2,
+                            ),
+                            key="screener_score_history",
+                        )
+                with row_2[1]:
+                    st.dataframe(
+                        style_table(
+                            rank_changes,
+                            numeric_cols_format_as_int=list(rank_changes.columns),
+                            color_negative_positive_cols=["Δ 1m", "Δ 3m"],
+                        )
+                    )
+
     with st.expander("Evolução de Métricas", expanded=False):
         row_1 = st.columns([1, 3])
         with row_1[0]:
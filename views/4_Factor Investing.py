@@ -5,7 +5,7 @@ from datetime import datetime
 from utils.table import style_table
 from utils.tearsheet import render_tearsheet
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 from persevera_tools.quant_research.factor_investing import (
     BacktestConfig,
     get_factor_options,
@@ -48,9 +48,8 @@ def _load_benchmark_prices(tickers: tuple[str, ...], start_date: str) -> pd.Data
     if not tickers:
         return pd.DataFrame()
     try:
-        data = get_series(list(tickers), start_date=start_date, field=["close"])
+        data = load_series(list(tickers), start_date=start_date, field=["close"])
         if isinstance(data, pd.Series):
-            # get_series returns a Series named "close" when only one code is requested
             return data.to_frame(name=tickers[0])
         if isinstance(data.columns, pd.MultiIndex):
             data = data.copy()
@@ -5,10 +5,12 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from utils.tearsheet import compute_performance_stats, render_tearsheet
+from utils.backtest import returns_to_index, run_backtest
+from utils.tearsheet import compute_stats_table, render_tearsheet
 from services.position_service import load_indicator_catalog, load_funds_catalog
 
-from persevera_tools.data import get_series, get_funds_data
+from persevera_tools.data import get_funds_data
+from services.series_store import load_series
 
 # Edite este dicionário para adicionar/remover benchmarks disponíveis.
 # Formato: "Nome exibido no multiselect": "ticker_na_base"
@@ -36,6 +38,13 @@ FX_OPTIONS: dict[str, str | None] = {
     "CNH/USD": "cnh_usd",
 }
 
+# Frequência de rebalanceamento → chave do engine (utils.backtest).
+REBALANCE_OPTIONS: dict[str, str] = {
+    "Diário (pesos constantes)": "daily",
+    "Mensal": "monthly",
+    "Trimestral": "quarterly",
+}
+
 RESULT_KEY = "pb_backtest_results"
 FX_COL = "Ajuste FX"
 _META_COLS = frozenset({"Ticker", FX_COL})
@@ -223,7 +232,7 @@ def _align_data_columns(data: pd.DataFrame, codes: list[str]) -> pd.DataFrame:
 
 
 def _normalize_columns(df: pd.DataFrame | pd.Series, single_name: str | None = None) -> pd.DataFrame:
-    """Normalize get_series / get_funds_data output to a flat-column DataFrame."""
+    """Normalize load_series / get_funds_data output to a flat-column DataFrame."""
     if isinstance(df, pd.Series):
         name = single_name or (df.name if df.name and df.name != "close" else "series")
         return df.to_frame(name=name)
@@ -255,7 +264,7 @@ def load_data(
 
     if series_codes:
         try:
-            raw = get_series(
+            raw = load_series(
                 list(series_codes),
                 start_date=start_date,
                 end_date=end_date,
@@ -522,6 +531,12 @@ with st.sidebar:
         "Benchmarks",
         options=list(BENCHMARK_OPTIONS.keys()),
     )
+    rebalance_label = st.selectbox(
+        "Rebalanceamento",
+        options=list(REBALANCE_OPTIONS.keys()),
+        help="Diário mantém o mix constante. Mensal/Trimestral deixa os pesos "
+        "flutuarem com os preços entre as datas de rebalanceamento.",
+    )
 
 st.markdown(
     "Busque e selecione **séries** ou **fundos** do catálogo, defina os **pesos em %** "
@@ -614,10 +629,10 @@ with st.form("portfolio_form"):
         key=_editor_key(),
         num_rows="dynamic",
     )
-    run_backtest = st.form_submit_button("Rodar Backtest", type="primary")
+    run_clicked = st.form_submit_button("Rodar Backtest", type="primary")
 
 # Só sincroniza a tabela quando o form é submetido — assim deletes entram no estado.
-if add_assets or run_backtest:
+if add_assets or run_clicked:
     synced = _ensure_fx_column(edited_df)
     # Normaliza labels legados "Nome (CNPJ)" → CNPJ
     synced["Ticker"] = synced["Ticker"].map(_resolve_ticker)
@@ -632,7 +647,7 @@ if add_assets:
     _bump_table_editor()
     st.rerun()
 
-if run_backtest:
+if run_clicked:
     if end_date < start_date:
         st.error("A data final deve ser maior ou igual à data inicial.")
         st.stop()
@@ -732,9 +747,8 @@ if run_backtest:
 
     returns = prices.pct_change(fill_method=None)
 
-    result_df = pd.DataFrame(index=prices.index)
-    portfolio_returns_df = pd.DataFrame(index=prices.index)
-    portfolio_stats: list[dict] = []
+    weight_rows: dict[str, pd.Series] = {}
+    leveraged_flags: dict[str, bool] = {}
 
     for weight_col in weight_columns:
         portfolio_name = weight_col.replace(" (%)", "")
@@ -756,7 +770,7 @@ if run_backtest:
             )
             continue
 
-        is_leveraged = (weights_raw < 0).any()
+        is_leveraged = bool((weights_raw < 0).any())
         weights = weights_raw.reindex(available_tickers).fillna(0.0)
         if is_leveraged:
             weights = weights / 100
@@ -767,35 +781,33 @@ if run_backtest:
                 continue
             weights = weights / weight_sum
 
-        weights_matrix = pd.DataFrame(
-            np.tile(weights.values, (len(returns), 1)),
-            index=returns.index,
-            columns=returns.columns,
-        )
-        valid_mask = returns.notna()
-        weights_matrix = weights_matrix.where(valid_mask, 0.0)
-
-        if not is_leveraged:
-            row_sums = weights_matrix.sum(axis=1)
-            weights_matrix = weights_matrix.div(row_sums.replace(0, np.nan), axis=0).fillna(0.0)
+        weight_rows[portfolio_name] = weights
+        leveraged_flags[portfolio_name] = is_leveraged
 
-        portfolio_returns = (returns.fillna(0.0) * weights_matrix).sum(axis=1)
-        portfolio_index = (1 + portfolio_returns).cumprod() * 100
-
-        result_df[portfolio_name] = portfolio_index
-        portfolio_returns_df[portfolio_name] = portfolio_returns
+    result_df = pd.DataFrame(index=prices.index)
+    portfolio_returns_df = pd.DataFrame(index=prices.index)
+    portfolio_stats: list[dict] = []
 
-        try:
-            portfolio_stats.append(
-                compute_performance_stats(
-                    portfolio_index,
-                    label=portfolio_name,
-                    risk_free_rate=risk_free_rate,
-                    returns=portfolio_returns,
-                )
-            )
-        except Exception as e:
-            run_warnings.append(f"Erro ao calcular estatísticas para '{portfolio_name}': {e}")
+    if weight_rows:
+        # Todos os portfólios de uma vez: matriz (portfólios × ativos) contra o painel de retornos.
+        portfolio_returns_df = run_backtest(
+            returns,
+            pd.DataFrame(weight_rows).T,
+            leveraged=pd.Series(leveraged_flags),
+            rebalance=REBALANCE_OPTIONS[rebalance_label],
+        )
+        result_df = returns_to_index(portfolio_returns_df)
+
+    try:
+        portfolio_stats.extend(
+            compute_stats_table(
+                result_df,
+                risk_free_rate=risk_free_rate,
+                returns=portfolio_returns_df,
+            ).reset_index().to_dict("records")
+        )
+    except Exception as e:
+        run_warnings.append(f"Erro ao calcular estatísticas dos portfólios: {e}")
 
     if result_df.empty:
         st.warning("Nenhum portfólio foi calculado com sucesso.")
@@ -804,6 +816,7 @@ if run_backtest:
         st.stop()
 
     benchmark_returns_dict: dict[str, pd.Series] = {}
+    benchmark_index_dict: dict[str, pd.Series] = {}
     chart_df = result_df.copy()
 
     for label in selected_benchmarks:
@@ -821,19 +834,20 @@ if run_backtest:
         bm_index = bm_raw / bm_raw[bm_first_valid] * 100
         bm_returns = bm_raw.pct_change(fill_method=None)
         benchmark_returns_dict[label] = bm_returns
+        benchmark_index_dict[label] = bm_index
         chart_df[label] = bm_index
 
+    if benchmark_index_dict:
         try:
-            portfolio_stats.append(
-                compute_performance_stats(
-                    bm_index,
-                    label=label,
+            portfolio_stats.extend(
+                compute_stats_table(
+                    pd.DataFrame(benchmark_index_dict),
                     risk_free_rate=risk_free_rate,
-                    returns=bm_returns,
-                )
+                    returns=pd.DataFrame(benchmark_returns_dict),
+                ).reset_index().to_dict("records")
             )
         except Exception as e:
-            run_warnings.append(f"Erro ao calcular estatísticas do benchmark '{label}': {e}")
+            run_warnings.append(f"Erro ao calcular estatísticas dos benchmarks: {e}")
 
     st.session_state[RESULT_KEY] = {
         "chart_df": chart_df,
@@ -4,9 +4,10 @@ import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta, date
-from persevera_style_analysis.core.best_subset_style_analysis import BestSubsetStyleAnalysis
 from persevera_style_analysis.utils import helpers
-from persevera_tools.data import get_series, get_funds_data, get_persevera_peers
+from persevera_tools.data import get_funds_data, get_persevera_peers
+from services.series_store import load_series
+from services.style_analysis_service import run_style_analysis
 from utils.chart_helpers import create_chart
 from utils.table import style_table
 import streamlit_highcharts as hct
@@ -28,7 +29,7 @@ def load_peers():
 @st.cache_data(ttl=3600)
 def load_indicators(codes, start_date):
     try:
-        return get_series(codes, start_date=start_date, field='close')
+        return load_series(codes, start_date=start_date, field='close')
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -76,18 +77,21 @@ if btn_run:
 
     with st.spinner("Reparando dados...", show_time=True):
         returns = helpers.prepare_data(data_funds, data_indicators)
-        returns = returns.dropna(how='any')
-
-    with st.spinner("Iniciando análise...", show_time=True):
-        best_subset_analysis = BestSubsetStyleAnalysis(returns_data=returns, fund_cols=selected_funds, factor_cols=factor_codes[1:])
+        # Datas faltantes são removidas por fundo (cada regressão usa só o fundo e os fatores)
+        returns = returns.dropna(how='all')
 
     with st.spinner("Executando análise para o período mais recente...", show_time=True ):
-        best_subset_results = best_subset_analysis.run_analysis(
+        # Um fundo por tarefa em paralelo; fundos já calculados com os mesmos parâmetros vêm do cache
+        best_subset_results, failed_funds = run_style_analysis(
+            returns,
+            funds=selected_funds,
+            factor_cols=factor_codes[1:],
             min_window=min_window,
             max_window=max_window,
             selection_metric=selection_metric,
-            most_recent_only=True
         )
+        for fund_name, error in failed_funds.items():
+            st.error(f"Could not run analysis for fund {fund_name}: {error}")
 
         all_betas, all_pvalues = pd.DataFrame(), pd.DataFrame()
         all_rsquared, all_rsquared_adj, all_windows = pd.Series(), pd.Series(), pd.Series()
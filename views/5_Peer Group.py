@@ -5,8 +5,11 @@ import streamlit_highcharts as hct
 
 from utils.table import style_table, get_performance_table
 from utils.chart_helpers import create_chart, render_chart
+from utils.versioned import VersionedFrame, cache_by_version, derive_version
+from utils.nav_panel import cumulative_returns, last_valid_dates, rename_fund_columns
 
-from persevera_tools.data import get_funds_data, get_series
+from persevera_tools.data import get_funds_data
+from services.series_store import load_series
 from persevera_tools.db.fibery import read_fibery
 
 st.title("Fundos · Peer Group")
@@ -26,7 +29,7 @@ peers = get_persevera_peers()
 @st.cache_data(ttl=3600)
 def load_data(codes, start_date):
     try:
-        return get_series(codes, start_date=start_date, field='close')
+        return load_series(codes, start_date=start_date, field='close')
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -35,10 +38,14 @@ def load_data(codes, start_date):
 def load_fund_data(fund_name):
     """
     Loads NAV and Total Equity data for a given fund and its peers.
+
+    Both are returned as VersionedFrame, fingerprinted once here so the
+    downstream caches do not re-hash the panels.
     """
+    empty = VersionedFrame.of(pd.DataFrame())
     if peers.empty:
         st.warning("Peers data is not loaded. Cannot load fund data.")
-        return pd.DataFrame(), pd.DataFrame()
+        return empty, empty
 
     fund_peers = peers[peers['persevera_group'] == fund_name].copy()
 
@@ -50,7 +57,7 @@ def load_fund_data(fund_name):
     
     if fund_peers.empty:
         st.warning(f"No peers found for fund group: {fund_name}")
-        return pd.DataFrame(), pd.DataFrame()
+        return empty, empty
 
     fund_cnpjs = list(fund_peers['fund_cnpj'].unique())
 
@@ -59,16 +66,23 @@ def load_fund_data(fund_name):
 
     except Exception as e:
         st.error(f"Error calling get_funds_data: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+        return empty, empty
 
     if df.empty:
         st.warning(f"No data returned by get_funds_data for CNPJs: {fund_cnpjs}")
-        return pd.DataFrame(), pd.DataFrame()
+        return empty, empty
 
-    # Map fund_name using peers DataFrame
-    df = df.swaplevel(axis=1).stack(future_stack=True)
-    df.columns = df.columns.map(peers.set_index('fund_cnpj')['short_name'].to_dict())
-    df = df.unstack().swaplevel(axis=1)
+    # Map fund_name using peers DataFrame (group adjustments above take precedence)
+    cnpj_to_name = {
+        **peers.set_index('fund_cnpj')['short_name'].to_dict(),
+        **fund_peers.set_index('fund_cnpj')['short_name'].to_dict(),
+    }
+    if isinstance(df.columns, pd.MultiIndex):
+        field_level = 0 if 'fund_nav' in df.columns.get_level_values(0) else 1
+        df = rename_fund_columns(df, cnpj_to_name, level=1 - field_level)
+        if field_level == 1:
+            df = df.swaplevel(axis=1)
+    df = df.sort_index()
 
     # Select NAV data
     if 'fund_nav' not in df.columns:
@@ -91,7 +105,7 @@ def load_fund_data(fund_name):
         if not total_equity.empty:
             total_equity = total_equity.sort_index(axis=1)
     
-    return nav, total_equity
+    return VersionedFrame.of(nav), VersionedFrame.of(total_equity)
 
 BENCHMARKS = ['CDI', 'Ibovespa', 'SMLL']
 RETURN_COLS = ['day', 'mtd', 'ytd', '1m', '3m', '6m', '12m', '24m', '36m', 'custom']
@@ -120,8 +134,7 @@ def _custom_period_return(nav_levels: pd.DataFrame, start_date, end_date) -> pd.
 
 def _last_nav_dates(nav: pd.DataFrame) -> pd.Series:
     """Last non-null NAV date per fund (no ffill, so lagging peers keep their own date)."""
-    nav_raw = _normalize_nav_index(nav, ffill=False)
-    return nav_raw.apply(lambda s: s.last_valid_index())
+    return last_valid_dates(_normalize_nav_index(nav, ffill=False))
 
 
 def _fund_type(name) -> str:
@@ -132,15 +145,19 @@ def _fund_type(name) -> str:
     return 'Peer'
 
 
-@st.cache_data(ttl=3600)
-def build_peer_performance_table(nav, total_equity, start_date, end_date):
-    """Enrich utils performance returns with peer-group ranks, PL, last NAV date and type."""
-    if nav is None or nav.empty:
-        return pd.DataFrame()
+@cache_by_version(ttl=3600)
+def _peer_horizon_table(nav_data, total_equity_data):
+    """Horizon returns, PL, last NAV date and type, plus the NAV levels they came from.
 
-    df_result = get_performance_table(nav)
+    Depends only on the panels' versions, so changing the custom period reuses it.
+    """
+    nav, total_equity = nav_data.frame, total_equity_data.frame
+
+    # Mesmo painel (ordenado + ffill) para a tabela de horizontes e o período customizado.
+    nav_levels = _normalize_nav_index(nav)
+    df_result = get_performance_table(nav_levels, ffilled=True)
     if df_result.empty:
-        return pd.DataFrame()
+        return pd.DataFrame(), nav_levels
 
     id_col = 'fund_name' if 'fund_name' in df_result.columns else df_result.columns[0]
     df_result = (
@@ -149,7 +166,25 @@ def build_peer_performance_table(nav, total_equity, start_date, end_date):
         .set_index('fund_name')
     )
 
-    nav_levels = _normalize_nav_index(nav)
+    pl_series = pd.Series(np.nan, index=df_result.index)
+    if total_equity is not None and not total_equity.empty:
+        pl_series = total_equity.ffill().iloc[-1].reindex(df_result.index)
+
+    df_result['PL'] = pl_series
+    df_result['ultima_cota'] = _last_nav_dates(nav).reindex(df_result.index)
+    df_result['type'] = df_result.index.map(_fund_type)
+    return df_result, nav_levels
+
+
+def build_peer_performance_table(nav_data, total_equity_data, start_date, end_date):
+    """Enrich utils performance returns with peer-group ranks, PL, last NAV date and type."""
+    if nav_data is None or nav_data.empty:
+        return pd.DataFrame()
+
+    df_result, nav_levels = _peer_horizon_table(nav_data, total_equity_data)
+    if df_result.empty:
+        return pd.DataFrame()
+
     df_result['custom'] = _custom_period_return(
         nav_levels, start_date, end_date
     ).reindex(df_result.index)
@@ -162,29 +197,14 @@ def build_peer_performance_table(nav, total_equity, start_date, end_date):
         )
         for key in RETURN_COLS
     }
-
-    pl_series = pd.Series(np.nan, index=df_result.index)
-    if total_equity is not None and not total_equity.empty:
-        pl_series = total_equity.ffill().iloc[-1].reindex(df_result.index)
-
-    ultima_cota = _last_nav_dates(nav).reindex(df_result.index)
-
-    df_result = df_result.assign(**ranks, PL=pl_series, ultima_cota=ultima_cota)
-    df_result['type'] = df_result.index.map(_fund_type)
+    df_result = df_result.assign(**ranks)
 
     col_order = ['type', 'PL', 'ultima_cota'] + RETURN_COLS + [f'{key}_rank' for key in RETURN_COLS]
     return df_result[col_order].reset_index()
 
-@st.cache_data(ttl=3600)
-def calculate_performance(df):
-    if df.empty or df.shape[0] < 2:
-        return df
-    df_pct_change = df.ffill().pct_change(fill_method=None)
-    cumulative_returns = (1 + df_pct_change).cumprod()
-    cumulative_returns.iloc[0] = 1 
-    final_returns = cumulative_returns.sub(1)
-    final_returns = final_returns.ffill()
-    return final_returns
+@cache_by_version(ttl=3600)
+def calculate_performance(data):
+    return cumulative_returns(data.frame)
 
 @st.cache_data(ttl=3600)
 def load_benchmark_data(fund_name, _nav_index):
@@ -199,14 +219,14 @@ def load_benchmark_data(fund_name, _nav_index):
                      'Long Bias': ('br_cdi_index', 'br_ibovespa', 'br_smll')}
 
     codes_to_fetch = benchmark_map.get(fund_name, ('br_cdi_index',)) # Default to CDI
-    df_benchmark = get_series(list(codes_to_fetch), start_date=_nav_index.min(), field='close')
+    df_benchmark = load_series(list(codes_to_fetch), start_date=_nav_index.min(), field='close')
     
     # Ensure df_benchmark is a DataFrame before renaming columns
     if isinstance(df_benchmark, pd.Series):
         df_benchmark = df_benchmark.to_frame('br_cdi_index')
 
     df_benchmark = df_benchmark.rename(columns={'br_cdi_index': 'CDI', 'br_ibovespa': 'Ibovespa', 'br_smll': 'SMLL'})
-    return df_benchmark
+    return VersionedFrame.of(df_benchmark)
 
 with st.sidebar:
     fund_names_list = ['Trinity', 'Yield', 'Phoenix', 'Prospera', 'FIDC', 'Compass', 'Nemesis', 'Proteus', 'Long Bias']
@@ -233,11 +253,13 @@ with st.spinner(f"Carregando dados de {selected_fund_name}...", show_time=True):
         if not _eq.empty:
             equity_list.append(_eq)
 
-    nav_data = pd.concat(nav_list, axis=1) if nav_list else pd.DataFrame()
+    nav_data = pd.concat([v.frame for v in nav_list], axis=1) if nav_list else pd.DataFrame()
     # Drop duplicate columns that appear in multiple groups
     nav_data = nav_data.loc[:, ~nav_data.columns.duplicated()]
-    total_equity_data = pd.concat(equity_list, axis=1) if equity_list else pd.DataFrame()
+    total_equity_data = pd.concat([v.frame for v in equity_list], axis=1) if equity_list else pd.DataFrame()
     total_equity_data = total_equity_data.loc[:, ~total_equity_data.columns.duplicated()]
+    # Versões derivadas das versões carregadas: os caches abaixo não re-hasheiam os painéis
+    total_equity_versioned = VersionedFrame(total_equity_data, derive_version('total_equity', *equity_list))
 
 if nav_data.empty:
     st.warning(f"Não foi possível carregar dados de NAV para o fundo {selected_fund_name}.")
@@ -252,7 +274,7 @@ if not persevera_fund_col_name:
     
 # Load benchmark data — union of all benchmarks across selected groups
 benchmark_df_list = [load_benchmark_data(fname, nav_data.index) for fname in selected_fund_names]
-benchmark_df = pd.concat(benchmark_df_list, axis=1)
+benchmark_df = pd.concat([v.frame for v in benchmark_df_list], axis=1)
 benchmark_df = benchmark_df.loc[:, ~benchmark_df.columns.duplicated()]
 
 # Merge NAV data with benchmark data
@@ -265,6 +287,10 @@ for col in benchmark_df.columns:
     if col in combined_nav_data:
         combined_nav_data[col] = combined_nav_data[col].ffill()
 
+combined_nav_versioned = VersionedFrame(
+    combined_nav_data, derive_version('combined_nav', *nav_list, *benchmark_df_list)
+)
+
 # Date Range Selection — min date is the Persevera fund's first valid NAV
 max_date_val = combined_nav_data.index.max().date()
 if persevera_fund_col_name and persevera_fund_col_name in combined_nav_data.columns:
@@ -365,7 +391,14 @@ chart_data_filtered = combined_nav_data.loc[
 
 # Calculate and display performance chart
 st.subheader("Performance Acumulada")
-performance_to_plot = calculate_performance(chart_data_filtered) * 100
+performance_to_plot = calculate_performance(
+    combined_nav_versioned.derive(
+        chart_data_filtered,
+        st.session_state.start_date,
+        st.session_state.end_date,
+        tuple(selected_funds_for_chart),
+    )
+) * 100
 if not performance_to_plot.empty:
     perf_chart_options = create_chart(
         data=performance_to_plot,
@@ -383,8 +416,8 @@ else:
 # Performance Table
 st.subheader("Tabela de Performance")
 performance_table_data = build_peer_performance_table(
-    combined_nav_data,
-    total_equity_data,
+    combined_nav_versioned,
+    total_equity_versioned,
     st.session_state.start_date,
     st.session_state.end_date
 )
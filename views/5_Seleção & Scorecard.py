@@ -7,20 +7,14 @@ from dateutil.relativedelta import relativedelta
 
 from services.position_service import load_assets
 
-from persevera_tools.data import get_funds_data, get_series
+from persevera_tools.data import get_funds_data
+from services.series_store import load_series
 from persevera_tools.db.fibery import read_fibery
-from persevera_tools.quant_research.metrics import (
-    calculate_annualized_return,
-    calculate_consistency,
-    calculate_annualized_volatility,
-    calculate_max_drawdown,
-    calculate_sharpe_ratio,
-    calculate_sortino_ratio,
-    calculate_calmar_ratio,
-)
 
 from utils.chart_helpers import create_chart, render_chart
 from utils.table import style_table
+from utils.fund_metrics import FundMetricsPanel
+from utils.versioned import VersionedFrame, cache_by_version
 
 st.title("Fundos · Seleção & Scorecard")
 
@@ -110,13 +104,13 @@ def load_taxonomy() -> pd.DataFrame:
         return pd.DataFrame(columns=["Name", "Nome Completo"])
 
 @st.cache_data(ttl=3600)
-def load_nav(cnpjs: tuple, start_date: str) -> pd.DataFrame:
+def load_nav(cnpjs: tuple, start_date: str) -> VersionedFrame:
     try:
         raw = get_funds_data(
             cnpjs=list(cnpjs), start_date=start_date, fields=["fund_nav"]
         )
         if raw.empty:
-            return pd.DataFrame()
+            return VersionedFrame.of(pd.DataFrame())
         if isinstance(raw.columns, pd.MultiIndex):
             lvl0 = raw.columns.get_level_values(0).unique().tolist()
             if "fund_nav" in lvl0:
@@ -130,73 +124,37 @@ def load_nav(cnpjs: tuple, start_date: str) -> pd.DataFrame:
         nav = nav.replace(0, np.nan).sort_index()
         if not isinstance(nav.index, pd.DatetimeIndex):
             nav.index = pd.to_datetime(nav.index)
-        return nav
+        return VersionedFrame.of(nav)
     except Exception as e:
         st.error(f"Erro ao carregar dados de NAV: {e}")
-        return pd.DataFrame()
+        return VersionedFrame.of(pd.DataFrame())
 
 @st.cache_data(ttl=3600)
-def load_benchmark(start_date: str) -> pd.Series:
+def load_benchmark(start_date: str) -> VersionedFrame:
     try:
-        raw = get_series(["br_cdi_index"], start_date=start_date, field="close")
+        raw = load_series(["br_cdi_index"], start_date=start_date, field="close")
         series = raw.iloc[:, 0] if isinstance(raw, pd.DataFrame) else raw
         if not isinstance(series.index, pd.DatetimeIndex):
             series.index = pd.to_datetime(series.index)
-        return series.rename("CDI")
+        return VersionedFrame.of(series.rename("CDI"))
     except Exception:
-        return pd.Series(dtype=float, name="CDI")
+        return VersionedFrame.of(pd.Series(dtype=float, name="CDI"))
 
 # ── Metric computation ────────────────────────────────────────────────────────
 
-def compute_metrics(nav_series: pd.Series, cdi_series: pd.Series, metric_params: dict) -> dict:
-    result = {}
-    nav = nav_series.dropna()
-    if len(nav) < 10:
-        return {m: np.nan for m in metric_params}
-
-    end_dt = nav.index.max()
-
-    for mname, params in metric_params.items():
-        key = METRICS[mname]["key"]
-        window = params["window"]
-        start_dt = end_dt - relativedelta(months=window)
-        pnav = nav.loc[start_dt:]
-
-        if len(pnav) < 5:
-            result[mname] = np.nan
-            continue
-
-        try:
-            if key == "retorno":
-                result[mname] = float(pnav.iloc[-1] / pnav.iloc[0] - 1)
-
-            elif key == "consistencia":
-                result[mname] = calculate_consistency(pnav, cdi_series.loc[start_dt:end_dt].dropna())
-
-            elif key == "volatilidade":
-                result[mname] = calculate_annualized_volatility(pnav, frequency="daily")
-
-            elif key == "max_dd":
-                result[mname] = abs(calculate_max_drawdown(pnav))
+@cache_by_version(ttl=3600)
+def compute_metrics(nav: VersionedFrame, cdi: VersionedFrame, metric_windows: tuple) -> pd.DataFrame:
+    """Métricas de todos os fundos (CNPJ × métrica) num único painel.
 
-            elif key == "sharpe":
-                rf = calculate_annualized_return(cdi_series.loc[start_dt:end_dt].dropna())
-                result[mname] = calculate_sharpe_ratio(pnav, risk_free_rate=rf)
-
-            elif key == "sortino":
-                rf = calculate_annualized_return(cdi_series.loc[start_dt:end_dt].dropna())
-                result[mname] = calculate_sortino_ratio(pnav, risk_free_rate=rf)
-
-            elif key == "calmar":
-                result[mname] = calculate_calmar_ratio(pnav)
-
-            else:
-                result[mname] = np.nan
-
-        except Exception:
-            result[mname] = np.nan
-
-    return result
+    Retorno, volatilidade e max drawdown são calculados de uma vez para todos
+    os fundos (conferidos contra o ``persevera_tools`` a cada janela); as
+    demais métricas são as funções do ``persevera_tools`` por fundo, com o CDI
+    (e a taxa livre de risco) de cada janela calculado uma vez.
+    """
+    panel = FundMetricsPanel(nav.frame, cdi.frame)
+    return panel.metrics({
+        mname: (METRICS[mname]["key"], window) for mname, window in metric_windows
+    })
 
 def compute_scores(raw: pd.DataFrame, metric_params: dict) -> pd.Series:
     """Percentile-rank weighted score with equal-weight-by-group normalization.
@@ -363,8 +321,9 @@ if d_start >= d_end:
 # ── Load data ─────────────────────────────────────────────────────────────────
 
 with st.spinner("Carregando dados...", show_time=True):
-    nav_raw = load_nav(tuple(cnpjs), str(d_start))
-    cdi_raw = load_benchmark(str(d_start))
+    nav_loaded = load_nav(tuple(cnpjs), str(d_start))
+    cdi_loaded = load_benchmark(str(d_start))
+    nav_raw, cdi_raw = nav_loaded.frame, cdi_loaded.frame
     taxonomy = load_taxonomy()
 
 if nav_raw.empty:
@@ -413,19 +372,17 @@ if not_found_count > 0:
 # ── Compute metrics ───────────────────────────────────────────────────────────
 
 with st.spinner("Calculando métricas...", show_time=True):
-    rows = []
-    for cnpj, label in labels.items():
-        if cnpj not in nav.columns:
-            continue
-        m = compute_metrics(nav[cnpj], cdi, active_params)
-        m["Fundo"] = label
-        rows.append(m)
+    metrics_df = compute_metrics(
+        nav_loaded.derive(nav, str(d_start), str(d_end)),
+        cdi_loaded.derive(cdi, str(d_start), str(d_end)),
+        tuple((mname, params["window"]) for mname, params in active_params.items()),
+    )
 
-if not rows:
+if metrics_df.empty:
     st.error("Nenhum fundo com dados suficientes para calcular as métricas.")
     st.stop()
 
-raw_df = pd.DataFrame(rows).set_index("Fundo")
+raw_df = metrics_df.rename(index=labels).rename_axis("Fundo")
 
 # Convert raw values to percentage for display.
 # Max Drawdown is stored as a positive absolute value internally;
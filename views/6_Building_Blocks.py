@@ -8,7 +8,8 @@ from utils.table import style_table
 
 from persevera_tools.quant_research.metrics import calculate_tracking_error
 from persevera_tools.data.sma import get_building_blocks
-from persevera_tools.data import get_series, get_funds_data
+from persevera_tools.data import get_funds_data
+from services.series_store import load_series
 
 st.title("Building Blocks")
 
@@ -16,7 +17,7 @@ st.title("Building Blocks")
 def load_data(codes, start_date):
     try:
         df = pd.merge(
-            get_series(codes, start_date=start_date, field='close').dropna(how='all', axis='columns'),
+            load_series(codes, start_date=start_date, field='close').dropna(how='all', axis='columns'),
             get_funds_data(cnpjs=codes, start_date=start_date, fields=['fund_nav']).dropna(how='all', axis='columns'),
             left_index=True,
             right_index=True,
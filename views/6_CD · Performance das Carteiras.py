@@ -4,7 +4,7 @@ import pandas as pd
 from datetime import datetime, date
 from utils.chart_helpers import create_chart
 from utils.table import style_table, get_performance_table
-from persevera_tools.data import get_series
+from services.series_store import load_series
 from persevera_tools.data.providers import ComdinheiroProvider
 from configs.pages.carteiras_administradas import CODIGOS_CARTEIRAS_ADM
 
@@ -13,7 +13,7 @@ st.title("Performance · Carteiras")
 @st.cache_data(ttl=3600)
 def load_indicators(codes, start_date):
     try:
-        return get_series(codes, start_date=start_date, field='close')
+        return load_series(codes, start_date=start_date, field='close')
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -8,8 +8,7 @@ from st_aggrid import AgGrid
 
 from configs.pages.carteiras_administradas import CODIGOS_CARTEIRAS_ADM
 from services.position_service import (
-    load_positions,
-    get_latest_date_data,
+    load_latest_positions,
     get_emissor_column,
 )
 
@@ -50,10 +49,8 @@ def prepare_maturity_positions(df: pd.DataFrame) -> pd.DataFrame:
             "Saldo": ("Saldo", "sum"),
         }
     )
-    df_current = get_latest_date_data(
-        df_maturity, level="Data Posição", group_level="Portfolio"
-    ).copy()
-    df_current = df_current.reset_index().set_index(["Portfolio", "Nome Ativo"])
+    # ``df`` já é o recorte mais recente por portfolio (``load_latest_positions``).
+    df_current = df_maturity.reset_index().set_index(["Portfolio", "Nome Ativo"])
     df_current["Data Vencimento"] = pd.to_datetime(df_current["Data Vencimento"])
     df_current = df_current[df_current["Saldo"] > 0]
     df_current["Dias para Vencimento"] = np.busday_count(
@@ -78,11 +75,11 @@ def format_currency(value: float) -> str:
 st.title("Posições · Controle de Vencimentos")
 
 with st.spinner("Carregando dados...", show_time=True):
-    st.session_state.df = load_positions()
+    st.session_state.df_latest, _ = load_latest_positions()
 
 show_data_freshness("positions", label="Posições", ttl_minutes=60)
 
-df_base = prepare_base_df(st.session_state.df)
+df_base = prepare_base_df(st.session_state.df_latest)
 portfolio_options = set(CODIGOS_CARTEIRAS_ADM) & set(df_base["Portfolio"].dropna().unique())
 
 with st.sidebar:
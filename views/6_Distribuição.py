@@ -8,10 +8,9 @@ import streamlit as st
 from utils.ui import show_data_freshness
 from utils.table import style_table
 from services.position_service import (
-    load_positions,
+    load_latest_positions,
     load_target_allocations,
     load_portfolio_info,
-    get_latest_date_data,
     get_emissor_column,
     build_portfolio_snapshot,
     ASSET_CLASSES_ORDER,
@@ -21,13 +20,15 @@ from services.position_service import (
 st.title("Posições · Distribuição")
 
 with st.spinner("Carregando dados...", show_time=True):
-    st.session_state.df = load_positions()
+    st.session_state.df_latest, st.session_state.latest_position_dates = load_latest_positions()
     st.session_state.df_target_allocations = load_target_allocations(include_limits=False)
     st.session_state.df_portfolio_info = load_portfolio_info()
 
 show_data_freshness("positions", label="Posições", ttl_minutes=60)
 
-df_raw = st.session_state.df
+# Só a data mais recente de cada portfolio: todas as tabelas abaixo são "posição atual".
+df_raw = st.session_state.df_latest
+latest_position_dates = st.session_state.latest_position_dates
 df = df_raw.copy()
 df.replace(' ', np.nan, inplace=True)
 df.dropna(subset=['Nome Ativo', 'Classificação do Conjunto'], inplace=True)
@@ -97,26 +98,17 @@ elif df is not None:
             'Valor Unitário': ('Valor Unitário', 'mean'),
             'Saldo': ('Saldo', 'sum')
         })
-        df_positions_current = get_latest_date_data(
-            df_positions, level='Data Posição', group_level='Portfolio'
-        ).reset_index()
+        df_positions_current = df_positions.reset_index()
 
         df_total_positions = df.groupby(
             [pd.Grouper(key='Data Posição', freq='D'), 'Portfolio']
         ).agg(**{'Saldo': ('Saldo', 'sum')})
-        df_total_positions_current = get_latest_date_data(
-            df_total_positions, level='Data Posição', group_level='Portfolio'
-        )
-        df_total_positions_current = (
-            df_total_positions_current.reset_index().set_index('Portfolio')
-        )
+        df_total_positions_current = df_total_positions.reset_index().set_index('Portfolio')
 
         df_total_positions_by_asset_class = df.groupby(
             [pd.Grouper(key='Data Posição', freq='D'), 'Portfolio', 'Classificação do Conjunto']
         ).agg(**{'Saldo': ('Saldo', 'sum')})
-        df_total_positions_by_asset_class_current = get_latest_date_data(
-            df_total_positions_by_asset_class, level='Data Posição', group_level='Portfolio'
-        ).reset_index()
+        df_total_positions_by_asset_class_current = df_total_positions_by_asset_class.reset_index()
         df_total_positions_by_asset_class_current = df_total_positions_by_asset_class_current.pivot(
             index='Classificação do Conjunto', columns='Portfolio', values='Saldo'
         )
@@ -141,9 +133,9 @@ elif df is not None:
         df_positions_emissor_devedor = df[df['Classificação Instrumento'].isin(INSTRUMENTOS_RF)].groupby(
             [pd.Grouper(key='Data Posição', freq='D'), 'Portfolio', 'Emissor Geral']
         ).agg(**{'Saldo': ('Saldo', 'sum')})
-        df_emissor_devedor_current = get_latest_date_data(
-            df_positions_emissor_devedor, level='Data Posição', group_level='Portfolio'
-        ).reset_index().sort_values(by='Saldo', ascending=False)
+        df_emissor_devedor_current = (
+            df_positions_emissor_devedor.reset_index().sort_values(by='Saldo', ascending=False)
+        )
         df_emissor_devedor_current = df_emissor_devedor_current.pivot(
             index='Emissor Geral', columns='Portfolio', values='Saldo'
         )
@@ -250,6 +242,7 @@ elif df is not None:
             df,
             df_target_allocations,
             active_carteiras_only=False,
+            latest_dates=latest_position_dates,
         )
         st.download_button(
             label="⬇️ Download snapshot (JSON)",
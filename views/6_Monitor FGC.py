@@ -7,10 +7,9 @@ from utils.table import style_table
 
 from configs.pages.carteiras_administradas import CODIGOS_CARTEIRAS_ADM
 from services.position_service import (
-    load_positions,
+    load_latest_positions,
     load_instruments_fgc,
     load_issuers,
-    get_latest_date_data,
     get_emissor_column,
 )
 
@@ -56,9 +55,8 @@ def prepare_current_positions(
             "Saldo": ("Saldo", "sum"),
         }
     )
-    current = get_latest_date_data(
-        grouped, level="Data Posição", group_level="Portfolio"
-    ).reset_index()
+    # ``df`` já é o recorte mais recente por portfolio (``load_latest_positions``).
+    current = grouped.reset_index()
     current = current[current["Saldo"] > 0].copy()
     current["Aprovado"] = current["Status do Emissor"].isin(APPROVED_STATUSES)
     current["Coberto FGC"] = current["Classificação Instrumento"].isin(instruments_fgc)
@@ -151,13 +149,13 @@ def format_currency(value: float) -> str:
 st.title("Monitor FGC")
 
 with st.spinner("Carregando dados...", show_time=True):
-    st.session_state.df = load_positions()
+    st.session_state.df_latest, _ = load_latest_positions()
     st.session_state.instruments_fgc = load_instruments_fgc()
     st.session_state.df_issuers = load_issuers()
 
 show_data_freshness("positions", label="Posições", ttl_minutes=60)
 
-df_base = prepare_base_df(st.session_state.df, st.session_state.df_issuers)
+df_base = prepare_base_df(st.session_state.df_latest, st.session_state.df_issuers)
 instruments_fgc = st.session_state.instruments_fgc
 portfolio_options = set(CODIGOS_CARTEIRAS_ADM) & set(df_base["Portfolio"].dropna().unique())
 
@@ -8,8 +8,11 @@ from utils.ui import show_data_freshness
 from utils.table import style_table
 
 from services.position_service import load_accounts
-from persevera_tools.data.providers.ws_xp import XPWSProvider
-from persevera_tools.data.providers.ws_btg import BTGWSProvider
+from services.custodian_balance_service import (
+    adjust_cnpj,
+    balances_for_fund,
+    fetch_account_positions,
+)
 
 ZERAGEM_CUSTODIANS = ('XPCV', 'BTG CTVM')
 
@@ -23,9 +26,6 @@ PRE_SELECTED_FUNDS = {
 
 CUSTOM_FUND_OPTION = 'Outro (informar CNPJ)'
 
-def adjust_cnpj(cnpj: str) -> str:
-    return cnpj.replace('.', '').replace('/', '').replace('-', '')
-
 def format_cnpj(cnpj: str) -> str:
     digits = adjust_cnpj(cnpj)
     if len(digits) != 14:
@@ -35,70 +35,6 @@ def format_cnpj(cnpj: str) -> str:
 def is_valid_cnpj(cnpj: str) -> bool:
     return len(adjust_cnpj(cnpj)) == 14
 
-def format_btg_account(nr_conta: str) -> str:
-    return str(nr_conta).strip().zfill(9)
-
-def get_balance_xp(accounts: pd.DataFrame, cnpj: str, balance_col: str) -> pd.DataFrame:
-    provider = XPWSProvider()
-    cnpj_digits = adjust_cnpj(cnpj)
-    rows = []
-
-    for _, row in accounts.iterrows():
-        df = provider.get_data('consolidated_position_d0', customer_code=row['Nr Conta'])
-
-        fund_balance = 0.0
-        for item in df['posicaoDetalhada.fundos.itens'][0]:
-            if item['cnpj'] == cnpj_digits:
-                fund_balance = float(item['valorAtual'])
-                break
-
-        rows.append({
-            'Portfolio': row['Portfolio'],
-            'Custodiante': row['Custodiante'],
-            'Conta': row['Nr Conta'],
-            'Saldo Disponível': float(df['posicaoDetalhada.financeiro.valorDisponivel'].values[0]),
-            balance_col: fund_balance,
-        })
-
-    return pd.DataFrame(rows)
-
-def get_balance_btg(accounts: pd.DataFrame, cnpj: str, balance_col: str) -> pd.DataFrame:
-    provider = BTGWSProvider()
-    cnpj_digits = adjust_cnpj(cnpj)
-    rows = []
-
-    for _, row in accounts.iterrows():
-        account_number = format_btg_account(row['Nr Conta'])
-
-        summary_df = provider.get_position_by_asset_class(account_number, 'SummaryAccounts')
-        cash_balance = 0.0
-        if not summary_df.empty and 'MarketAbbreviation' in summary_df.columns:
-            cc_rows = summary_df[summary_df['MarketAbbreviation'] == 'CC']
-            if not cc_rows.empty:
-                cash_balance = float(cc_rows['EndPositionValue'].astype(float).sum())
-
-        funds_df = provider.get_position_by_asset_class(account_number, 'InvestmentFund')
-        fund_balance = 0.0
-        fund_cge_code = ''
-        if not funds_df.empty and 'FundCNPJCode' in funds_df.columns:
-            matching = funds_df[funds_df['FundCNPJCode'].astype(str) == cnpj_digits]
-            if not matching.empty:
-                if 'Acquisition_GrossAssetValue' in matching.columns:
-                    fund_balance = float(matching['Acquisition_GrossAssetValue'].astype(float).sum())
-                if 'FundCGECode' in matching.columns:
-                    fund_cge_code = str(matching.iloc[0]['FundCGECode']).strip()
-
-        rows.append({
-            'Portfolio': row['Portfolio'],
-            'Custodiante': row['Custodiante'],
-            'Conta': account_number,
-            'Código Fundo (CGE)': fund_cge_code,
-            'Saldo Disponível': cash_balance,
-            balance_col: fund_balance,
-        })
-
-    return pd.DataFrame(rows)
-
 def finalize_balance_df(
     df: pd.DataFrame,
     fund_cnpj: str,
@@ -117,10 +53,34 @@ def finalize_balance_df(
         ascending=False,
     )
 
-def balance_cache_key(custodian: str, fund_cnpj: str) -> str:
+def positions_cache_key(custodian: str) -> str:
     slug = custodian.lower().replace(' ', '_')
-    version = 'v3' if custodian == 'BTG CTVM' else 'v2'
-    return f'zeragem_balance_{slug}_{version}_{fund_cnpj}'
+    return f'zeragem_positions_{slug}_v1'
+
+def refresh_positions(custodian: str, accounts: pd.DataFrame) -> None:
+    progress = st.progress(0.0, text=f'Consultando posições {custodian}...')
+
+    def _on_progress(done: int, total: int) -> None:
+        progress.progress(done / total, text=f'Consultando posições {custodian}... {done}/{total}')
+
+    st.session_state[positions_cache_key(custodian)] = fetch_account_positions(
+        custodian,
+        accounts['Nr Conta'].astype(str).tolist(),
+        on_progress=_on_progress,
+    )
+    progress.empty()
+
+def show_failed_accounts(custodian: str, snapshot: dict, accounts: pd.DataFrame) -> None:
+    if not snapshot['falhas']:
+        return
+    df_failed = accounts[accounts['Nr Conta'].astype(str).isin(snapshot['falhas'])][['Portfolio', 'Nr Conta']].copy()
+    df_failed['Erro'] = df_failed['Nr Conta'].astype(str).map(snapshot['falhas'])
+    st.warning(
+        f'{len(snapshot["falhas"])} conta(s) {custodian} não puderam ser consultadas '
+        'e ficaram fora da tabela. Clique em atualizar para tentar novamente.'
+    )
+    with st.expander(f'Contas com falha · {custodian}'):
+        st.dataframe(df_failed, hide_index=True)
 
 if 'df_accounts' not in st.session_state or st.session_state.df_accounts is None:
     with st.spinner("Carregando contas sob gestão...", show_time=True):
@@ -182,37 +142,35 @@ if not cnpj_valid:
     st.stop()
 
 balance_col = f'Saldo · {fund_label}'
-xp_cache_key = balance_cache_key('XPCV', fund_cnpj)
-btg_cache_key = balance_cache_key('BTG CTVM', fund_cnpj)
 
 df_xp_accounts = df_zeragem_accounts[df_zeragem_accounts['Custodiante'] == 'XPCV']
 df_btg_accounts = df_zeragem_accounts[df_zeragem_accounts['Custodiante'] == 'BTG CTVM']
 
+# Posições ficam em sessão por conta (independentes do fundo): trocar o CNPJ
+# recalcula os saldos sem novas chamadas aos custodiantes.
 if btn_update_xp and not df_xp_accounts.empty:
-    with st.spinner('Carregando saldos XPCV...', show_time=True):
-        st.session_state[xp_cache_key] = finalize_balance_df(
-            get_balance_xp(df_xp_accounts, fund_cnpj, balance_col),
-            fund_cnpj,
-            balance_col,
-        )
+    refresh_positions('XPCV', df_xp_accounts)
 
 if btn_update_btg and not df_btg_accounts.empty:
-    with st.spinner('Carregando saldos BTG CTVM...', show_time=True):
-        st.session_state[btg_cache_key] = finalize_balance_df(
-            get_balance_btg(df_btg_accounts, fund_cnpj, balance_col),
-            fund_cnpj,
-            balance_col,
-            require_fund_cge=True,
-        )
+    refresh_positions('BTG CTVM', df_btg_accounts)
 
 loaded_parts = []
 loaded_labels = []
-if xp_cache_key in st.session_state:
-    loaded_parts.append(st.session_state[xp_cache_key])
-    loaded_labels.append('XPCV')
-if btg_cache_key in st.session_state:
-    loaded_parts.append(st.session_state[btg_cache_key])
-    loaded_labels.append('BTG CTVM')
+for custodian, df_custodian_accounts, require_fund_cge in (
+    ('XPCV', df_xp_accounts, False),
+    ('BTG CTVM', df_btg_accounts, True),
+):
+    snapshot = st.session_state.get(positions_cache_key(custodian))
+    if snapshot is None:
+        continue
+    show_failed_accounts(custodian, snapshot, df_custodian_accounts)
+    loaded_parts.append(finalize_balance_df(
+        balances_for_fund(df_custodian_accounts, snapshot, fund_cnpj, balance_col),
+        fund_cnpj,
+        balance_col,
+        require_fund_cge=require_fund_cge,
+    ))
+    loaded_labels.append(f'{custodian} ({snapshot["fetched_at"].strftime("%H:%M")})')
 
 if not loaded_parts:
     st.info(
@@ -230,11 +188,11 @@ df_accounts_data.sort_values(
 
 pending_labels = [
     label
-    for label, count, cache_key in (
-        ('XPCV', xp_account_count, xp_cache_key),
-        ('BTG CTVM', btg_account_count, btg_cache_key),
+    for label, count in (
+        ('XPCV', xp_account_count),
+        ('BTG CTVM', btg_account_count),
     )
-    if count > 0 and cache_key not in st.session_state
+    if count > 0 and positions_cache_key(label) not in st.session_state
 ]
 if pending_labels:
     st.caption(
@@ -9,6 +9,8 @@ from utils.table import style_table, get_performance_table
 from utils.tearsheet import render_tearsheet
 
 from services.position_service import (
+    comdinheiro_history_covers,
+    comdinheiro_history_version,
     load_assets,
     load_equities_portfolio,
     load_historical_positions_from_comdinheiro,
@@ -18,12 +20,14 @@ from services.position_service import (
 from services.rvqm_adherence_service import (
     build_adherence_summary,
     calculate_portfolio_twr,
+    calculate_portfolios_twr,
     filter_equity_sleeve,
     pivot_model_weights,
     positions_to_weights,
 )
 
-from persevera_tools.data import get_descriptors, get_series
+from persevera_tools.data import get_descriptors
+from services.series_store import load_series
 
 _CACHE_TTL = 10800  # 3h — alinhado a position_service
 
@@ -40,7 +44,7 @@ def load_data(codes: tuple, start_date, field: tuple):
 
 @st.cache_data(ttl=_CACHE_TTL)
 def load_indicators(codes: tuple, start_date):
-    return get_series(list(codes), start_date=start_date)
+    return load_series(list(codes), start_date=start_date)
 
 
 def merge_prices(base_prices: pd.DataFrame, extra_tickers: list, start_date) -> pd.DataFrame:
@@ -89,9 +93,11 @@ def build_adherence_payload(
     if adherence_prices.empty:
         return {"status": "empty_prices"}
 
+    # Todas as carteiras de uma vez (retornos dos ativos calculados uma única vez)
+    client_twr = calculate_portfolios_twr(client_weights, adherence_prices, lag_weights=True)
     client_returns = {
-        name: calculate_portfolio_twr(weights, adherence_prices, lag_weights=True)
-        for name, weights in client_weights.items()
+        name: client_twr[name] if name in client_twr.columns else pd.Series(dtype=float, name="twr")
+        for name in client_weights
     }
 
     strategy_by_portfolio: dict[str, str] = {}
@@ -133,6 +139,34 @@ def build_adherence_payload(
         "summary": summary,
     }
 
+@st.cache_data(ttl=_CACHE_TTL, show_spinner=False)
+def load_adherence_payload(
+    portfolios: tuple,
+    start_ts,
+    end_ts,
+    data_version: tuple,
+    _raw_hist: pd.DataFrame,
+    _prices: pd.DataFrame,
+    _strategy_weights_by_tipo: dict[str, pd.DataFrame],
+    _strategy_returns_by_tipo: dict[str, pd.Series],
+    _portfolio_tipo_map: dict[str, str],
+) -> dict:
+    """Payload de aderência compartilhado entre sessões.
+
+    A chave é (carteiras, período, versão dos dados); os frames (prefixo ``_``)
+    não entram no hash — ``data_version`` identifica a safra de preços,
+    carteira-modelo e histórico ComDinheiro usados.
+    """
+    return build_adherence_payload(
+        raw_hist=_raw_hist,
+        prices=_prices,
+        strategy_weights_by_tipo=_strategy_weights_by_tipo,
+        strategy_returns_by_tipo=_strategy_returns_by_tipo,
+        portfolio_tipo_map=_portfolio_tipo_map,
+        start_ts=start_ts,
+        end_ts=end_ts,
+    )
+
 # =============================================================================
 # Carregamento de dados
 # =============================================================================
@@ -232,16 +266,17 @@ returns_df.columns = ['Carteira', 'Ibovespa', 'SMLL', 'CDI']
 
 # Pré-calcula retornos/pesos de todas as estratégias para a aderência por Tipo.
 strategy_weights_by_tipo: dict[str, pd.DataFrame] = {}
-strategy_returns_by_tipo: dict[str, pd.Series] = {}
 for tipo in strategy_options:
     tipo_portfolio = equities_all[equities_all["tipo"] == tipo]
     if tipo_portfolio.empty:
         continue
-    tipo_weights = pivot_model_weights(tipo_portfolio).reindex(prices.index).ffill()
-    strategy_weights_by_tipo[tipo] = tipo_weights
-    strategy_returns_by_tipo[tipo] = calculate_portfolio_twr(
-        tipo_weights, prices, lag_weights=True
-    )
+    strategy_weights_by_tipo[tipo] = pivot_model_weights(tipo_portfolio).reindex(prices.index).ffill()
+
+strategy_twr = calculate_portfolios_twr(strategy_weights_by_tipo, prices, lag_weights=True)
+strategy_returns_by_tipo = {
+    tipo: strategy_twr[tipo] if tipo in strategy_twr.columns else pd.Series(dtype=float, name="twr")
+    for tipo in strategy_weights_by_tipo
+}
 
 # =============================================================================
 # Histórico de Alocações (só materializa se solicitado)
@@ -358,8 +393,6 @@ st.caption(
 )
 
 for key in (
-    "rvqm_adherence_raw",
-    "rvqm_adherence_raw_key",
     "rvqm_adherence_result",
     "rvqm_adherence_result_key",
 ):
@@ -402,38 +435,11 @@ adherence_key = (
 )
 
 
-def _raw_covers_period(raw_key, portfolios: tuple, start: pd.Timestamp, end: pd.Timestamp) -> bool:
-    """True se o raw em cache já cobre carteiras + intervalo pedido (permite só fatiar)."""
-    if raw_key is None:
-        return False
-    cached_ports, cached_start, cached_end = raw_key
-    return (
-        cached_ports == portfolios
-        and pd.Timestamp(cached_start) <= start
-        and pd.Timestamp(cached_end) >= end
-    )
-
-
-def _slice_raw_hist(raw_hist: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
-    if raw_hist is None or raw_hist.empty:
-        return raw_hist
-    date_col = "date" if "date" in raw_hist.columns else None
-    if date_col is None:
-        return raw_hist
-    dates = pd.to_datetime(raw_hist[date_col])
-    return raw_hist.loc[(dates >= start) & (dates <= end)].copy()
-
-
-# Recalcula a partir do raw em cache quando só o período muda (sem novo hit no ComDinheiro).
-can_reuse_raw = _raw_covers_period(
-    st.session_state.rvqm_adherence_raw_key,
-    adherence_key[0],
-    start_ts,
-    end_ts,
-)
+# Histórico ComDinheiro fica num store por carteira compartilhado entre sessões
+# (position_service): se já cobre carteiras + período, recalcula sem novo hit.
+can_reuse_raw = comdinheiro_history_covers(adherence_key[0], start_ts, end_ts)
 needs_result_refresh = (
     can_reuse_raw
-    and st.session_state.rvqm_adherence_raw is not None
     and st.session_state.rvqm_adherence_result_key != adherence_key
 )
 
@@ -441,44 +447,48 @@ if btn_adherence or needs_result_refresh:
     if btn_adherence and not selected_portfolios:
         st.warning("Selecione ao menos uma carteira.")
     elif selected_portfolios:
-        need_fetch = not can_reuse_raw
-        if need_fetch and btn_adherence:
-            with st.spinner("Carregando posições históricas do ComDinheiro...", show_time=True):
-                try:
-                    raw_hist = load_historical_positions_from_comdinheiro(
-                        portfolios=adherence_key[0],
-                        start_date=start_ts.strftime("%Y-%m-%d"),
-                        end_date=end_ts.strftime("%Y-%m-%d"),
-                    )
-                    st.session_state.rvqm_adherence_raw = raw_hist
-                    st.session_state.rvqm_adherence_raw_key = adherence_key
-                except Exception as e:
-                    st.session_state.rvqm_adherence_raw = None
-                    st.session_state.rvqm_adherence_raw_key = None
-                    st.session_state.rvqm_adherence_result = None
-                    st.session_state.rvqm_adherence_result_key = None
-                    st.error(f"Erro ao carregar posições históricas: {e}")
-
-        raw_hist = st.session_state.rvqm_adherence_raw
-        should_process = raw_hist is not None and (
-            needs_result_refresh
-            or (
-                btn_adherence
-                and st.session_state.rvqm_adherence_raw_key == adherence_key
-            )
+        raw_hist = None
+        spinner_msg = (
+            "Carregando posições históricas..."
+            if can_reuse_raw
+            else "Carregando posições históricas do ComDinheiro (só períodos ainda não baixados)..."
         )
-        if should_process and not raw_hist.empty:
-            raw_sliced = _slice_raw_hist(raw_hist, start_ts, end_ts)
+        with st.spinner(spinner_msg, show_time=True):
+            try:
+                raw_hist = load_historical_positions_from_comdinheiro(
+                    portfolios=adherence_key[0],
+                    start_date=start_ts.strftime("%Y-%m-%d"),
+                    end_date=end_ts.strftime("%Y-%m-%d"),
+                )
+            except Exception as e:
+                st.session_state.rvqm_adherence_result = None
+                st.session_state.rvqm_adherence_result_key = None
+                st.error(f"Erro ao carregar posições históricas: {e}")
+
+        if raw_hist is not None and raw_hist.empty:
+            st.session_state.rvqm_adherence_result = {"status": "empty_raw"}
+            st.session_state.rvqm_adherence_result_key = adherence_key
+        elif raw_hist is not None:
+            data_version = (
+                prices.index.max(),
+                prices.shape,
+                equities_all["date"].max(),
+                len(equities_all),
+                comdinheiro_history_version(adherence_key[0]),
+                tuple((p, portfolio_tipo_map.get(p)) for p in adherence_key[0]),
+            )
             with st.spinner("Calculando aderência..."):
                 try:
-                    payload = build_adherence_payload(
-                        raw_hist=raw_sliced,
-                        prices=prices,
-                        strategy_weights_by_tipo=strategy_weights_by_tipo,
-                        strategy_returns_by_tipo=strategy_returns_by_tipo,
-                        portfolio_tipo_map=portfolio_tipo_map,
-                        start_ts=start_ts,
-                        end_ts=end_ts,
+                    payload = load_adherence_payload(
+                        adherence_key[0],
+                        start_ts,
+                        end_ts,
+                        data_version,
+                        raw_hist,
+                        prices,
+                        strategy_weights_by_tipo,
+                        strategy_returns_by_tipo,
+                        portfolio_tipo_map,
                     )
                     st.session_state.rvqm_adherence_result = payload
                     st.session_state.rvqm_adherence_result_key = adherence_key
@@ -486,9 +496,6 @@ if btn_adherence or needs_result_refresh:
                     st.session_state.rvqm_adherence_result = None
                     st.session_state.rvqm_adherence_result_key = None
                     st.error(f"Erro ao calcular aderência: {e}")
-        elif should_process and raw_hist.empty:
-            st.session_state.rvqm_adherence_result = {"status": "empty_raw"}
-            st.session_state.rvqm_adherence_result_key = adherence_key
 
 result = st.session_state.rvqm_adherence_result
 result_key = st.session_state.rvqm_adherence_result_key
@@ -1,10 +1,8 @@
-import io
 from datetime import datetime
 
 import pandas as pd
 import numpy as np
 import streamlit as st
-import requests
 
 from utils.table import style_table
 
@@ -15,6 +13,10 @@ from services.position_service import (
     load_positions,
     resolve_portfolio_strategy,
 )
+from services.market_data_poller import (
+    FETCH_TIMEOUT,
+    get_market_data_poller,
+)
 from services.external_positions_service import (
     MATCH_AMBIGUOUS,
     MATCH_MATCHED,
@@ -36,54 +38,13 @@ ORIGEM_MANUAL = "Posição manual"
 
 st.title("RVQM · Rebalanceador")
 
-GOOGLE_SHEET_ID = "1aF-HUyj4GNwKCgS263e2IBzT1_fU_nztUirRAKKlsWo"
-GOOGLE_SHEET_GID = "0"
-GOOGLE_SHEET_CSV_URL = (
-    f"https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/export"
-    f"?format=csv&gid={GOOGLE_SHEET_GID}"
-)
-
-MARKET_DATA_COLUMNS = [
-    "RT_PX_CHG_PCT_1D",
-    "LAST_PRICE",
-    "YEST_LAST_TRADE",
-    "EQY_TURNOVER_REALTIME",
-    "30_DAY_AVG_TURNOVER_AT_TIME_RT",
-    "VOLUME",
-    "BID",
-    "ASK",
-    "EXCH_TODAY_ALT_SETT_IN_PRICE_RT",
-]
+# Snapshot mais velho que isso (s) é sinalizado como defasado na página.
+MARKET_DATA_STALE_AFTER = 5 * 60
 
 # =============================================================================
 # Funções de carregamento
 # =============================================================================
 
-def normalize_asset_code(value: object) -> str:
-    if pd.isna(value):
-        return ""
-    text = str(value).strip().upper()
-    if text.startswith("BR_"):
-        text = text[3:]
-    return text.replace(".SA", "").split()[0]
-
-def parse_google_number(value: object) -> float:
-    if pd.isna(value):
-        return np.nan
-    if isinstance(value, (int, float, np.number)):
-        return float(value)
-
-    text = str(value).strip().replace("\xa0", "").replace("%", "")
-    if not text:
-        return np.nan
-
-    if "," in text:
-        text = text.replace(".", "").replace(",", ".")
-    elif text.count(".") > 1 or len(text.rsplit(".", 1)[-1]) == 3:
-        text = text.replace(".", "")
-
-    return pd.to_numeric(text, errors="coerce")
-
 def instrument_lot_size(instrument: object) -> int:
     if instrument == "BDR":
         return FRACTIONAL_LOT_SIZE
@@ -226,29 +187,6 @@ def compute_lot_orders(
 
     return pd.Series(result, index=qty_raw.index)
 
-@st.cache_data(ttl=60)
-def load_google_sheet_market_data() -> pd.DataFrame:
-    response = requests.get(GOOGLE_SHEET_CSV_URL, timeout=20)
-    response.raise_for_status()
-
-    df = pd.read_csv(io.StringIO(response.text))
-    df.columns = [str(column).strip() for column in df.columns]
-    df = df.dropna(axis=1, how="all").dropna(axis=0, how="all")
-
-    if "index" not in df.columns:
-        raise ValueError("Coluna 'index' não encontrada na planilha do Google Sheets.")
-
-    df = df.rename(columns={"index": "ticker_bloomberg"})
-    df["ticker_bloomberg"] = df["ticker_bloomberg"].astype(str).str.strip()
-    df = df[df["ticker_bloomberg"].ne("")]
-    df["code_key"] = df["ticker_bloomberg"].map(normalize_asset_code)
-
-    for column in MARKET_DATA_COLUMNS:
-        if column in df.columns:
-            df[column] = df[column].map(parse_google_number)
-
-    return df
-
 # =============================================================================
 # Sidebar — seleção de portfolio
 # =============================================================================
@@ -346,9 +284,10 @@ with st.sidebar:
 # Carregamento de dados
 # =============================================================================
 
+market_data_poller = get_market_data_poller()
 if st.button("Atualizar BLP Relay", type="primary"):
-    load_google_sheet_market_data.clear()
-    st.toast("Cache do BLP Relay limpo. Buscando dados atualizados...")
+    with st.spinner("Buscando dados atualizados do BLP Relay..."):
+        market_data_poller.refresh(wait=FETCH_TIMEOUT)
 
 with st.spinner(f"Carregando composição da carteira {strategy_tipo}..."):
     equities_portfolio = load_equities_portfolio(tipo=strategy_tipo)
@@ -422,13 +361,32 @@ else:
         df_positions = load_positions()
     positions_carteira = df_positions[df_positions["Portfolio"] == selected_portfolio]
 
+# Leitura do último snapshot publicado pelo poller; só espera na primeira carga do processo
 with st.spinner("Carregando dados de mercado do Google Sheets..."):
     try:
-        market_data = load_google_sheet_market_data()
+        market_snapshot = market_data_poller.latest(wait=FETCH_TIMEOUT)
     except Exception as e:
         st.error(f"Erro ao carregar dados do BLP Relay: {str(e)}")
         st.stop()
 
+if market_snapshot is None:
+    st.error("Dados do BLP Relay ainda não disponíveis. Tente novamente em alguns segundos.")
+    st.stop()
+
+market_data = market_snapshot.frame()
+market_data_age = market_snapshot.age_seconds()
+st.caption(
+    f"BLP Relay ({market_snapshot.source}) · versão {market_snapshot.version} · "
+    f"atualizado às {market_snapshot.fetched_at:%H:%M:%S} (há {market_data_age:.0f}s)"
+)
+if market_snapshot.last_error:
+    st.warning(
+        f"Última atualização falhou às {market_snapshot.last_error_at:%H:%M:%S}: "
+        f"{market_snapshot.last_error}. Exibindo a versão anterior."
+    )
+elif market_data_age > MARKET_DATA_STALE_AFTER:
+    st.warning(f"Dados do BLP Relay defasados (há {market_data_age / 60:.0f} min sem atualização).")
+
 if equities_portfolio.empty:
     st.warning(f"Nenhuma composição de carteira {strategy_tipo} disponível para exibir.")
     st.stop()
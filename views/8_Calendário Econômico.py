@@ -1,13 +1,13 @@
 import streamlit as st
-from persevera_tools.data import FinancialDataService
+from services.financial_data_service import get_financial_data_service
 from utils.table import style_table
 
 st.title('Calendário Econômico')
 
-try:
-    fds = FinancialDataService(start_date="2025-01-01")
-except Exception as e:
-    st.error(f"Erro ao inicializar FinancialDataService: {e}")
+fds = get_financial_data_service(start_date="2025-01-01")
+# O provider é (re)criado a cada carregamento enquanto estiver falhando
+if fds.investing_com is None:
+    st.error(f"Erro ao inicializar o provider do Investing.com: {fds.get_provider_error('investing_com')}")
     st.stop()
 
 with st.spinner("Carregando dados...", show_time=True):
@@ -3,7 +3,7 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime, timedelta
-from persevera_tools.data import get_series
+from services.series_store import load_series
 from configs.pages.dashboard_cta import CTA_DASHBOARD
 from utils.chart_helpers import create_chart
 import streamlit_highcharts as hct
@@ -14,7 +14,7 @@ st.title('CTA Dashboard')
 @st.cache_data(ttl=3600)
 def load_data(codes, field, start_date):
     try:
-        return get_series(codes, start_date=start_date, field=field)
+        return load_series(codes, start_date=start_date, field=field)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
@@ -5,8 +5,8 @@ import functools
 from datetime import datetime, timedelta, date
 
 from services.financial_data_service import (
-    SafeFinancialDataService,
     SOURCE_TO_PROVIDER,
+    get_financial_data_service,
 )
 from services.position_service import load_assets
 
@@ -52,14 +52,17 @@ with st.sidebar:
     start_date = st.date_input("Data de Início", value=pd.to_datetime(date.today() - timedelta(days=365)), min_value=datetime(1900, 1, 1), max_value=pd.to_datetime(date.today()), format="DD/MM/YYYY")
     start_date_str = start_date.strftime('%Y-%m-%d')
 
-fds = SafeFinancialDataService(start_date=start_date_str)
+# Instância compartilhada no processo; os providers são verificados em paralelo
+# e os que não respondem a tempo ficam desabilitados nesta renderização.
+fds = get_financial_data_service(start_date=start_date_str)
+provider_errors = fds.probe_providers()
 
-if fds.provider_errors:
+if provider_errors:
     with st.expander(
-        f"⚠️ {len(fds.provider_errors)} provider(s) indisponível(is) — botões correspondentes estão desabilitados",
+        f"⚠️ {len(provider_errors)} provider(s) indisponível(is) — botões correspondentes estão desabilitados",
         expanded=False,
     ):
-        for provider_attr, error_msg in fds.provider_errors.items():
+        for provider_attr, error_msg in provider_errors.items():
             st.warning(f"**{provider_attr}**: {error_msg}")
 
 def _source_button_kwargs(source: str) -> dict:
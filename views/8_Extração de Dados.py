@@ -3,6 +3,7 @@ from datetime import date, datetime, timedelta
 import pandas as pd
 import streamlit as st
 
+from services.export_service import EXPORT_FORMATS, export_in_chunks
 from services.position_service import load_funds_catalog, load_indicator_catalog
 from persevera_tools.data import get_funds_data, get_series
 
@@ -52,8 +53,7 @@ def _set_date_preset_ytd() -> None:
     st.session_state.extract_start_date = date(date.today().year, 1, 1)
 
 
-@st.cache_data(ttl=3600)
-def load_indicators_raw(
+def fetch_indicators_chunk(
     codes: tuple[str, ...],
     start_date: str,
     end_date: str,
@@ -71,8 +71,7 @@ def load_indicators_raw(
     return df
 
 
-@st.cache_data(ttl=3600)
-def load_funds_raw(
+def fetch_funds_chunk(
     cnpjs: tuple[str, ...],
     start_date: str,
     end_date: str,
@@ -86,14 +85,69 @@ def load_funds_raw(
     )
 
 
-def render_raw_table(df: pd.DataFrame, filename_prefix: str) -> None:
-    if df is None or df.empty:
+def run_export(fetch_chunk, ids: tuple, fields: tuple, start_date: str, end_date: str, fmt: str, label: str):
+    """
+    Extrai o período em blocos de datas para um arquivo temporário.
+
+    O resultado fica em ``st.session_state`` junto com os parâmetros, para que
+    as reruns da página (ex.: trocar de aba) não busquem tudo de novo; o
+    arquivo da extração anterior é fechado.
+    """
+    previous = st.session_state.pop("extract_export", None)
+    if previous is not None:
+        previous["export"].close()
+
+    progress = st.progress(0.0, text=label)
+    export = export_in_chunks(
+        lambda chunk_start, chunk_end: fetch_chunk(ids, chunk_start, chunk_end, fields),
+        start_date,
+        end_date,
+        fmt=fmt,
+        on_progress=lambda done, total: progress.progress(done / total, text=f"{label} ({done}/{total} blocos)"),
+    )
+    progress.empty()
+    st.session_state.extract_export = {
+        "params": (fetch_chunk.__name__, ids, fields, start_date, end_date, fmt),
+        "export": export,
+    }
+    return export
+
+
+def saved_export(fetch_chunk, ids: tuple, fields: tuple, start_date: str, end_date: str, fmt: str):
+    """Extração já feita nesta sessão com os mesmos parâmetros, se houver."""
+    saved = st.session_state.get("extract_export")
+    if saved is not None and saved["params"] == (fetch_chunk.__name__, ids, fields, start_date, end_date, fmt):
+        return saved["export"]
+    return None
+
+
+def render_raw_table(export, filename_prefix: str) -> None:
+    if export is None or export.empty:
         st.warning("Nenhum dado retornado para os parâmetros selecionados.")
         return
 
-    display_df = df
-    st.success(f"{len(display_df):,} linhas × {len(display_df.columns)} colunas".replace(",", "."))
-    st.dataframe(display_df, width="stretch", hide_index=False)
+    for chunk, error_msg in export.chunk_errors.items():
+        st.warning(f"Bloco {chunk} não foi extraído: {error_msg}")
+
+    size = export.size_bytes
+    size_text = f"{size / 1024 ** 2:.1f} MB" if size >= 1024 ** 2 else f"{size / 1024:.0f} KB"
+    st.success(
+        f"{export.rows:,} linhas × {export.columns} colunas".replace(",", ".")
+        + f" · {size_text.replace('.', ',')}"
+    )
+    st.download_button(
+        f"Baixar {export.fmt.upper()}",
+        data=export.read,
+        file_name=export.file_name(filename_prefix),
+        mime=export.mime,
+        on_click="ignore",
+        type="primary",
+    )
+
+    preview = export.preview()
+    if len(preview) < export.rows:
+        st.caption(f"Prévia: primeiras e últimas {len(export.head)} linhas (o arquivo contém todas).")
+    st.dataframe(preview, width="stretch", hide_index=False)
 
 
 with st.spinner("Carregando catálogos...", show_time=True):
@@ -137,6 +191,14 @@ with st.sidebar:
         key="extract_end_date",
     )
 
+    export_format = st.radio(
+        "Formato do arquivo",
+        list(EXPORT_FORMATS),
+        format_func=str.upper,
+        horizontal=True,
+        help="A extração é feita em blocos de datas e gravada direto no arquivo.",
+    )
+
     if data_type == "Indicadores":
         selected_codes = st.multiselect(
             "Códigos",
@@ -188,7 +250,10 @@ if start_date_input > end_date_input:
     st.stop()
 
 if data_type == "Indicadores":
-    if not run_extract:
+    codes = tuple(selected_codes)
+    fields = tuple(selected_fields)
+    export = saved_export(fetch_indicators_chunk, codes, fields, start_date_str, end_date_str, export_format)
+    if not run_extract and export is None:
         st.info("Selecione códigos e campos no sidebar e clique em **Extrair dados**.")
         st.stop()
     if not selected_codes:
@@ -198,23 +263,24 @@ if data_type == "Indicadores":
         st.warning("Selecione ao menos um campo.")
         st.stop()
 
-    with st.spinner("Extraindo indicadores...", show_time=True):
+    if run_extract:
         try:
-            raw = load_indicators_raw(
-                tuple(selected_codes),
-                start_date_str,
-                end_date_str,
-                tuple(selected_fields),
+            export = run_export(
+                fetch_indicators_chunk, codes, fields, start_date_str, end_date_str, export_format,
+                "Extraindo indicadores...",
             )
         except Exception as e:
             st.error(f"Erro ao chamar get_series: {e}")
             st.stop()
 
     st.subheader("Indicadores · dados brutos")
-    render_raw_table(raw, "indicadores")
+    render_raw_table(export, f"indicadores_{start_date_str}_{end_date_str}")
 
 else:
-    if not run_extract:
+    cnpjs = tuple(selected_cnpjs)
+    fields = tuple(selected_fund_fields)
+    export = saved_export(fetch_funds_chunk, cnpjs, fields, start_date_str, end_date_str, export_format)
+    if not run_extract and export is None:
         st.info("Selecione fundos e campos no sidebar e clique em **Extrair dados**.")
         st.stop()
     if not selected_cnpjs:
@@ -224,16 +290,14 @@ else:
         st.warning("Selecione ao menos um campo.")
         st.stop()
 
-    with st.spinner("Extraindo dados de fundos...", show_time=True):
+    if run_extract:
         try:
-            raw = load_funds_raw(
-                tuple(selected_cnpjs),
-                start_date_str,
-                end_date_str,
-                tuple(selected_fund_fields),
+            export = run_export(
+                fetch_funds_chunk, cnpjs, fields, start_date_str, end_date_str, export_format,
+                "Extraindo dados de fundos...",
             )
         except Exception as e:
             st.error(f"Erro ao chamar get_funds_data: {e}")
             st.stop()
 
-    render_raw_table(raw, "fundos")
+    render_raw_table(export, f"fundos_{start_date_str}_{end_date_str}")
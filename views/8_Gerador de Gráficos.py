@@ -6,7 +6,7 @@ import json
 import io
 from utils.chart_helpers import create_chart, render_chart
 from utils.data_transformers import apply_transformations, TRANSFORMERS
-from persevera_tools.data import get_series
+from services.series_store import load_series
 from services.position_service import load_indicator_catalog
 
 CHART_TYPE_OPTIONS = {
@@ -81,7 +81,7 @@ def _set_date_preset_ytd() -> None:
 @st.cache_data(ttl=3600)
 def load_series_data(codes, start_date, end_date):
     try:
-        df = get_series(codes, start_date=start_date, end_date=end_date, field="close")
+        df = load_series(codes, start_date=start_date, end_date=end_date, field="close")
         if not isinstance(df.index, pd.DatetimeIndex):
             try:
                 df.index = pd.to_datetime(df.index)
@@ -12,7 +12,7 @@ from datetime import datetime, timedelta, date
 
 from configs.pages.hora360 import INDICADORES_GRUPOS
 
-from persevera_tools.data import get_series
+from services.series_store import load_series
 
 
 st.title("Hora 360")
@@ -128,7 +128,7 @@ with st.sidebar:
 
 def load_data(codes, start_date, field='close'):
     try:
-        return get_series(codes, start_date=start_date, field=field)
+        return load_series(codes, start_date=start_date, field=field)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()